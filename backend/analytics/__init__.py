@@ -0,0 +1 @@
+# Motores de análisis vectorizados con NumPy para los endpoints de estadísticas
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event, select, func, union_all
+from sqlalchemy.orm import Session, object_session
+from ..extensions import db
+from ..models import Income, Booking, Archivo, Room, Client, ClientYearTotal
+from ..utils.date_range import DateRange, today, month_start, add_months
+from .lttb import downsample
+
+DAILY_DAYS = 30
+MONTHLY_MONTHS = 12
+TOP_SPENDERS_LIMIT = 10
+_SESSION_KEY = "dashboard_cache_dirty"
+_DASHBOARD_MODELS = (Income, Room, Client, Booking, Archivo)
+
+
+@contextmanager
+def read_transaction():
+    """
+    Agrupa las consultas del bloque en una sola transacción de lectura. pysqlite no
+    abre transacción para SELECT: sin BEGIN explícito cada consulta vería su propia
+    versión de la base de datos.
+    """
+    connection = db.session.connection()
+    driver = connection.connection.driver_connection
+    if connection.dialect.name != "sqlite" or driver.in_transaction:
+        yield connection
+        return
+
+    connection.exec_driver_sql("BEGIN")
+    try:
+        yield connection
+    finally:
+        connection.exec_driver_sql("ROLLBACK")
+
+
+def _occupancy():
+    total_rooms = db.session.query(func.count(Room.id)).filter(Room.is_deleted == False).scalar() or 1
+    occupied_rooms = db.session.query(func.count(Room.id)).filter(
+        Room.disponibilidad != "Disponible",
+        Room.is_deleted == False
+    ).scalar() or 0
+    return {
+        "total_habitaciones": total_rooms,
+        "habitaciones_ocupadas": occupied_rooms,
+        "porcentaje_ocupacion": round((occupied_rooms / total_rooms) * 100, 2),
+        "unidad": "porcentaje"
+    }
+
+
+def _top_spenders(year):
+    rows = db.session.query(
+        ClientYearTotal.cliente_id, Client.nombre, Client.documento, ClientYearTotal.transacciones,
+        ClientYearTotal.total, ClientYearTotal.reservas_booking, ClientYearTotal.reservas_archive
+    ).join(
+        Client, Client.id == ClientYearTotal.cliente_id
+    ).filter(
+        ClientYearTotal.year == year
+    ).order_by(
+        ClientYearTotal.total.desc()
+    ).limit(TOP_SPENDERS_LIMIT).all()
+
+    top = []
+    for idx, (cliente_id, nombre, documento, transacciones, total, booking, archive) in enumerate(rows):
+        reservas = booking + archive
+        top.append({
+            "rank": idx + 1,
+            "cliente_id": cliente_id,
+            "nombre": nombre,
+            "documento": documento,
+            "total_transacciones": int(transacciones),
+            "total_gastado": float(total),
+            "reservas_booking": int(booking),
+            "reservas_archive": int(archive),
+            "total_reservaciones": int(reservas),
+            "moneda": "USD",
+            "gasto_promedio": round(float(total) / reservas, 2) if reservas > 0 else 0.0
+        })
+    return {"year": year, "top_clientes": top}
+
+
+def _income_rows(scan_start, daily_start):
+    """
+    Pagos confirmados desde scan_start con el check_in de su estadía: un único
+    recorrido por rango de ix_income_estado_pago_fecha_pago alimenta todos los widgets.
+    Se añaden los pagos anteriores de estadías recientes (ingresos diarios por check_in).
+    """
+    check_in = func.coalesce(Booking.check_in, Archivo.check_in).label("check_in")
+    scan = select(
+        Income.fecha_pago, Income.monto, Income.cliente_id, Income.metodo_pago, check_in
+    ).outerjoin(
+        Booking, Income.booking_id == Booking.id
+    ).outerjoin(
+        Archivo, Income.archive_id == Archivo.id
+    ).where(
+        Income.estado_pago == 'confirmado',
+        Income.fecha_pago >= scan_start
+    )
+    rows = db.session.execute(scan).all()
+
+    early = union_all(*(
+        select(Income.monto, source.check_in).join(
+            Income, foreign_key == source.id
+        ).where(
+            Income.estado_pago == 'confirmado',
+            source.check_in >= daily_start,
+            Income.fecha_pago < scan_start
+        ) for source, foreign_key in ((Booking, Income.booking_id), (Archivo, Income.archive_id))
+    ))
+    early_rows = db.session.execute(early).all()
+    return rows, early_rows
+
+
+def dashboard_snapshot(now=None, max_points=None):
+    """
+    Todos los widgets del dashboard (los mismos formatos que sus endpoints individuales)
+    calculados dentro de una transacción de lectura, de modo que las cifras cuadran entre sí.
+    """
+    now = now or datetime.now()
+    dia = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    daily_start = dia - timedelta(days=DAILY_DAYS)
+    monthly_start = add_months(month_start(dia), -(MONTHLY_MONTHS - 1))
+    scan_start = min(daily_start, monthly_start)
+    mes = DateRange.month(dia)
+    hoy = DateRange.day(dia)
+
+    with read_transaction():
+        rows, early_rows = _income_rows(scan_start, daily_start)
+        occupancy = _occupancy()
+        top_spenders = _top_spenders(dia.year)
+
+    revenue_by_date = defaultdict(float)
+    clients_by_date = defaultdict(set)
+    revenue_by_month = defaultdict(float)
+    payment_methods = {}
+    monthly_clients = set()
+    monthly_revenue = 0.0
+    today_payments = 0
+
+    for fecha_pago, monto, cliente_id, metodo_pago, check_in in rows:
+        monto = float(monto) if monto else 0.0
+        if check_in is not None and check_in >= daily_start:
+            revenue_by_date[check_in.strftime('%Y-%m-%d')] += monto
+        if fecha_pago >= daily_start:
+            clients_by_date[fecha_pago.strftime('%Y-%m-%d')].add(cliente_id)
+        if fecha_pago >= monthly_start:
+            revenue_by_month[fecha_pago.strftime('%Y-%m')] += monto
+        if mes.start <= fecha_pago < mes.end:
+            method = payment_methods.setdefault(metodo_pago.lower(), {"amount": 0.0, "count": 0})
+            method["amount"] += monto
+            method["count"] += 1
+            monthly_clients.add(cliente_id)
+            monthly_revenue += monto
+        if hoy.start <= fecha_pago < hoy.end:
+            today_payments += 1
+
+    for monto, check_in in early_rows:
+        revenue_by_date[check_in.strftime('%Y-%m-%d')] += float(monto) if monto else 0.0
+
+    daily_revenue = [{"time": date, "revenue": amount} for date, amount in sorted(revenue_by_date.items())]
+    daily_clients = [{"time": date, "clients": len(ids)} for date, ids in sorted(clients_by_date.items())]
+    monthly = [{"time": f"{month}-01", "value": amount, "color": "#4CAF50"}
+               for month, amount in sorted(revenue_by_month.items())]
+
+    return {
+        "daily_revenue": downsample(daily_revenue, "revenue", max_points),
+        "daily_clients": downsample(daily_clients, "clients", max_points),
+        "monthly_revenue": downsample(monthly, "value", max_points),
+        "current_month_payments": {
+            "month": mes.start.strftime("%Y-%m"),
+            "payment_methods": payment_methods,
+            "total": sum(m["amount"] for m in payment_methods.values()),
+            "total_transactions": sum(m["count"] for m in payment_methods.values()),
+            "currency": "USD"
+        },
+        "quick_stats": {
+            "monthly_revenue": monthly_revenue,
+            "monthly_clients": len(monthly_clients),
+            "occupancy_percentage": occupancy["porcentaje_ocupacion"],
+            "today_payments": today_payments,
+            "last_updated": now.isoformat(),
+            "currency": "USD"
+        },
+        "top_spenders": top_spenders,
+        "current_occupancy": occupancy,
+    }
+
+
+class DashboardCache:
+    """
+    Última instantánea por parámetros, con su ETag. Se descarta al escribir en las
+    tablas que la alimentan desde este proceso, al cambiar el día o por antigüedad.
+    """
+
+    def __init__(self):
+        self.max_age = 15
+        self._entries = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_age = app.config.get("DASHBOARD_CACHE_SECONDS", self.max_age)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = {}
+            self._generation += 1
+
+    @staticmethod
+    def etag(widgets):
+        # last_updated cambia en cada cálculo aunque los datos sean los mismos
+        quick = {k: v for k, v in widgets["quick_stats"].items() if k != "last_updated"}
+        payload = json.dumps({**widgets, "quick_stats": quick}, sort_keys=True, default=str).encode()
+        return hashlib.sha1(payload).hexdigest()
+
+    def get(self, max_points=None):
+        """Devuelve (etag, instantánea, generada_en), recalculando si hace falta."""
+        key = (today(), max_points)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[3] <= self.max_age:
+                return entry[:3]
+            generation = self._generation
+
+        now = datetime.now()
+        widgets = dashboard_snapshot(now, max_points)
+        entry = (self.etag(widgets), widgets, now, time.monotonic())
+        with self._lock:
+            if generation != self._generation:
+                # Hubo escrituras mientras se calculaba: no se guarda
+                return entry[:3]
+            # Solo se conserva la entrada del día actual
+            self._entries = {k: v for k, v in self._entries.items() if k[0] == key[0]}
+            self._entries[key] = entry
+        return entry[:3]
+
+
+dashboard_cache = DashboardCache()
+
+
+@event.listens_for(Income, "after_insert")
+@event.listens_for(Income, "after_update")
+@event.listens_for(Income, "after_delete")
+@event.listens_for(Room, "after_insert")
+@event.listens_for(Room, "after_update")
+@event.listens_for(Room, "after_delete")
+@event.listens_for(Client, "after_insert")
+@event.listens_for(Client, "after_update")
+@event.listens_for(Client, "after_delete")
+@event.listens_for(Booking, "after_insert")
+@event.listens_for(Booking, "after_update")
+@event.listens_for(Booking, "after_delete")
+@event.listens_for(Archivo, "after_insert")
+@event.listens_for(Archivo, "after_update")
+@event.listens_for(Archivo, "after_delete")
+def _mark_dashboard_dirty(mapper, connection, target):
+    # Se descarta al confirmar: antes, otra petición volvería a guardar los datos anteriores
+    session = object_session(target)
+    if session is None:
+        dashboard_cache.invalidate()
+    else:
+        session.info[_SESSION_KEY] = True
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _mark_dashboard_dirty_bulk(context):
+    if context.mapper.class_ in _DASHBOARD_MODELS:
+        context.session.info[_SESSION_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_dashboard_on_commit(session):
+    if session.info.pop(_SESSION_KEY, False):
+        dashboard_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dashboard_mark(session):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,214 @@
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from sqlalchemy import event, select, union_all, func
+from sqlalchemy.orm import Session, object_session
+from ..extensions import db
+from ..models import Booking, Archivo, Income, Room
+from .occupancy import OCCUPYING_ARCHIVE_STATES
+
+_KPI_MODELS = (Booking, Archivo, Income, Room)
+_SESSION_KEY = "kpi_cache_dirty"
+
+
+class ClosedMonthCache:
+    """
+    KPIs de meses cerrados. Se descartan al confirmar escrituras en las tablas que los
+    alimentan desde este proceso y, para las de otros procesos, por antigüedad.
+    """
+
+    def __init__(self):
+        self.max_age = 300
+        self._entries = {}  # mes -> (kpis, guardado_en)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_age = app.config.get("KPI_CACHE_SECONDS", self.max_age)
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._generation += 1
+
+    def get(self, keys):
+        """Devuelve ({mes: kpis} vigentes, generación) para las claves pedidas."""
+        now = time.monotonic()
+        with self._lock:
+            found = {k: self._entries[k][0] for k in keys
+                     if k in self._entries and now - self._entries[k][1] <= self.max_age}
+            return found, self._generation
+
+    def put(self, values, generation):
+        with self._lock:
+            if generation != self._generation:
+                # Hubo escrituras mientras se calculaba: no se guarda
+                return
+            now = time.monotonic()
+            self._entries = {k: v for k, v in self._entries.items() if now - v[1] <= self.max_age}
+            for k, value in values.items():
+                self._entries[k] = (value, now)
+
+
+kpi_cache = ClosedMonthCache()
+
+
+def _month_start(month):
+    return month.astype("datetime64[D]").astype(datetime)
+
+
+def _stays(start, end):
+    """Estadías que se solapan con [start, end) con sus ingresos confirmados."""
+    confirmed = Income.estado_pago == "confirmado"
+    booking_income = (select(Income.booking_id.label("ref"), func.sum(Income.monto).label("monto"))
+                      .where(confirmed, Income.booking_id.isnot(None))
+                      .group_by(Income.booking_id).subquery())
+    archive_income = (select(Income.archive_id.label("ref"), func.sum(Income.monto).label("monto"))
+                      .where(confirmed, Income.archive_id.isnot(None))
+                      .group_by(Income.archive_id).subquery())
+
+    bookings = (select(Booking.check_in, Booking.check_out, Booking.tipo_habitacion,
+                       func.coalesce(booking_income.c.monto, 0.0))
+                .outerjoin(booking_income, booking_income.c.ref == Booking.id)
+                .where(Booking.check_in < end, Booking.check_out > start))
+    archives = (select(Archivo.check_in, Archivo.check_out, Archivo.tipo_habitacion,
+                       func.coalesce(archive_income.c.monto, 0.0))
+                .outerjoin(archive_income, archive_income.c.ref == Archivo.id)
+                .where(Archivo.estado.in_(OCCUPYING_ARCHIVE_STATES),
+                       Archivo.check_in < end, Archivo.check_out > start))
+    return db.session.execute(union_all(bookings, archives)).all()
+
+
+def _compute(first, last):
+    """
+    Calcula los KPIs de los meses [first, last] (datetime64[M]) en una sola pasada:
+    cada estadía se expande en sus noches y los ingresos se reparten por noche.
+    """
+    months = np.arange(first, last + 1)
+    n_months = len(months)
+    start, end = _month_start(months[0]), _month_start(last + 1)
+
+    rows = _stays(start, end)
+    rooms = db.session.execute(
+        select(Room.tipo, func.count(Room.id)).where(Room.is_deleted == False).group_by(Room.tipo)
+    ).all()
+
+    types = sorted({r[2] for r in rows} | {r[0] for r in rooms})
+    type_codes = {t: i for i, t in enumerate(types)}
+    n_types = max(len(types), 1)
+    size = n_months * n_types
+
+    check_in = np.array([r[0] for r in rows], dtype="datetime64[D]")
+    check_out = np.array([r[1] for r in rows], dtype="datetime64[D]")
+    tipo = np.fromiter((type_codes[r[2]] for r in rows), np.int64, len(rows))
+    revenue = np.fromiter((r[3] for r in rows), np.float64, len(rows))
+    nights = np.maximum((check_out - check_in).astype(np.int64), 1)
+
+    # Expandir cada estadía en sus noches
+    stay = np.repeat(np.arange(len(rows)), nights)
+    offsets = np.arange(len(stay)) - np.repeat(np.cumsum(nights) - nights, nights)
+    night_date = check_in[stay] + offsets
+    in_range = (night_date >= np.datetime64(start, "D")) & (night_date < np.datetime64(end, "D"))
+    stay, night_date = stay[in_range], night_date[in_range]
+
+    key = (night_date.astype("datetime64[M]") - months[0]).astype(np.int64) * n_types + tipo[stay]
+    room_nights = np.bincount(key, minlength=size).reshape(n_months, n_types)
+    room_revenue = np.bincount(key, weights=(revenue / nights)[stay], minlength=size).reshape(n_months, n_types)
+
+    # Duración media de estancia: estadías con entrada en el mes
+    arrival_month = (check_in.astype("datetime64[M]") - months[0]).astype(np.int64)
+    arrived = (arrival_month >= 0) & (arrival_month < n_months)
+    arrival_key = arrival_month[arrived] * n_types + tipo[arrived]
+    stays = np.bincount(arrival_key, minlength=size).reshape(n_months, n_types)
+    stay_nights = np.bincount(arrival_key, weights=nights[arrived], minlength=size).reshape(n_months, n_types)
+
+    room_count = np.zeros(n_types, dtype=np.int64)
+    for room_tipo, count in rooms:
+        room_count[type_codes[room_tipo]] = count
+    days = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+    available = days[:, None] * room_count[None, :]
+
+    result = {}
+    for m, month in enumerate(months):
+        result[str(month)] = {
+            "total": _metrics(room_revenue[m].sum(), room_nights[m].sum(), available[m].sum(),
+                              stays[m].sum(), stay_nights[m].sum()),
+            "por_tipo": {
+                t: _metrics(room_revenue[m, i], room_nights[m, i], available[m, i], stays[m, i], stay_nights[m, i])
+                for i, t in enumerate(types)
+            }
+        }
+    return result
+
+
+def _metrics(revenue, room_nights, available, stays, stay_nights):
+    return {
+        "ingresos": round(float(revenue), 2),
+        "noches_vendidas": int(room_nights),
+        "noches_disponibles": int(available),
+        "estadias": int(stays),
+        "adr": round(float(revenue / room_nights), 2) if room_nights else 0.0,
+        "revpar": round(float(revenue / available), 2) if available else 0.0,
+        "alos": round(float(stay_nights / stays), 2) if stays else 0.0,
+    }
+
+
+def monthly_kpis(first, last, today=None):
+    """
+    ADR, RevPAR y ALOS por mes y tipo de habitación entre dos meses (inclusive).
+    Los meses cerrados se toman de la caché; solo se calculan los que faltan.
+    """
+    first = np.datetime64(first, "M")
+    last = np.datetime64(last, "M")
+    current = np.datetime64(today or datetime.now(), "M")
+
+    keys = [str(m) for m in np.arange(first, last + 1)]
+    cached, generation = kpi_cache.get(keys)
+    missing = [np.datetime64(k, "M") for k in keys if k not in cached]
+
+    if missing:
+        computed = _compute(min(missing), max(missing))
+        kpi_cache.put({k: v for k, v in computed.items() if np.datetime64(k, "M") < current}, generation)
+        cached.update(computed)
+
+    return [dict(month=k, **cached[k]) for k in keys]
+
+
+@event.listens_for(Booking, "after_insert")
+@event.listens_for(Booking, "after_update")
+@event.listens_for(Booking, "after_delete")
+@event.listens_for(Archivo, "after_insert")
+@event.listens_for(Archivo, "after_update")
+@event.listens_for(Archivo, "after_delete")
+@event.listens_for(Income, "after_insert")
+@event.listens_for(Income, "after_update")
+@event.listens_for(Income, "after_delete")
+@event.listens_for(Room, "after_insert")
+@event.listens_for(Room, "after_update")
+@event.listens_for(Room, "after_delete")
+def _mark_kpis_dirty(mapper, connection, target):
+    # Se descarta la caché al confirmar: antes, otro hilo volvería a guardar los datos anteriores
+    session = object_session(target)
+    if session is None:
+        kpi_cache.clear()
+    else:
+        session.info[_SESSION_KEY] = True
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _mark_kpis_dirty_bulk(context):
+    if context.mapper.class_ in _KPI_MODELS:
+        context.session.info[_SESSION_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_kpis_on_commit(session):
+    if session.info.pop(_SESSION_KEY, False):
+        kpi_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_kpis_mark(session):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,46 @@
+import numpy as np
+
+MIN_POINTS = 3
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Índices de los puntos elegidos por Largest-Triangle-Three-Buckets. Conserva el
+    primer y el último punto; en cada bucket intermedio elige el que forma el
+    triángulo de mayor área con el punto elegido antes y el promedio del siguiente.
+    """
+    n = len(x)
+    if max_points is None or max_points >= n or max_points < MIN_POINTS:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Límites de los buckets intermedios y sus promedios, calculados de una vez
+    edges = np.floor(np.linspace(1, n - 1, max_points - 1)).astype(np.int64)
+    edges[-1] = n - 1
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / np.diff(edges)
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / np.diff(edges)
+    # El "siguiente bucket" del último intermedio es el punto final
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(points, value_key, max_points, time_key="time"):
+    """Reduce una serie de dicts {time: 'YYYY-MM-DD', value_key: número} a max_points puntos."""
+    if max_points is None or len(points) <= max_points:
+        return points
+    x = np.array([p[time_key] for p in points], dtype="datetime64[D]").astype(np.int64)
+    y = np.fromiter((p[value_key] or 0.0 for p in points), np.float64, len(points))
+    return [points[i] for i in lttb_indices(x, y, max_points)]
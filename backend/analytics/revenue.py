@@ -0,0 +1,225 @@
+import threading
+import time
+import numpy as np
+from sqlalchemy import event, select, func
+from sqlalchemy.orm import Session, object_session
+from ..extensions import db
+from ..models import Income
+
+GRANULARITIES = ("day", "week", "month")
+GROUP_FIELDS = ("metodo_pago",)
+
+
+class _Categories:
+    """Codifica etiquetas de texto como enteros para agrupar con bincount."""
+
+    def __init__(self):
+        self.labels = []
+        self.codes = {}
+
+    def encode(self, values):
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.labels)
+                self.labels.append(value)
+            codes[i] = code
+        return codes
+
+
+class IncomeColumns:
+    """Instantánea inmutable de las columnas de Income, ordenadas por id."""
+
+    def __init__(self, ids, fecha, monto, metodo, estado, cliente):
+        self.ids = ids
+        self.fecha = fecha
+        self.monto = monto
+        self.metodo = metodo
+        self.estado = estado
+        self.cliente = cliente
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, np.int64), np.empty(0, "datetime64[s]"), np.empty(0, np.float64),
+                   np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.int64))
+
+    def without(self, ids):
+        keep = ~np.isin(self.ids, ids)
+        return IncomeColumns(self.ids[keep], self.fecha[keep], self.monto[keep],
+                             self.metodo[keep], self.estado[keep], self.cliente[keep])
+
+    def concat(self, other):
+        columns = IncomeColumns(*(np.concatenate([getattr(self, f), getattr(other, f)])
+                                  for f in ("ids", "fecha", "monto", "metodo", "estado", "cliente")))
+        if len(columns) > 1 and np.any(columns.ids[1:] < columns.ids[:-1]):
+            order = np.argsort(columns.ids, kind="stable")
+            columns = IncomeColumns(*(getattr(columns, f)[order]
+                                      for f in ("ids", "fecha", "monto", "metodo", "estado", "cliente")))
+        return columns
+
+
+class IncomeStore:
+    """
+    Columnas de Income en arrays de NumPy, actualizadas de forma incremental: las
+    filas nuevas se anexan por id y las modificadas o eliminadas por este proceso se
+    vuelven a leer. Cambios de otros procesos se detectan por conteo o por antigüedad.
+    """
+
+    def __init__(self):
+        self.max_staleness = 300
+        self.metodos = _Categories()
+        self.estados = _Categories()
+        self._columns = None
+        self._loaded_at = 0.0
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_staleness = app.config.get("ANALYTICS_MAX_STALENESS_SECONDS", self.max_staleness)
+
+    def mark_dirty(self, income_id):
+        if income_id is not None:
+            self._dirty.add(income_id)
+
+    def invalidate(self):
+        """Fuerza una recarga completa en la próxima consulta (p. ej. tras un UPDATE masivo)."""
+        with self._lock:
+            self._columns = None
+
+    def _fetch(self, stmt):
+        ids, fechas, montos, metodos, estados, clientes = [], [], [], [], [], []
+        result = db.session.execute(stmt.execution_options(yield_per=50000))
+        for partition in result.partitions():
+            ids.append(np.fromiter((r[0] for r in partition), np.int64, len(partition)))
+            fechas.append(np.array([r[1] for r in partition], dtype="datetime64[s]"))
+            montos.append(np.fromiter((r[2] or 0.0 for r in partition), np.float64, len(partition)))
+            metodos.append(self.metodos.encode([(r[3] or "").lower() for r in partition]))
+            estados.append(self.estados.encode([r[4] for r in partition]))
+            clientes.append(np.fromiter((r[5] for r in partition), np.int64, len(partition)))
+        if not ids:
+            return IncomeColumns.empty()
+        return IncomeColumns(np.concatenate(ids), np.concatenate(fechas), np.concatenate(montos),
+                             np.concatenate(metodos), np.concatenate(estados), np.concatenate(clientes))
+
+    @staticmethod
+    def _select():
+        return select(Income.id, Income.fecha_pago, Income.monto, Income.metodo_pago,
+                      Income.estado_pago, Income.cliente_id)
+
+    def columns(self):
+        """Devuelve una instantánea actualizada de las columnas."""
+        with self._lock:
+            columns = self._columns
+            stale = columns is None or time.monotonic() - self._loaded_at > self.max_staleness
+
+            if not stale:
+                dirty, self._dirty = self._dirty, set()
+                max_id = int(columns.ids[-1]) if len(columns) else 0
+                if dirty:
+                    dirty_ids = np.fromiter(dirty, np.int64, len(dirty))
+                    columns = columns.without(dirty_ids).concat(
+                        self._fetch(self._select().where(Income.id.in_(dirty)))
+                    )
+                columns = columns.concat(self._fetch(self._select().where(Income.id > max_id)))
+
+                # Eliminaciones de otros procesos: el conteo deja de coincidir
+                count = db.session.execute(select(func.count(Income.id))).scalar()
+                stale = count != len(columns)
+
+            if stale:
+                self._dirty = set()
+                columns = self._fetch(self._select().order_by(Income.id))
+                self._loaded_at = time.monotonic()
+
+            self._columns = columns
+            return columns
+
+
+income_store = IncomeStore()
+
+
+_SESSION_KEY = "income_store_dirty"
+
+
+@event.listens_for(Income, "after_insert")
+@event.listens_for(Income, "after_update")
+@event.listens_for(Income, "after_delete")
+def _mark_income_dirty(mapper, connection, target):
+    # En el flush la fila aún no está confirmada: otro hilo releería la versión anterior
+    session = object_session(target)
+    if session is None:
+        income_store.mark_dirty(target.id)
+    elif target.id is not None:
+        session.info.setdefault(_SESSION_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_dirty_incomes(session):
+    for income_id in session.info.pop(_SESSION_KEY, ()):
+        income_store.mark_dirty(income_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_incomes(session):
+    session.info.pop(_SESSION_KEY, None)
+
+
+def _bucket_starts(start, end, granularity):
+    """Inicio de cada bucket del rango [start, end) como datetime64[D]."""
+    first = np.datetime64(start.date(), "D")
+    last = np.datetime64(end.date(), "D")
+    if granularity == "day":
+        return np.arange(first, last, dtype="datetime64[D]")
+    if granularity == "week":
+        # 1970-01-01 fue jueves: desplazar para que las semanas empiecen en lunes
+        monday = first - ((first.astype(np.int64) + 3) % 7)
+        return np.arange(monday, last, np.timedelta64(7, "D"), dtype="datetime64[D]")
+    months = np.arange(first.astype("datetime64[M]"), (last - 1).astype("datetime64[M]") + 1)
+    return months.astype("datetime64[D]")
+
+
+def _bucket_index(days, buckets, granularity):
+    if granularity == "day":
+        return (days - buckets[0]).astype(np.int64)
+    if granularity == "week":
+        return (days - buckets[0]).astype(np.int64) // 7
+    return (days.astype("datetime64[M]") - buckets[0].astype("datetime64[M]")).astype(np.int64)
+
+
+def revenue_series(start, end, granularity="day", by=None, estado="confirmado"):
+    """
+    Ingresos y número de transacciones por bucket en [start, end).
+    Devuelve (buckets, revenue, counts, labels): con `by`, revenue y counts son
+    matrices (grupos x buckets) y labels las etiquetas de cada grupo.
+    """
+    columns = income_store.columns()
+    buckets = _bucket_starts(start, end, granularity)
+    n_buckets = len(buckets)
+
+    mask = (columns.fecha >= np.datetime64(start, "s")) & (columns.fecha < np.datetime64(end, "s"))
+    estado_code = income_store.estados.codes.get(estado)
+    mask &= columns.estado == (estado_code if estado_code is not None else -1)
+
+    days = columns.fecha[mask].astype("datetime64[D]")
+    montos = columns.monto[mask]
+    idx = _bucket_index(days, buckets, granularity)
+
+    if by is None:
+        revenue = np.bincount(idx, weights=montos, minlength=n_buckets)
+        counts = np.bincount(idx, minlength=n_buckets)
+        return buckets, revenue, counts, None
+
+    groups = columns.metodo[mask]
+    labels = list(income_store.metodos.labels)
+    n_groups = max(len(labels), 1)
+    combined = groups.astype(np.int64) * n_buckets + idx
+    revenue = np.bincount(combined, weights=montos, minlength=n_groups * n_buckets).reshape(n_groups, n_buckets)
+    counts = np.bincount(combined, minlength=n_groups * n_buckets).reshape(n_groups, n_buckets)
+
+    # Omitir métodos sin movimientos en el rango
+    present = counts.sum(axis=1) > 0
+    return buckets, revenue[present], counts[present], [l for l, p in zip(labels, present) if p]
@@ -4,6 +4,20 @@ from .extensions import db, migrate, jwt, cors, scheduler, socketio  # Importar
 from .models import User
 from .routes import register_blueprints
 from .routes.tasks import register_tasks  # Importar la función de registro de tareas
+from .routes.sockets import register_socket_handlers
+from .utils.notifier import notifier, outbox_relay
+from .utils.lease import leader
+from .utils.jobs import job_runner
+from .analytics.revenue import income_store
+from .analytics.dashboard import dashboard_cache
+from .analytics.kpi import kpi_cache
+from .utils import client_totals  # Registra los eventos que mantienen client_year_totals
+from .utils.lookup import client_lookup
+from .utils.query_stats import query_stats
+from .utils.metrics import request_metrics
+from .utils.profiling import request_profiler
+from .commands import register_commands
+import atexit
 import os
 
 def create_app(config_class=Config):
@@ -17,19 +31,33 @@ def create_app(config_class=Config):
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    job_runner.init_app(app)
+    income_store.init_app(app)
+    client_lookup.init_app(app)
+    dashboard_cache.init_app(app)
+    kpi_cache.init_app(app)
+    query_stats.init_app(app)
+    request_metrics.init_app(app)
+    request_profiler.init_app(app)
     cors.init_app(app, supports_credentials=True, expose_headers=["Authorization"])
 
     # Inicializar el scheduler solo en el proceso principal
-    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not app.debug:
+    if app.config.get('SCHEDULER_ENABLED', True) and (os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not app.debug):
         scheduler.init_app(app)
+        leader.init_app(app)
         if not scheduler.running:
             scheduler.start()
             register_tasks()  # Registrar las tareas aquí
+            atexit.register(leader.release)  # Ceder el liderazgo al terminar el proceso
 
-    socketio.init_app(app)  # Inicializar SocketIO con la app
+    socketio.init_app(app, message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE'))  # Inicializar SocketIO con la app
+    notifier.init_app(app)
+    outbox_relay.init_app(app)
+    register_socket_handlers()
 
     # Registrar blueprints
     register_blueprints(app)
+    register_commands(app)
     
     return app
 
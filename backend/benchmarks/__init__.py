@@ -0,0 +1 @@
+# Pruebas de rendimiento de la API (latencia y memoria) con líneas base de regresión
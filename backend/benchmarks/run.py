@@ -0,0 +1,267 @@
+"""
+Mide latencia (p50/p95) y memoria pico de las rutas más usadas de la API a través del
+cliente de pruebas de Flask, sobre datos sintéticos de `flask seed` a varias escalas.
+
+Guardar la línea base de esta máquina:
+
+    python -m backend.benchmarks.run --save
+
+Comparar contra la línea base (sale con código 1 si alguna métrica empeora más del umbral):
+
+    python -m backend.benchmarks.run --threshold 0.25
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import select
+from ..app import create_app
+from ..config import Config
+from ..extensions import db, logger
+from ..models import User, Client, Room
+from ..routes.tasks import procesar_vencimientos
+from ..analytics.dashboard import dashboard_cache
+from ..utils.helpers import percentile
+from ..utils.seed import generate
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SCALES = {"small": 1000, "medium": 10000, "large": 50000}  # Clientes generados por escala
+LIST_ENDPOINTS = ("/api/clients", "/api/rooms", "/api/bookings", "/api/incomes", "/api/archives", "/api/users")
+METRICS = {"p50_ms": 1.0, "p95_ms": 2.0, "peak_kb": 256.0}  # Métrica -> diferencia mínima para considerarla regresión
+
+
+class BenchmarkConfig(Config):
+    TESTING = True
+    SCHEDULER_ENABLED = False
+    JOBS_EAGER = True
+    DASHBOARD_CACHE_SECONDS = 0  # Medir el cálculo, no la instantánea en caché
+    METRICS_DIR = None
+
+
+def stats_endpoints(app):
+    """Todas las rutas GET de /api/stats sin parámetros en la URL."""
+    return sorted(rule.rule for rule in app.url_map.iter_rules()
+                  if rule.rule.startswith("/api/stats/") and "GET" in rule.methods and not rule.arguments)
+
+
+def _summary(latencies, peak):
+    latencies = sorted(latencies)
+    return {
+        "runs": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def measure(operation, iterations, warmup=1):
+    """Latencias de `iterations` llamadas y memoria pico (tracemalloc) de una llamada adicional."""
+    for _ in range(warmup):
+        operation()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - start)
+
+    # tracemalloc ralentiza la ejecución: la memoria se mide aparte de la latencia
+    tracemalloc.start()
+    try:
+        operation()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return _summary(latencies, peak)
+
+
+def _request(client, method, path, headers, expected, **kwargs):
+    response = client.open(path, method=method, headers=headers, **kwargs)
+    if response.status_code != expected:
+        raise RuntimeError(f"{method} {path}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def _booking_cycle(client, headers, cliente_id, room, start, traced=False):
+    """
+    Crea, actualiza y archiva una reserva. Devuelve {operación: segundos}, o
+    {operación: bytes de memoria pico} con traced=True.
+    """
+    payload = {
+        "cliente_id": cliente_id, "habitacion_id": room.id,
+        "check_in": start.strftime("%Y-%m-%dT15:00:00"),
+        "check_out": (start + timedelta(days=2)).strftime("%Y-%m-%dT12:00:00"),
+        "tipo_habitacion": room.tipo, "num_huespedes": 1, "metodo_pago": "Tarjeta",
+        "estado": "confirmada", "valor_reservacion": room.precio_noche * 2,
+    }
+    results = {}
+
+    def step(name, method, path, expected, **kwargs):
+        if traced:
+            tracemalloc.reset_peak()
+        start_time = time.perf_counter()
+        response = _request(client, method, path, headers, expected, **kwargs)
+        results[name] = tracemalloc.get_traced_memory()[1] if traced else time.perf_counter() - start_time
+        return response
+
+    booking_id = step("booking_create", "POST", "/api/bookings", 201, json=payload).get_json()["id"]
+    step("booking_update", "PUT", f"/api/bookings/{booking_id}", 200, json={"notas": "Benchmark", "metodo_pago": "Efectivo"})
+    step("booking_delete", "DELETE", f"/api/bookings/{booking_id}", 200)
+    return results
+
+
+def bench_bookings(client, headers, iterations):
+    """Ciclo crear/actualizar/eliminar sobre una habitación disponible, en fechas futuras."""
+    room = db.session.scalars(select(Room).where(Room.disponibilidad == "Disponible", Room.is_deleted == False)).first()
+    cliente_id = db.session.scalars(select(Client.id)).first()
+    if room is None or cliente_id is None:
+        raise RuntimeError("No hay habitaciones disponibles ni clientes para el ciclo de reservas")
+    start = datetime.now() + timedelta(days=400)
+
+    _booking_cycle(client, headers, cliente_id, room, start)  # Calentamiento
+    latencies = {}
+    for i in range(1, iterations + 1):
+        for name, elapsed in _booking_cycle(client, headers, cliente_id, room, start + timedelta(days=3 * i)).items():
+            latencies.setdefault(name, []).append(elapsed)
+
+    tracemalloc.start()
+    try:
+        peaks = _booking_cycle(client, headers, cliente_id, room, start - timedelta(days=3), traced=True)
+    finally:
+        tracemalloc.stop()
+    return {name: _summary(values, peaks[name]) for name, values in latencies.items()}
+
+
+def run_scale(app, scale, iterations=20, write_iterations=10, job_iterations=5, seed=42):
+    """Genera `scale` clientes en la base vacía de `app` y mide cada caso. Devuelve {caso: métricas}."""
+    results = {}
+    with app.app_context():
+        generate(scale, seed=seed)
+        admin = User(nombre="Benchmark", email="benchmark@hotel.com", role="admin")
+        admin.set_password("benchmark")
+        db.session.add(admin)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=admin.email, additional_claims={'role': admin.role})}"}
+        client = app.test_client()
+
+        for path in LIST_ENDPOINTS + tuple(stats_endpoints(app)):
+            results[f"GET {path}"] = measure(lambda: _request(client, "GET", path, headers, 200), iterations)
+        results.update(bench_bookings(client, headers, write_iterations))
+
+        def job():
+            procesar_vencimientos()
+            db.session.remove()
+        results["job verificar_reservas"] = measure(job, job_iterations)
+        dashboard_cache.invalidate()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Regresiones: métricas que superan la línea base en más de `threshold` (fracción) y del mínimo absoluto."""
+    regressions = []
+    for scale, cases in results.items():
+        for case, metrics in cases.items():
+            reference = baseline.get(scale, {}).get(case)
+            if not reference:
+                continue
+            for metric, min_delta in METRICS.items():
+                before, after = reference.get(metric), metrics.get(metric)
+                if before is None or after is None:
+                    continue
+                if after > before * (1 + threshold) and after - before > min_delta:
+                    regressions.append({"scale": scale, "case": case, "metric": metric,
+                                        "baseline": before, "current": after})
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    # Se conservan las escalas no medidas en esta ejecución
+    baseline = load_baseline(path)
+    baseline.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+
+def _reset_database(app):
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latencia y memoria de la API con líneas base de regresión")
+    parser.add_argument("--scale", action="append", default=[],
+                        help=f"Escala a medir: nombre ({', '.join(SCALES)}) o nombre=clientes (repetible, por defecto todas)")
+    parser.add_argument("--iterations", type=int, default=20, help="Peticiones medidas por ruta de lectura")
+    parser.add_argument("--write-iterations", type=int, default=10, help="Ciclos crear/actualizar/eliminar reserva")
+    parser.add_argument("--job-iterations", type=int, default=5, help="Ejecuciones de verificar_reservas")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Archivo JSON de la línea base")
+    parser.add_argument("--save", action="store_true", help="Guarda los resultados como nueva línea base")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("HOTEL_BENCH_THRESHOLD", 0.25)),
+                        help="Empeoramiento tolerado respecto a la línea base (0.25 = 25%%)")
+    parser.add_argument("--json", action="store_true", help="Imprime los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    scales = {}
+    for value in args.scale or SCALES:
+        name, _, size = value.partition("=")
+        if not size and name not in SCALES:
+            parser.error(f"Escala desconocida: {name}")
+        scales[name] = int(size) if size else SCALES[name]
+
+    workdir = tempfile.mkdtemp(prefix="hotel_bench_")
+    config = type("RunConfig", (BenchmarkConfig,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "JOBS_RESULTS_DIR": os.path.join(workdir, "jobs"),
+        "PROFILE_RESULTS_DIR": os.path.join(workdir, "profiles"),
+    })
+    app = create_app(config_class=config)
+    logger.setLevel(logging.WARNING)  # La tarea registra cada ejecución
+
+    results = {}
+    for name, size in scales.items():
+        _reset_database(app)
+        print(f"Escala {name}: {size} clientes...", file=sys.stderr)
+        results[name] = run_scale(app, size, args.iterations, args.write_iterations, args.job_iterations, args.seed)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        for name, cases in results.items():
+            print(f"\n[{name}] {scales[name]} clientes")
+            print(f"{'caso':<46}{'p50 ms':>10}{'p95 ms':>10}{'pico KiB':>12}")
+            for case, m in cases.items():
+                print(f"{case:<46}{m['p50_ms']:>10}{m['p95_ms']:>10}{m['peak_kb']:>12}")
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\nLínea base guardada en {args.baseline}", file=sys.stderr)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f"\nSin línea base en {args.baseline}: use --save para crearla", file=sys.stderr)
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for r in regressions:
+        print(f"REGRESIÓN [{r['scale']}] {r['case']} {r['metric']}: {r['baseline']} -> {r['current']}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+import time
+import click
+from flask import current_app
+from .utils.client_import import import_clients, IMPORT_FORMATS
+from .utils.seed import generate, load_fixtures
+
+
+def register_commands(app):
+    """Registra los comandos de `flask` de la aplicación."""
+
+    @app.cli.command("import-clients")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(IMPORT_FORMATS), help="Por defecto según la extensión.")
+    @click.option("--batch-size", type=int, help="Registros por transacción.")
+    def import_clients_command(path, fmt, batch_size):
+        """Importa clientes desde un archivo JSON o CSV (upsert por documento)."""
+        fmt = fmt or ("csv" if path.lower().endswith(".csv") else "json")
+        batch_size = batch_size or current_app.config.get("IMPORT_BATCH_SIZE", 1000)
+        with open(path, "rb") as stream:
+            report = import_clients(stream, fmt, batch_size)
+
+        click.echo(f"Procesados: {report.processed}  Nuevos: {report.inserted}  "
+                   f"Actualizados: {report.updated}  Con errores: {report.failed}")
+        for error in report.errors:
+            click.echo(f"  fila {error['row']} ({error['documento']}): {error['error']}", err=True)
+        if report.fatal:
+            raise click.ClickException(report.fatal)
+
+    @app.cli.command("seed")
+    @click.option("--scale", type=int, default=0, help="Clientes sintéticos a generar (habitaciones, reservas, archivos e ingresos en proporción).")
+    @click.option("--seed", type=int, default=42, help="Semilla: misma semilla y misma --today generan los mismos datos.")
+    @click.option("--today", type=click.DateTime(formats=["%Y-%m-%d"]), help="Fecha de referencia (por defecto hoy).")
+    @click.option("--batch-size", type=int, default=50000, help="Filas por transacción.")
+    @click.option("--fixtures", is_flag=True, help="Cargar también los datos de ejemplo de backend/data.")
+    def seed_command(scale, seed, today, batch_size, fixtures):
+        """Carga datos de ejemplo y genera datos sintéticos para pruebas de rendimiento."""
+        if fixtures:
+            counts = load_fixtures()
+            click.echo("Datos de ejemplo: " + ", ".join(f"{table} {n}" for table, n in counts.items()))
+        if scale > 0:
+            start = time.perf_counter()
+            counts = generate(scale, seed=seed, today=today, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            total = sum(counts.values())
+            click.echo("Generado: " + ", ".join(f"{table} {n}" for table, n in counts.items()) +
+                       f" ({total} filas en {elapsed:.1f} s)")
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -23,7 +24,70 @@ class Config:
     JWT_HEADER_TYPE = "Bearer"
     JWT_COOKIE_SECURE = False  # Cambiar a True en producción
 
+    # Configuración del scheduler
+    SCHEDULER_ENABLED = os.environ.get("HOTEL_SCHEDULER_ENABLED", "1") == "1"
+    SCHEDULER_LEASE_TTL = 30  # Segundos sin heartbeat tras los que otro proceso toma el liderazgo
+    SCHEDULER_LEASE_HEARTBEAT = 10  # Intervalo de renovación del lease
+
+    # Configuración de Socket.IO
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE")  # p. ej. redis://localhost:6379/0 con varios workers
+    SOCKETIO_DEBOUNCE_SECONDS = 2.0  # Ventana en la que se agrupan los eventos en un solo mensaje
+    SOCKETIO_ALERT_ROLES = ["admin", "user"]  # Roles que reciben las alertas de reservas
+
+    # Entrega de eventos generados por el worker: "direct" (Socket.IO / cola de mensajes) u "outbox"
+    EVENTS_TRANSPORT = os.environ.get("HOTEL_EVENTS_TRANSPORT", "direct")
+    OUTBOX_RELAY_ENABLED = EVENTS_TRANSPORT == "outbox"  # Los procesos web reenvían socket_outbox
+    OUTBOX_POLL_SECONDS = 1.0
+    OUTBOX_RETENTION_SECONDS = 300
+
+    # Importación masiva de clientes (POST /api/clients/import y flask import-clients)
+    IMPORT_BATCH_SIZE = 1000  # Registros validados y confirmados por transacción
+
+    # Archivado automático de reservas vencidas (tarea programada)
+    ARCHIVE_GRACE_DAYS = 7  # Días tras el check_out antes de mover la reserva a Archivo
+    ARCHIVE_BATCH_SIZE = 500  # Reservas por transacción
+
+    # Trabajos en segundo plano (reportes)
+    JOBS_MODE = os.environ.get("HOTEL_JOBS_MODE", "local")  # "local": pool de hilos del proceso web; "worker": los ejecuta backend.worker
+    JOBS_MAX_WORKERS = 2
+    JOBS_EAGER = False  # Ejecutar de forma síncrona (pruebas)
+    JOBS_RESULTS_DIR = os.path.join(BASE_DIR, "database", "jobs")
+
+    # Análisis en memoria (NumPy): antigüedad máxima antes de releer la tabla completa
+    ANALYTICS_MAX_STALENESS_SECONDS = 300
+    ANALYTICS_MAX_DAYS = 3660  # Días por consulta a /api/stats/revenue y /api/stats/occupancy-timeline
+    LOOKUP_MAX_STALENESS_SECONDS = 60  # Índice de autocompletado de clientes
+    KPI_CACHE_SECONDS = 300  # KPIs de meses cerrados (escrituras de otros procesos)
+    KPI_MAX_MONTHS = 120  # Meses por consulta a /api/stats/kpi
+    DASHBOARD_CACHE_SECONDS = 15  # /api/stats/dashboard: reutilizar la instantánea y max-age de la respuesta
+
+    # /api/batch: subpeticiones GET internas por lote e hilos para el modo paralelo
+    BATCH_MAX_REQUESTS = 20
+    BATCH_MAX_WORKERS = 4
+
+    # Sentencias SQL por petición: cabecera Server-Timing y aviso de posibles N+1
+    QUERY_STATS_ENABLED = True
+    QUERY_REPEAT_THRESHOLD = 10  # Repeticiones de una misma forma de sentencia antes de avisar
+
+    # Métricas en formato de Prometheus (GET /metrics)
+    METRICS_ENABLED = True
+    METRICS_TOKEN = os.environ.get("HOTEL_METRICS_TOKEN")  # Si se define, /metrics exige Authorization: Bearer <token>
+    METRICS_ALLOWED_ADDRS = ("127.0.0.1", "::1")  # Sin token, solo se atiende a estas direcciones
+    METRICS_PUBLIC = os.environ.get("HOTEL_METRICS_PUBLIC") == "1"  # Sin token ni restricción de origen (explícito)
+    METRICS_BUSY_WAIT_SECONDS = 0.1  # Escrituras más lentas se cuentan como espera por bloqueo de SQLite
+    METRICS_DIR = os.environ.get("HOTEL_METRICS_DIR")  # Directorio compartido para sumar los workers de gunicorn
+    METRICS_FLUSH_SECONDS = 5  # Cada cuánto vuelca cada worker sus valores en METRICS_DIR
+
+    # Perfilado bajo demanda (administradores: ?__profile=1 o cabecera X-Profile: 1)
+    PROFILING_ENABLED = True
+    PROFILE_RESULTS_DIR = os.path.join(BASE_DIR, "database", "profiles")
+    PROFILE_KEEP = 50  # Perfiles conservados; se eliminan los más antiguos
+
 class TestConfig(Config):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'  # Base de datos en memoria
     TESTING = True
-    JWT_SECRET_KEY = 'test_secret_key'  # Clave secreta para pruebas
\ No newline at end of file
+    JWT_SECRET_KEY = 'test_secret_key'  # Clave secreta para pruebas
+    SCHEDULER_ENABLED = False  # Las tareas programadas se prueban invocándolas directamente
+    JOBS_EAGER = True
+    JOBS_RESULTS_DIR = os.path.join(tempfile.gettempdir(), "hotel_spa_jobs")
+    PROFILE_RESULTS_DIR = os.path.join(tempfile.gettempdir(), "hotel_spa_profiles")
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""Agregar búsqueda FTS5 en clientes, reservas y archivos
+
+Revision ID: c7e1b5a9d3f2
+Revises: a4f3c9d2e8b5
+Create Date: 2026-10-19 15:03:26.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e1b5a9d3f2'
+down_revision = 'a4f3c9d2e8b5'
+branch_labels = None
+depends_on = None
+
+# Tablas FTS5 de contenido externo y columnas indexadas
+FTS_TABLES = {
+    "client_fts": ("client", ["nombre", "email", "documento", "telefono", "comentarios"]),
+    "booking_fts": ("booking", ["notas"]),
+    "archivo_fts": ("archivo", ["notas"]),
+}
+
+
+def upgrade():
+    # IF NOT EXISTS: create_all puede haber creado ya las tablas al arrancar la app
+    for fts, (source, columns) in FTS_TABLES.items():
+        cols = ", ".join(columns)
+        new = ", ".join(f"new.{c}" for c in columns)
+        old = ", ".join(f"old.{c}" for c in columns)
+        op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{source}', "
+                   f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN "
+                   f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN "
+                   f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END")
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} BEGIN "
+                   f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+                   f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END")
+        # Indexar las filas existentes
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    for fts in FTS_TABLES:
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -4,6 +4,10 @@ from .room import Room
 from .booking import Booking
 from .archive import Archivo
 from .income import Income
+from .scheduler_lease import SchedulerLease
+from .socket_outbox import SocketOutbox
+from .job import Job
+from .client_year_total import ClientYearTotal
 
 # Diccionario de modelos para acceso dinámico
 MODELS = {
@@ -7,7 +7,7 @@ class Archivo(db.Model):
     booking_id = db.Column(db.Integer, nullable=False)  # Referencia al ID original
     cliente_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
     habitacion_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False)
-    check_in = db.Column(db.DateTime, nullable=False)
+    check_in = db.Column(db.DateTime, nullable=False, index=True)
     check_out = db.Column(db.DateTime, nullable=False)
     tipo_habitacion = db.Column(db.String(50), nullable=False)
     num_huespedes = db.Column(db.Integer, nullable=False)
@@ -5,7 +5,7 @@ class Booking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     cliente_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
     habitacion_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False)
-    check_in = db.Column(db.DateTime, nullable=False)  # Cambiado a DateTime
+    check_in = db.Column(db.DateTime, nullable=False, index=True)  # Cambiado a DateTime
     check_out = db.Column(db.DateTime, nullable=False)  # Cambiado a DateTime
     tipo_habitacion = db.Column(db.String(50), nullable=False)
     num_huespedes = db.Column(db.Integer, nullable=False)
@@ -9,4 +9,11 @@ class Client(db.Model):
     fecha_nacimiento = db.Column(db.String(10), nullable=False)
     preferencias = db.Column(db.String(255), nullable=True)
     comentarios = db.Column(db.Text, nullable=True)
-    is_deleted = db.Column(db.Boolean, default=False, nullable=False)
\ No newline at end of file
+    is_deleted = db.Column(db.Boolean, default=False, nullable=False)
+
+    # Índices parciales: las consultas habituales solo ven clientes activos (is_deleted = 0)
+    __table_args__ = (
+        # Autocompletado y listados por nombre: cubre (id, nombre, documento)
+        db.Index('ix_client_active_nombre', 'nombre', 'documento', 'is_deleted',
+                 sqlite_where=db.text('is_deleted = 0')),
+    )
@@ -0,0 +1,22 @@
+from ..extensions import db
+
+class ClientYearTotal(db.Model):
+    __tablename__ = "client_year_totals"
+
+    # Gasto confirmado por cliente y año, mantenido al escribir en Income
+    cliente_id = db.Column(db.Integer, db.ForeignKey('client.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    transacciones = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    reservas_booking = db.Column(db.Integer, nullable=False, default=0)
+    reservas_archive = db.Column(db.Integer, nullable=False, default=0)
+
+    cliente = db.relationship("Client")
+
+    # Top-N de un año: recorrido del índice en orden descendente
+    __table_args__ = (
+        db.Index("ix_client_year_totals_year_total", "year", "total"),
+    )
+
+    def __repr__(self):
+        return f"<ClientYearTotal {self.cliente_id}/{self.year}: {self.total}>"
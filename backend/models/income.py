@@ -5,8 +5,8 @@ class Income(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     
     # Claves foráneas condicionales (Booking o Archive)
-    booking_id = db.Column(db.Integer, db.ForeignKey('booking.id'), nullable=True)
-    archive_id = db.Column(db.Integer, db.ForeignKey('archivo.id'), nullable=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('booking.id'), nullable=True, index=True)
+    archive_id = db.Column(db.Integer, db.ForeignKey('archivo.id'), nullable=True, index=True)
     
     # Datos del cliente (almacenados directamente para evitar joins)
     cliente_id = db.Column(db.Integer, db.ForeignKey('client.id'), nullable=False)
@@ -14,7 +14,7 @@ class Income(db.Model):
     documento = db.Column(db.String(20), nullable=False)
     
     # Datos del pago
-    fecha_pago = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+    fecha_pago = db.Column(db.DateTime, server_default=func.now(), nullable=False, index=True)
     monto = db.Column(db.Float, nullable=False)
     metodo_pago = db.Column(db.String(50), nullable=False)
     estado_pago = db.Column(db.String(20), nullable=False, default="confirmado")  # confirmado/reembolsado/anulado
@@ -31,6 +31,8 @@ class Income(db.Model):
             '(booking_id IS NOT NULL AND archive_id IS NULL) OR (booking_id IS NULL AND archive_id IS NOT NULL)',
             name='check_income_source'
         ),
+        # Estadísticas: estado_pago = 'confirmado' AND fecha_pago >= ? AND fecha_pago < ?
+        db.Index('ix_income_estado_pago_fecha_pago', 'estado_pago', 'fecha_pago'),
     )
 
     def __repr__(self):
@@ -0,0 +1,22 @@
+from sqlalchemy import func
+from ..extensions import db
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 en hexadecimal
+    name = db.Column(db.String(80), nullable=False)  # Nombre del reporte registrado
+    params = db.Column(db.Text, nullable=False, default="{}")  # Parámetros en JSON
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)  # queued/running/done/failed
+    progress = db.Column(db.Float, nullable=False, default=0.0)  # 0.0 - 1.0
+    message = db.Column(db.String(255), nullable=True)
+    result_path = db.Column(db.Text, nullable=True)
+    result_name = db.Column(db.String(255), nullable=True)  # Nombre del archivo para la descarga
+    error = db.Column(db.Text, nullable=True)
+    submitted_by = db.Column(db.String(120), nullable=True)
+    created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.id}: {self.name} ({self.status})>"
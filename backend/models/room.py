@@ -11,3 +11,13 @@ class Room(db.Model):
     vista = db.Column(db.String(50), nullable=True)
     notas = db.Column(db.Text, nullable=True)
     is_deleted = db.Column(db.Boolean, default=False, nullable=False)
+
+    # Índices parciales: las consultas habituales solo ven habitaciones activas (is_deleted = 0).
+    # is_deleted va como última columna para que SQLite pueda usarlos como índices cubrientes.
+    __table_args__ = (
+        # Conteos de ocupación: count(id) ... disponibilidad != 'Disponible'
+        db.Index('ix_room_active_disponibilidad', 'disponibilidad', 'is_deleted', sqlite_where=db.text('is_deleted = 0')),
+        # Selector de habitaciones ordenado por número, sin leer la tabla
+        db.Index('ix_room_active_num_habitacion', 'num_habitacion', 'tipo', 'capacidad', 'precio_noche',
+                 'disponibilidad', 'is_deleted', sqlite_where=db.text('is_deleted = 0')),
+    )
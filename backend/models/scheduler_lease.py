@@ -0,0 +1,14 @@
+from ..extensions import db
+
+class SchedulerLease(db.Model):
+    __tablename__ = "scheduler_lease"
+
+    # Un registro por recurso exclusivo (p. ej. "scheduler")
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(120), nullable=False)  # host:pid:token del proceso líder
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    heartbeat_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<SchedulerLease {self.name}: {self.holder} hasta {self.expires_at}>"
@@ -0,0 +1,17 @@
+from sqlalchemy import func
+from ..extensions import db
+
+class SocketOutbox(db.Model):
+    __tablename__ = "socket_outbox"
+    # AUTOINCREMENT evita reutilizar ids tras purgar, ya que los procesos web leen por id creciente
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # Eventos de Socket.IO generados fuera de los procesos web (worker) pendientes de reenvío
+    id = db.Column(db.Integer, primary_key=True)
+    event = db.Column(db.String(50), nullable=False)
+    rooms = db.Column(db.Text, nullable=False)  # Lista JSON de salas destino
+    payload = db.Column(db.Text, nullable=False)  # Payload JSON del evento
+    created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<SocketOutbox {self.id}: {self.event}>"
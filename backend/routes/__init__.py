@@ -7,6 +7,11 @@ from .invalid import invalid_bp
 from .archive import archive_bp
 from .income import income_bp
 from .stats import stats_bp
+from .jobs import jobs_bp
+from .search import search_bp
+from .batch import batch_bp
+from .metrics import metrics_bp
+from .profiles import profiles_bp
 
 
 
@@ -21,3 +26,8 @@ def register_blueprints(app):
     app.register_blueprint(invalid_bp)
     app.register_blueprint(income_bp)
     app.register_blueprint(stats_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(search_bp)
+    app.register_blueprint(batch_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(profiles_bp)
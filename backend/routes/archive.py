@@ -1,8 +1,12 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
-from ..models import Archivo
+from ..models import Archivo, Client, Room
+from ..utils.jobs import register_report, job_runner, job_to_dict
+from ..utils.date_range import date_range
+from ..utils.export import iter_rows, stream_csv, write_xlsx
 from datetime import datetime
+from sqlalchemy import select, func
 
 archive_bp = Blueprint('archive', __name__)
 
@@ -38,6 +42,70 @@ def get_all_archives():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+ARCHIVE_EXPORT_HEADER = [
+    "id", "booking_id", "cliente_id", "nombre_cliente", "documento", "habitacion_id",
+    "num_habitacion", "check_in", "check_out", "tipo_habitacion", "num_huespedes",
+    "metodo_pago", "valor_reservacion", "estado", "fecha_archivo", "notas"
+]
+
+def _archives_export_query(params):
+    """Consulta de exportación filtrada por rango de check_in (from/to inclusivos) y estado."""
+    rango = date_range(params)
+
+    stmt = select(
+        Archivo.id,
+        Archivo.booking_id,
+        Archivo.cliente_id,
+        Client.nombre,
+        Client.documento,
+        Archivo.habitacion_id,
+        Room.num_habitacion,
+        Archivo.check_in,
+        Archivo.check_out,
+        Archivo.tipo_habitacion,
+        Archivo.num_huespedes,
+        Archivo.metodo_pago,
+        Archivo.valor_reservacion,
+        Archivo.estado,
+        Archivo.fecha_archivo,
+        Archivo.notas
+    ).outerjoin(
+        Client, Client.id == Archivo.cliente_id
+    ).outerjoin(
+        Room, Room.id == Archivo.habitacion_id
+    ).order_by(Archivo.check_in, Archivo.id)
+
+    stmt = stmt.where(rango.filter(Archivo.check_in))
+    if params.get("estado"):
+        stmt = stmt.where(Archivo.estado == params["estado"])
+    return stmt
+
+@archive_bp.route("/api/archives/export", methods=["GET"])
+@jwt_required()
+def export_archives():
+    params = request.args.to_dict()
+    export_format = params.pop("format", "csv").lower()
+
+    try:
+        stmt = _archives_export_query(params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if export_format == "xlsx":
+        # El XLSX se genera en segundo plano y se descarga desde /api/jobs/<id>/download
+        job = job_runner.submit("archives_export_xlsx", params, submitted_by=get_jwt_identity())
+        db.session.refresh(job)
+        return jsonify(job_to_dict(job)), 202
+    if export_format != "csv":
+        return jsonify({"error": "Formato no soportado. Use csv o xlsx"}), 400
+
+    filename = f"archivos_{params.get('from', 'inicio')}_{params.get('to', 'hoy')}.csv"
+    return Response(
+        stream_with_context(stream_csv(ARCHIVE_EXPORT_HEADER, iter_rows(stmt))),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @archive_bp.route("/api/archives/<int:item_id>", methods=["GET"])
 @jwt_required()
 def get_archive(item_id):
@@ -128,4 +196,12 @@ def get_archives_by_client(cliente_id):
         return jsonify(resultado)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@register_report("archives_export_xlsx")
+def archives_export_xlsx_report(params, ctx):
+    """Exportación contable de reservas archivadas en XLSX con los mismos filtros que el CSV."""
+    stmt = _archives_export_query(params)
+    total = db.session.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar()
+    path = ctx.output_path(f"archivos_{params.get('from', 'inicio')}_{params.get('to', 'hoy')}.xlsx")
+    return write_xlsx(path, ARCHIVE_EXPORT_HEADER, iter_rows(stmt), total=total, ctx=ctx, sheet_title="Archivos")
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, jsonify, request, current_app
+from flask_jwt_extended import jwt_required
+from werkzeug.test import EnvironBuilder
+
+batch_bp = Blueprint('batch', __name__)
+
+BATCH_PATH = "/api/batch"
+
+
+def _dispatch(app, path, headers):
+    """Ejecuta un GET interno sin pasar por la red y devuelve (status, cuerpo)."""
+    builder = EnvironBuilder(path=path, method="GET", headers=headers)
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    with app.request_context(environ):
+        response = app.full_dispatch_request()
+        body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+        response.close()
+    return response.status_code, body
+
+
+def _run(app, path, headers):
+    try:
+        status, body = _dispatch(app, path, headers)
+    except Exception as e:
+        status, body = 500, {"error": str(e)}
+    return {"status": status, "body": body}
+
+
+def _run_in_context(app, path, headers):
+    # Cada hilo necesita su propio contexto de aplicación (y su propia sesión)
+    with app.app_context():
+        return _run(app, path, headers)
+
+
+@batch_bp.route(BATCH_PATH, methods=["POST"])
+@jwt_required()
+def batch():
+    """
+    Ejecuta varios GET internos en una sola petición. Cuerpo:
+    {"requests": ["/api/stats/quick-stats", {"id": "top", "path": "/api/stats/top-spenders?limit=5"}],
+     "parallel": false}
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get("requests")
+    parallel = bool(data.get("parallel", False))
+    max_requests = current_app.config.get("BATCH_MAX_REQUESTS", 20)
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "requests debe ser una lista no vacía"}), 400
+    if len(items) > max_requests:
+        return jsonify({"error": f"Máximo {max_requests} peticiones por lote"}), 400
+
+    paths = {}
+    for item in items:
+        key, path = (item.get("id"), item.get("path")) if isinstance(item, dict) else (item, item)
+        if not isinstance(path, str) or not path.startswith("/api/") or path.split("?")[0] == BATCH_PATH:
+            return jsonify({"error": f"Ruta no permitida en el lote: {path}"}), 400
+        if not isinstance(key, str) or key in paths:
+            return jsonify({"error": f"Identificador inválido o repetido: {key}"}), 400
+        paths[key] = path
+
+    # Las subpeticiones se autentican con el mismo token
+    headers = {"Authorization": request.headers.get("Authorization", "")}
+    app = current_app._get_current_object()
+
+    if parallel and len(paths) > 1:
+        workers = min(current_app.config.get("BATCH_MAX_WORKERS", 4), len(paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+            futures = {key: executor.submit(_run_in_context, app, path, headers) for key, path in paths.items()}
+            results = {key: future.result() for key, future in futures.items()}
+    else:
+        # En serie dentro del contexto de aplicación actual: comparten sesión y conexión
+        results = {key: _run(app, path, headers) for key, path in paths.items()}
+
+    return jsonify({"results": results})
@@ -1,10 +1,12 @@
 from zoneinfo import ZoneInfo
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required
 from ..extensions import db
 from ..models import Booking, Room, Archivo, Client, Income
 from datetime import datetime, timedelta, timezone
 from ..utils.helpers import remove_sensitive_fields
+from sqlalchemy.orm.attributes import set_committed_value
+from ..utils.archival import archive_state, archive_payment_state, archive_date
 
 booking_bp = Blueprint('booking', __name__)
 
@@ -226,14 +228,7 @@ def delete_booking(booking_id):
             return jsonify({"error": "Reserva no encontrada"}), 404
 
         # Determinar estado para el archivo
-        if booking.estado == "vencida":
-            estado_archivo = "vencida"
-        elif booking.estado == "pendiente":
-            estado_archivo = "cancelada"
-        elif booking.estado == "confirmada":
-            estado_archivo = "reembolso"
-        else:
-            estado_archivo = booking.estado
+        estado_archivo = archive_state(booking.estado)
 
         # Crear registro archivado
         archivo = Archivo(
@@ -248,7 +243,7 @@ def delete_booking(booking_id):
             notas=booking.notas or "",
             valor_reservacion=booking.valor_reservacion or 0.0,
             estado=estado_archivo,
-            fecha_archivo=datetime.now(ZoneInfo("America/Bogota")).replace(tzinfo=None)
+            fecha_archivo=archive_date()
         )
 
         db.session.add(archivo)
@@ -258,12 +253,10 @@ def delete_booking(booking_id):
         income_updated = False
         new_income = None
         
-        if booking.estado in ["confirmada", "vencida"]:
-            income = Income.query.filter_by(booking_id=booking.id).first()
+        estado_pago = archive_payment_state(booking.estado)
+        if estado_pago:
+            income = Income.query.filter_by(booking_id=booking.id).order_by(Income.id).first()
             if income:
-                # Determinar el estado del pago basado en el estado de la reserva
-                estado_pago = "confirmado" if booking.estado == "vencida" else "reembolso"
-                
                 # Crear nuevo registro de Income para el archivo
                 new_income = Income(
                     archive_id=archivo.id,
@@ -282,6 +275,11 @@ def delete_booking(booking_id):
                 db.session.delete(income)
                 income_updated = True
 
+        # Los demás ingresos pasan al archivo sin cambios: la reserva deja de existir
+        for income in Income.query.filter_by(booking_id=booking.id).order_by(Income.id):
+            income.booking = None
+            income.archive = archivo
+
         # Liberar habitación
         room = Room.query.get(booking.habitacion_id)
         if room:
@@ -309,6 +307,99 @@ def delete_booking(booking_id):
             "type": e.__class__.__name__
         }), 500
 
+@booking_bp.route("/api/bookings/archive", methods=["POST"])
+@jwt_required()
+def archive_bookings():
+    """
+    Check-out en bloque: archiva varias reservas en una sola transacción con los mismos
+    estados que DELETE /api/bookings/<id>. Cuerpo: {"ids": [1, 2, 3]}. Resultado por id.
+    """
+    data = request.get_json(silent=True) or {}
+    ids = data.get("ids")
+    max_ids = current_app.config.get("ARCHIVE_BATCH_SIZE", 500)
+
+    if not isinstance(ids, list) or not ids or not all(type(i) is int for i in ids):
+        return jsonify({"error": "ids debe ser una lista no vacía de enteros"}), 400
+    if len(ids) > max_ids:
+        return jsonify({"error": f"Máximo {max_ids} reservas por petición"}), 400
+    ids = list(dict.fromkeys(ids))
+
+    try:
+        # Filas relacionadas con una consulta IN por tabla
+        bookings = {b.id: b for b in Booking.query.filter(Booking.id.in_(ids))}
+        incomes = {}
+        for income in Income.query.filter(Income.booking_id.in_(list(bookings))).order_by(Income.id):
+            incomes.setdefault(income.booking_id, []).append(income)
+        room_ids = {b.habitacion_id for b in bookings.values()}
+        rooms = {r.id: r for r in Room.query.filter(Room.id.in_(room_ids))}
+
+        fecha_archivo = archive_date()
+        archivos = {}
+        for booking_id, booking in bookings.items():
+            archivos[booking_id] = Archivo(
+                booking_id=booking.id,
+                cliente_id=booking.cliente_id,
+                habitacion_id=booking.habitacion_id,
+                check_in=booking.check_in,
+                check_out=booking.check_out,
+                tipo_habitacion=booking.tipo_habitacion,
+                num_huespedes=booking.num_huespedes,
+                metodo_pago=booking.metodo_pago,
+                notas=booking.notas or "",
+                valor_reservacion=booking.valor_reservacion or 0.0,
+                estado=archive_state(booking.estado),
+                fecha_archivo=fecha_archivo
+            )
+        db.session.add_all(archivos.values())
+        db.session.flush()  # Ids de los archivos
+
+        results = {}
+        for booking_id in ids:
+            booking = bookings.get(booking_id)
+            if booking is None:
+                results[str(booking_id)] = {"status": "not_found"}
+                continue
+
+            archivo = archivos[booking_id]
+            estado_pago = archive_payment_state(booking.estado)
+            # La colección ya está cargada: eliminar la reserva no vuelve a consultar sus ingresos
+            set_committed_value(booking, "incomes", incomes.get(booking_id, []))
+            moved = list(booking.incomes)
+            for income in moved:
+                # Se reapunta el mismo ingreso al archivo (sin copiarlo)
+                income.booking = None
+                income.archive = archivo
+            # Como DELETE /api/bookings/<id>: solo el primer ingreso cambia de estado, si corresponde
+            updated = moved[0] if estado_pago and moved else None
+            if updated:
+                updated.estado_pago = estado_pago
+                updated.notas = f"Reserva archivada como {archivo.estado} (reserva #{booking_id})"
+
+            room = rooms.get(booking.habitacion_id)
+            if room:
+                room.disponibilidad = "Disponible"
+
+            db.session.delete(booking)
+            results[str(booking_id)] = {
+                "status": "archived",
+                "archived_id": archivo.id,
+                "archived_status": archivo.estado,
+                "income_updated": updated is not None,
+                "income_ids": [income.id for income in moved],
+                "income_status": updated.estado_pago if updated else None
+            }
+
+        db.session.commit()
+        return jsonify({"archived": len(bookings), "results": results}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "delete_failed",
+            "message": f"Error interno al archivar las reservas: {str(e)}",
+            "type": e.__class__.__name__
+        }), 500
+
 # Ruta para obtener reservas próximas a vencer
 @booking_bp.route("/api/bookings/alertas", methods=["GET"])
 @jwt_required()
@@ -1,7 +1,9 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required
 from ..extensions import db
 from ..models import Client
+from ..utils.lookup import client_lookup
+from ..utils.client_import import import_clients, IMPORT_FORMATS
 
 client_bp = Blueprint('client', __name__)
 
@@ -22,6 +24,43 @@ def get_all_clients():
         if column.name not in ['is_deleted']
     } for client in clients])
 
+@client_bp.route("/api/clients/lookup", methods=["GET"])
+@jwt_required()
+def lookup_clients():
+    """Autocompletado: id y etiqueta de los clientes cuyo nombre, apellido o documento empieza por prefix."""
+    prefix = request.args.get("prefix", "")
+    limit = request.args.get("limit", "10")
+    if not limit.isdigit() or not 1 <= int(limit) <= 100:
+        return jsonify({"error": "limit debe ser un entero entre 1 y 100"}), 400
+
+    try:
+        return jsonify(client_lookup.lookup(prefix, int(limit)))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@client_bp.route("/api/clients/import", methods=["POST"])
+@jwt_required()
+def import_clients_file():
+    """
+    Importación masiva: archivo JSON (arreglo como data/clients.json) o CSV, enviado como
+    multipart (campo file) o en el cuerpo. Inserta o actualiza por documento y reporta los errores por fila.
+    """
+    upload = request.files.get("file")
+    fmt = request.args.get("format")
+    if not fmt:
+        name = upload.filename if upload else ""
+        fmt = "csv" if name.lower().endswith(".csv") or request.mimetype == "text/csv" else "json"
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": f"format debe ser uno de {', '.join(IMPORT_FORMATS)}"}), 400
+
+    try:
+        stream = upload.stream if upload else request.stream
+        report = import_clients(stream, fmt, current_app.config.get("IMPORT_BATCH_SIZE", 1000))
+        return jsonify(report.to_dict()), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
 @client_bp.route("/api/clients/<int:item_id>", methods=["GET"])
 @jwt_required()
 def get_client(item_id):
@@ -1,8 +1,13 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
 from ..models import Income, Booking, Archivo, Client
+from ..utils.jobs import register_report, job_runner, job_to_dict
+from ..utils.date_range import DateRange, date_range
+from ..utils.export import iter_rows, stream_csv, write_xlsx
 from datetime import datetime
+from sqlalchemy import func, select, case
+import csv
 
 income_bp = Blueprint('income', __name__)
 
@@ -38,6 +43,60 @@ def get_all_incomes():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+INCOME_EXPORT_HEADER = [
+    "id", "origen", "origen_id", "cliente_id", "nombre_cliente", "documento",
+    "fecha_pago", "monto", "metodo_pago", "estado_pago", "notas"
+]
+
+def _incomes_export_query(params):
+    """Consulta de exportación filtrada por rango de fecha_pago (from/to inclusivos) y estado."""
+    rango = date_range(params)
+
+    stmt = select(
+        Income.id,
+        case((Income.booking_id.isnot(None), "booking"), else_="archive"),
+        func.coalesce(Income.booking_id, Income.archive_id),
+        Income.cliente_id,
+        Income.nombre_cliente,
+        Income.documento,
+        Income.fecha_pago,
+        Income.monto,
+        Income.metodo_pago,
+        Income.estado_pago,
+        Income.notas
+    ).order_by(Income.fecha_pago, Income.id)
+
+    stmt = stmt.where(rango.filter(Income.fecha_pago))
+    if params.get("estado"):
+        stmt = stmt.where(Income.estado_pago == params["estado"])
+    return stmt
+
+@income_bp.route("/api/incomes/export", methods=["GET"])
+@jwt_required()
+def export_incomes():
+    params = request.args.to_dict()
+    export_format = params.pop("format", "csv").lower()
+
+    try:
+        stmt = _incomes_export_query(params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if export_format == "xlsx":
+        # El XLSX se genera en segundo plano y se descarga desde /api/jobs/<id>/download
+        job = job_runner.submit("incomes_export_xlsx", params, submitted_by=get_jwt_identity())
+        db.session.refresh(job)
+        return jsonify(job_to_dict(job)), 202
+    if export_format != "csv":
+        return jsonify({"error": "Formato no soportado. Use csv o xlsx"}), 400
+
+    filename = f"ingresos_{params.get('from', 'inicio')}_{params.get('to', 'hoy')}.csv"
+    return Response(
+        stream_with_context(stream_csv(INCOME_EXPORT_HEADER, iter_rows(stmt))),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @income_bp.route("/api/incomes/<int:income_id>", methods=["GET"])
 @jwt_required()
 def get_income(income_id):
@@ -169,4 +228,37 @@ def get_incomes_by_status(estado):
         return jsonify(resultado)
     
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@register_report("incomes_monthly_summary")
+def incomes_monthly_summary_report(params, ctx):
+    """Totales de ingresos por mes, método y estado de pago para un año (CSV)."""
+    year = int(params.get("year") or datetime.now().year)
+    rango = DateRange.year(year)
+
+    rows = db.session.query(
+        func.strftime('%Y-%m', Income.fecha_pago).label('month'),
+        Income.metodo_pago,
+        Income.estado_pago,
+        func.count(Income.id),
+        func.sum(Income.monto)
+    ).filter(
+        rango.filter(Income.fecha_pago)
+    ).group_by('month', Income.metodo_pago, Income.estado_pago).order_by('month').all()
+    ctx.progress(0.5, "Consulta completada")
+
+    path = ctx.output_path(f"resumen_ingresos_{year}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["mes", "metodo_pago", "estado_pago", "transacciones", "total"])
+        for month, metodo, estado, count, total in rows:
+            writer.writerow([month, metodo, estado, count, round(float(total or 0.0), 2)])
+    return path
+
+@register_report("incomes_export_xlsx")
+def incomes_export_xlsx_report(params, ctx):
+    """Exportación contable de ingresos en XLSX con los mismos filtros que el CSV."""
+    stmt = _incomes_export_query(params)
+    total = db.session.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar()
+    path = ctx.output_path(f"ingresos_{params.get('from', 'inicio')}_{params.get('to', 'hoy')}.xlsx")
+    return write_xlsx(path, INCOME_EXPORT_HEADER, iter_rows(stmt), total=total, ctx=ctx, sheet_title="Ingresos")
@@ -0,0 +1,66 @@
+import os
+from flask import Blueprint, jsonify, request, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from ..extensions import db
+from ..models import Job
+from ..utils.jobs import REPORTS, JobError, job_runner, job_to_dict
+
+jobs_bp = Blueprint('jobs', __name__)
+
+def _get_visible_job(job_id):
+    """Devuelve el trabajo si pertenece al usuario actual o si es administrador."""
+    job = db.session.get(Job, job_id)
+    if not job:
+        return None
+    if get_jwt().get("role") != "admin" and job.submitted_by != get_jwt_identity():
+        return None
+    return job
+
+@jobs_bp.route("/api/jobs/reports", methods=["GET"])
+@jwt_required()
+def list_reports():
+    return jsonify({"reports": sorted(REPORTS)})
+
+@jobs_bp.route("/api/jobs", methods=["POST"])
+@jwt_required()
+def submit_job():
+    data = request.get_json(silent=True) or {}
+    name = data.get("name")
+    params = data.get("params") or {}
+
+    if not name:
+        return jsonify({"error": "Falta el campo obligatorio: name"}), 400
+    if not isinstance(params, dict):
+        return jsonify({"error": "params debe ser un objeto"}), 400
+
+    try:
+        job = job_runner.submit(name, params, submitted_by=get_jwt_identity())
+    except JobError as e:
+        return jsonify({"error": str(e), "reports": sorted(REPORTS)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Error interno: {str(e)}"}), 500
+
+    db.session.refresh(job)
+    return jsonify(job_to_dict(job)), 202
+
+@jobs_bp.route("/api/jobs/<string:job_id>", methods=["GET"])
+@jwt_required()
+def get_job(job_id):
+    job = _get_visible_job(job_id)
+    if not job:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    return jsonify(job_to_dict(job))
+
+@jobs_bp.route("/api/jobs/<string:job_id>/download", methods=["GET"])
+@jwt_required()
+def download_job_result(job_id):
+    job = _get_visible_job(job_id)
+    if not job:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    if job.status != "done":
+        return jsonify({"error": "El trabajo aún no ha terminado", "status": job.status}), 409
+    if not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({"error": "El archivo de resultado ya no está disponible"}), 410
+
+    return send_file(job.result_path, as_attachment=True, download_name=job.result_name)
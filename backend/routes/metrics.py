@@ -0,0 +1,21 @@
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
+from ..utils.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Métricas (de todos los workers si hay METRICS_DIR) en formato de Prometheus. Con
+    METRICS_TOKEN se exige Bearer <token>; sin él, solo desde METRICS_ALLOWED_ADDRS,
+    salvo que METRICS_PUBLIC lo abra explícitamente.
+    """
+    config = current_app.config
+    token = config.get("METRICS_TOKEN")
+    if token:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+            return jsonify({"error": "No autorizado"}), 401
+    elif not config.get("METRICS_PUBLIC") and request.remote_addr not in config.get("METRICS_ALLOWED_ADDRS", ()):
+        return jsonify({"error": "Acceso restringido: defina METRICS_TOKEN o METRICS_PUBLIC"}), 403
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,48 @@
+import os
+from flask import Blueprint, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt
+from ..utils.profiling import request_profiler
+
+profiles_bp = Blueprint('profiles', __name__)
+
+def _forbidden():
+    if get_jwt().get("role") != "admin":
+        return jsonify({"error": "Acceso denegado. Solo administradores pueden ver perfiles."}), 403
+    return None
+
+@profiles_bp.route("/api/profiles", methods=["GET"])
+@jwt_required()
+def list_profiles():
+    """Perfiles guardados con ?__profile=1 (o X-Profile: 1), del más reciente al más antiguo."""
+    denied = _forbidden()
+    if denied:
+        return denied
+    return jsonify({"profiles": request_profiler.recent()})
+
+@profiles_bp.route("/api/profiles/<string:profile_id>", methods=["GET"])
+@jwt_required()
+def get_profile(profile_id):
+    """Resumen: funciones con más tiempo acumulado y línea de tiempo de las sentencias SQL."""
+    denied = _forbidden()
+    if denied:
+        return denied
+    summary = request_profiler.load(profile_id)
+    if not summary:
+        return jsonify({"error": "Perfil no encontrado"}), 404
+    return jsonify(summary)
+
+@profiles_bp.route("/api/profiles/<string:profile_id>/download", methods=["GET"])
+@jwt_required()
+def download_profile(profile_id):
+    """Archivo .pstats (python -m pstats, snakeviz)."""
+    denied = _forbidden()
+    if denied:
+        return denied
+    try:
+        path = request_profiler.path(profile_id, "pstats")
+    except ValueError:
+        return jsonify({"error": "Perfil no encontrado"}), 404
+    if not os.path.exists(path):
+        return jsonify({"error": "Perfil no encontrado"}), 404
+    return send_file(path, as_attachment=True, download_name=f"{profile_id}.pstats",
+                     mimetype="application/octet-stream")
@@ -23,6 +23,27 @@ def get_all_rooms():
         if column.name not in ['is_deleted']  # Excluir campo técnico
     } for room in rooms])
 
+@room_bp.route("/api/rooms/options", methods=["GET"])
+@jwt_required()
+def get_room_options():
+    """Opciones para el selector de habitaciones: id, etiqueta y los datos que usa el formulario de reserva."""
+    only_available = request.args.get('disponibles', '').lower() == 'true'
+
+    query = db.session.query(
+        Room.id, Room.num_habitacion, Room.tipo, Room.capacidad, Room.precio_noche, Room.disponibilidad
+    ).filter(Room.is_deleted == False)
+    if only_available:
+        query = query.filter(Room.disponibilidad == "Disponible")
+
+    return jsonify([{
+        "id": room_id,
+        "label": f"Habitación {num} ({tipo})",
+        "tipo": tipo,
+        "capacidad": capacidad,
+        "precio_noche": precio_noche,
+        "disponible": disponibilidad == "Disponible"
+    } for room_id, num, tipo, capacidad, precio_noche, disponibilidad in query.order_by(Room.num_habitacion)])
+
 @room_bp.route("/api/rooms/<int:item_id>", methods=["GET"])
 @jwt_required()
 def get_room(item_id):
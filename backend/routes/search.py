@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from ..utils.search import search, SEARCH_TYPES
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route("/api/search", methods=["GET"])
+@jwt_required()
+def search_all():
+    """Búsqueda de texto completo en clientes, reservas y archivos, ordenada por relevancia."""
+    q = request.args.get("q", "").strip()
+    types = [t for t in request.args.get("type", "").split(",") if t] or list(SEARCH_TYPES)
+    page = request.args.get("page", "1")
+    per_page = request.args.get("per_page", "20")
+
+    if not q:
+        return jsonify({"error": "Falta el parámetro q"}), 400
+    if any(t not in SEARCH_TYPES for t in types):
+        return jsonify({"error": f"type debe ser uno de: {', '.join(SEARCH_TYPES)}"}), 400
+    if not page.isdigit() or not per_page.isdigit() or int(page) < 1 or not 1 <= int(per_page) <= 100:
+        return jsonify({"error": "page debe ser >= 1 y per_page estar entre 1 y 100"}), 400
+    page, per_page = int(page), int(per_page)
+
+    try:
+        results, total = search(q, types, page, per_page)
+        return jsonify({
+            "q": q,
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "results": results
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,36 @@
+from flask_socketio import join_room, ConnectionRefusedError
+from flask_jwt_extended import decode_token
+from ..extensions import socketio, logger
+from ..utils.notifier import STAFF_ROOM, role_room, desk_room
+from ..utils.metrics import metrics
+
+def register_socket_handlers():
+    @socketio.on("connect")
+    def handle_connect(auth=None):
+        """Autentica la conexión con el JWT y la une a las salas de su rol y puesto."""
+        token = (auth or {}).get("token")
+        if not token:
+            metrics.inc("hotel_socketio_connections_total", (("result", "rejected"),))
+            raise ConnectionRefusedError("Unauthorized")
+
+        try:
+            claims = decode_token(token)
+        except Exception as e:
+            logger.info(f"Conexión Socket.IO rechazada: {str(e)}")
+            metrics.inc("hotel_socketio_connections_total", (("result", "rejected"),))
+            raise ConnectionRefusedError("Unauthorized")
+
+        join_room(STAFF_ROOM)
+        join_room(role_room(claims.get("role", "user")))
+
+        desk = (auth or {}).get("desk")
+        if desk:
+            join_room(desk_room(desk))
+
+        metrics.inc("hotel_socketio_connections_total", (("result", "accepted"),))
+        metrics.inc("hotel_socketio_connections")
+
+    @socketio.on("disconnect")
+    def handle_disconnect(*args):
+        # Solo llegan aquí las conexiones aceptadas
+        metrics.inc("hotel_socketio_connections", value=-1)
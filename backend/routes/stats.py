@@ -1,15 +1,46 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required
 from ..extensions import db
-from ..models import Income, Booking, Client, Archivo, Room
+from ..models import Income, Booking, Client, Archivo, Room, ClientYearTotal
+from ..utils.helpers import parse_date
+from ..utils.date_range import DateRange, date_range, today, month_start, add_months
+from ..utils.jobs import register_report
+from ..analytics.revenue import revenue_series, GRANULARITIES, GROUP_FIELDS
+from ..analytics.occupancy import occupancy_timeline
+from ..analytics.kpi import monthly_kpis
+from ..analytics.lttb import downsample, MIN_POINTS
+from ..analytics.dashboard import dashboard_cache
 from datetime import datetime, timedelta
-from sqlalchemy import extract, func, case, Date
+from sqlalchemy import func
+import csv
 
 stats_bp = Blueprint('stats', __name__)
 
+def _max_points():
+    """Lee ?max_points= para reducir las series largas con LTTB (None = sin límite)."""
+    value = request.args.get("max_points")
+    if value is None or value == "":
+        return None
+    if not value.isdigit() or int(value) < MIN_POINTS:
+        raise ValueError(f"max_points debe ser un entero mayor o igual a {MIN_POINTS}")
+    return int(value)
+
+def _span_error(rango):
+    """Mensaje de error si el rango supera ANALYTICS_MAX_DAYS (las series se calculan por día en memoria)."""
+    max_days = current_app.config.get("ANALYTICS_MAX_DAYS", 3660)
+    if (rango.end - rango.start).days > max_days:
+        return f"El rango no puede superar {max_days} días"
+    return None
+
 @stats_bp.route("/api/stats/daily-revenue", methods=["GET"])
 @jwt_required()
 def get_daily_revenue():
+    try:
+        max_points = _max_points()
+        rango = date_range(request.args, default_start=today() - timedelta(days=30))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         # Consulta de ingresos diarios (booking + archive)
         booking_revenue = db.session.query(
@@ -19,7 +50,7 @@ def get_daily_revenue():
             Income, Income.booking_id == Booking.id
         ).filter(
             Income.estado_pago == 'confirmado',
-            Booking.check_in >= (datetime.now() - timedelta(days=30))
+            rango.filter(Booking.check_in)
         ).group_by('date')
         
         archive_revenue = db.session.query(
@@ -29,7 +60,7 @@ def get_daily_revenue():
             Income, Income.archive_id == Archivo.id
         ).filter(
             Income.estado_pago == 'confirmado',
-            Archivo.check_in >= (datetime.now() - timedelta(days=30))
+            rango.filter(Archivo.check_in)
         ).group_by('date')
         
         # Combinar resultados
@@ -47,21 +78,27 @@ def get_daily_revenue():
         
         result.sort(key=lambda x: x['time'])
         
-        return jsonify(result)
+        return jsonify(downsample(result, "revenue", max_points))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @stats_bp.route("/api/stats/daily-clients", methods=["GET"])
 @jwt_required()
 def get_daily_clients():
+    try:
+        max_points = _max_points()
+        rango = date_range(request.args, default_start=today() - timedelta(days=30))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         # Consulta de clientes diarios usando fecha_pago de Income
         clients_data = db.session.query(
             func.strftime('%Y-%m-%d', Income.fecha_pago).label('date'),
             func.count(func.distinct(Income.cliente_id)).label('clients')
         ).filter(
-            Income.fecha_pago >= (datetime.now() - timedelta(days=30)),
-            Income.estado_pago == 'confirmado'  # Solo pagos confirmados
+            Income.estado_pago == 'confirmado',  # Solo pagos confirmados
+            rango.filter(Income.fecha_pago)
         ).group_by(
             func.strftime('%Y-%m-%d', Income.fecha_pago)
         ).order_by(
@@ -73,7 +110,7 @@ def get_daily_clients():
             "clients": int(clients) if clients else 0
         } for date, clients in clients_data]
 
-        return jsonify(result)
+        return jsonify(downsample(result, "clients", max_points))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -82,7 +119,14 @@ def get_daily_clients():
 @jwt_required()
 def get_monthly_revenue():
     try:
-        # Consulta para ingresos mensuales (últimos 12 meses)
+        max_points = _max_points()
+        # Por defecto los últimos 12 meses, incluido el actual
+        rango = date_range(request.args, default_start=add_months(month_start(today()), -11))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        # Consulta para ingresos mensuales
         # Usando fecha_pago en lugar de check_in para reflejar cuando se recibió el pago
         booking_revenue = db.session.query(
             func.strftime('%Y-%m', Income.fecha_pago).label('month'),
@@ -90,7 +134,7 @@ def get_monthly_revenue():
         ).filter(
             Income.booking_id.isnot(None),
             Income.estado_pago == 'confirmado',
-            Income.fecha_pago >= (datetime.now() - timedelta(days=365))
+            rango.filter(Income.fecha_pago)
         ).group_by('month')
         
         archive_revenue = db.session.query(
@@ -99,7 +143,7 @@ def get_monthly_revenue():
         ).filter(
             Income.archive_id.isnot(None),
             Income.estado_pago == 'confirmado',
-            Income.fecha_pago >= (datetime.now() - timedelta(days=365))
+            rango.filter(Income.fecha_pago)
         ).group_by('month')
         
         # Combinar resultados
@@ -119,7 +163,7 @@ def get_monthly_revenue():
         
         result.sort(key=lambda x: x['time'])
         
-        return jsonify(result)
+        return jsonify(downsample(result, "value", max_points))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -127,18 +171,22 @@ def get_monthly_revenue():
 @stats_bp.route("/api/stats/current-month-payments", methods=["GET"])
 @jwt_required()
 def get_current_month_payments():
+    if request.args.get("year") and not request.args.get("month"):
+        return jsonify({"error": "month es obligatorio junto con year"}), 400
+    try:
+        mes = date_range(request.args) if request.args.get("year") else DateRange.month(today())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
-        today = datetime.now()
-        first_day_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
         # Consulta para todos los métodos de pago
         payments_data = db.session.query(
             Income.metodo_pago,
             func.sum(Income.monto).label('total'),
             func.count(Income.id).label('count')
         ).filter(
-            Income.fecha_pago >= first_day_of_month,
-            Income.estado_pago == 'confirmado'
+            Income.estado_pago == 'confirmado',
+            mes.filter(Income.fecha_pago)
         ).group_by(
             Income.metodo_pago
         ).all()
@@ -158,7 +206,7 @@ def get_current_month_payments():
             total_transactions += int(count) if count else 0
         
         return jsonify({
-            "month": today.strftime("%Y-%m"),
+            "month": mes.start.strftime("%Y-%m"),
             "payment_methods": payment_methods,
             "total": total,
             "total_transactions": total_transactions,
@@ -172,24 +220,24 @@ def get_current_month_payments():
 @jwt_required()
 def get_quick_stats():
     try:
-        today = datetime.now()
-        first_day_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        today_start = today.replace(hour=0, minute=0, second=0, microsecond=0)
+        now = datetime.now()
+        mes = DateRange.month(now)
+        hoy = DateRange.day(now)
         
         # 1. Ingresos este mes
         monthly_revenue = db.session.query(
             func.sum(Income.monto)
         ).filter(
-            Income.fecha_pago >= first_day_of_month,
-            Income.estado_pago == 'confirmado'
+            Income.estado_pago == 'confirmado',
+            mes.filter(Income.fecha_pago)
         ).scalar() or 0.0
         
         # 2. Clientes este mes (únicos) - BASADO EN PAGOS CONFIRMADOS
         monthly_clients = db.session.query(
             func.count(func.distinct(Income.cliente_id))
         ).filter(
-            Income.fecha_pago >= first_day_of_month,
-            Income.estado_pago == 'confirmado'
+            Income.estado_pago == 'confirmado',
+            mes.filter(Income.fecha_pago)
         ).scalar() or 0
         
         # 3. Ocupación actual
@@ -206,8 +254,8 @@ def get_quick_stats():
         today_payments = db.session.query(
             func.count(Income.id)
         ).filter(
-            Income.fecha_pago >= today_start,
-            Income.estado_pago == 'confirmado'
+            Income.estado_pago == 'confirmado',
+            hoy.filter(Income.fecha_pago)
         ).scalar() or 0
         
         return jsonify({
@@ -215,7 +263,7 @@ def get_quick_stats():
             "monthly_clients": int(monthly_clients),
             "occupancy_percentage": round(float(occupancy_percentage), 2),
             "today_payments": int(today_payments),
-            "last_updated": today.isoformat(),
+            "last_updated": now.isoformat(),
             "currency": "USD"
         })
         
@@ -225,39 +273,29 @@ def get_quick_stats():
 @stats_bp.route("/api/stats/top-spenders", methods=["GET"])
 @jwt_required()
 def get_top_spenders():
+    year = request.args.get("year", str(datetime.now().year))
+    limit = request.args.get("limit", "10")
+    if not year.isdigit() or not limit.isdigit() or not 1 <= int(limit) <= 100:
+        return jsonify({"error": "year debe ser un año y limit un entero entre 1 y 100"}), 400
+    year, limit = int(year), int(limit)
+
     try:
-        current_year = datetime.now().year
-        
+        # Lectura del índice (year, total) de client_year_totals, mantenida al escribir en Income
         top_spenders = db.session.query(
-            Income.cliente_id,
+            ClientYearTotal.cliente_id,
             Client.nombre,
             Client.documento,
-            func.count(Income.id).label('total_transacciones'),
-            func.sum(Income.monto).label('total_gastado'),
-            func.sum(
-                case(
-                    (Income.booking_id.isnot(None), 1),
-                    else_=0
-                )
-            ).label('reservas_booking'),
-            func.sum(
-                case(
-                    (Income.archive_id.isnot(None), 1),
-                    else_=0
-                )
-            ).label('reservas_archive')
+            ClientYearTotal.transacciones,
+            ClientYearTotal.total,
+            ClientYearTotal.reservas_booking,
+            ClientYearTotal.reservas_archive
         ).join(
-            Client, Client.id == Income.cliente_id
+            Client, Client.id == ClientYearTotal.cliente_id
         ).filter(
-            Income.estado_pago == 'confirmado',
-            extract('year', Income.fecha_pago) == current_year
-        ).group_by(
-            Income.cliente_id,
-            Client.nombre,
-            Client.documento
+            ClientYearTotal.year == year
         ).order_by(
-            func.sum(Income.monto).desc()
-        ).limit(10).all()
+            ClientYearTotal.total.desc()
+        ).limit(limit).all()
         
         result = [{
             "rank": idx + 1,
@@ -274,7 +312,7 @@ def get_top_spenders():
         } for idx, (cliente_id, nombre, documento, total_transacciones, total_gastado, reservas_booking, reservas_archive) in enumerate(top_spenders)]
         
         return jsonify({
-            "year": current_year,
+            "year": year,
             "top_clientes": result
         })
     
@@ -310,4 +348,166 @@ def get_current_occupancy():
             "porcentaje_ocupacion": 0.0,
             "unidad": "porcentaje",
             "error": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+@stats_bp.route("/api/stats/revenue", methods=["GET"])
+@jwt_required()
+def get_revenue():
+    """Ingresos confirmados por día, semana o mes, opcionalmente agrupados por método de pago."""
+    granularity = request.args.get("granularity", "day")
+    by = request.args.get("by") or None
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": f"granularity debe ser uno de: {', '.join(GRANULARITIES)}"}), 400
+    if by is not None and by not in GROUP_FIELDS:
+        return jsonify({"error": f"by debe ser uno de: {', '.join(GROUP_FIELDS)}"}), 400
+
+    try:
+        max_points = _max_points()
+        rango = date_range(request.args, default_end=today() + timedelta(days=1))
+        if rango.start is None:
+            rango = DateRange(rango.end - timedelta(days=31), rango.end)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if rango.end is None:
+        return jsonify({"error": "Indique también el parámetro to"}), 400
+    span_error = _span_error(rango)
+    if span_error:
+        return jsonify({"error": span_error}), 400
+    start, end = rango.start, rango.end
+
+    try:
+        buckets, revenue, counts, labels = revenue_series(start, end, granularity, by)
+        times = [str(b) for b in buckets]
+
+        result = dict(rango.to_dict(), granularity=granularity)
+        if by is None:
+            result["series"] = downsample([{
+                "time": t,
+                "revenue": round(float(r), 2),
+                "transactions": int(c)
+            } for t, r, c in zip(times, revenue, counts)], "revenue", max_points)
+        else:
+            result["by"] = by
+            result["groups"] = [{
+                "key": label,
+                "series": downsample([{
+                    "time": t,
+                    "revenue": round(float(r), 2),
+                    "transactions": int(c)
+                } for t, r, c in zip(times, revenue[i], counts[i])], "revenue", max_points)
+            } for i, label in enumerate(labels)]
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@stats_bp.route("/api/stats/occupancy-timeline", methods=["GET"])
+@jwt_required()
+def get_occupancy_timeline():
+    """Habitaciones ocupadas y porcentaje de ocupación por noche en un rango."""
+    try:
+        max_points = _max_points()
+        rango = date_range(request.args, default_start=today())
+        if rango.end is None:
+            rango = DateRange(rango.start, rango.start + timedelta(days=31))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if rango.start is None:
+        return jsonify({"error": "Indique también el parámetro from"}), 400
+    span_error = _span_error(rango)
+    if span_error:
+        return jsonify({"error": span_error}), 400
+
+    try:
+        nights, occupied, total_rooms = occupancy_timeline(rango.start, rango.end)
+        return jsonify({
+            **rango.to_dict(),
+            "total_habitaciones": total_rooms,
+            "series": downsample([{
+                "time": str(night),
+                "habitaciones_ocupadas": int(count),
+                "porcentaje_ocupacion": round(int(count) / total_rooms * 100, 2) if total_rooms else 0.0
+            } for night, count in zip(nights, occupied)], "habitaciones_ocupadas", max_points)
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@stats_bp.route("/api/stats/dashboard", methods=["GET"])
+@jwt_required()
+def get_dashboard():
+    """
+    Todos los widgets del dashboard en una sola instantánea consistente. Responde 304
+    si el cliente envía If-None-Match con el ETag vigente.
+    """
+    try:
+        max_points = _max_points()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        etag, widgets, generated_at = dashboard_cache.get(max_points)
+        response = jsonify({**widgets, "generated_at": generated_at.isoformat()})
+        # ETag débil: generated_at puede variar entre instantáneas con los mismos datos
+        response.set_etag(etag, weak=True)
+        response.cache_control.private = True
+        response.cache_control.max_age = dashboard_cache.max_age
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _parse_month(value):
+    """Convierte YYYY-MM (o una fecha completa) en el primer día del mes."""
+    if value and len(value) == 7:
+        value = f"{value}-01"
+    date = parse_date(value)
+    return month_start(date) if date else None
+
+@stats_bp.route("/api/stats/kpi", methods=["GET"])
+@jwt_required()
+def get_kpis():
+    """ADR, RevPAR y duración media de estancia por mes y tipo de habitación."""
+    try:
+        last = _parse_month(request.args.get("to")) or month_start(today())
+        first = _parse_month(request.args.get("from")) or add_months(last, -11)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if first > last:
+        return jsonify({"error": "from debe ser anterior o igual a to"}), 400
+    max_months = current_app.config.get("KPI_MAX_MONTHS", 120)
+    if (last.year - first.year) * 12 + last.month - first.month + 1 > max_months:
+        return jsonify({"error": f"El rango no puede superar {max_months} meses"}), 400
+
+    try:
+        return jsonify({
+            "from": first.strftime("%Y-%m"),
+            "to": last.strftime("%Y-%m"),
+            "meses": monthly_kpis(first, last)
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@register_report("stats_daily_revenue")
+def daily_revenue_report(params, ctx):
+    """Ingresos confirmados, transacciones y clientes únicos por día en un rango (CSV)."""
+    rango = date_range(params, default_end=today() + timedelta(days=1))
+    if rango.start is None:
+        rango = DateRange(rango.end - timedelta(days=366), rango.end)
+    start, end = rango.start, rango.end
+
+    rows = db.session.query(
+        func.date(Income.fecha_pago).label('date'),
+        func.sum(Income.monto).label('revenue'),
+        func.count(Income.id).label('transactions'),
+        func.count(func.distinct(Income.cliente_id)).label('clients')
+    ).filter(
+        Income.estado_pago == 'confirmado',
+        rango.filter(Income.fecha_pago)
+    ).group_by('date').order_by('date').all()
+    ctx.progress(0.5, "Consulta completada")
+
+    path = ctx.output_path(f"ingresos_diarios_{start:%Y%m%d}_{end - timedelta(days=1):%Y%m%d}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["fecha", "ingresos", "transacciones", "clientes"])
+        for date, revenue, transactions, clients in rows:
+            writer.writerow([date, round(float(revenue or 0.0), 2), transactions, clients])
+    return path
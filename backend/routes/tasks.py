@@ -1,55 +1,114 @@
 from datetime import datetime, timedelta
-from ..extensions import db, socketio, scheduler, logger
+from ..extensions import db, scheduler, logger
 from ..models import Booking, Room
+from ..utils.notifier import notifier, purge_outbox
+from ..utils.lease import leader
+from ..utils.jobs import job_runner
+from ..utils.archival import archive_expired_bookings
+from ..utils.metrics import metrics
+
+def procesar_vencimientos(ahora=None):
+    """
+    Notifica las reservas próximas a vencer y marca como vencidas las ya terminadas.
+    Devuelve el número de reservas procesadas.
+    """
+    ahora = ahora or datetime.now()
+    umbral = ahora + timedelta(minutes=10)
+    logger.info(f"Ejecutando verificación de reservas en {ahora.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    # 1. Verificar reservas próximas a vencer (para notificaciones)
+    proximas = Booking.query.filter(
+        Booking.check_out <= umbral,
+        Booking.check_out > ahora,
+        Booking.notificado == False,
+        Booking.estado != 'vencida'
+    ).all()
+
+    if proximas:
+        alertas = [{"id": r.id, "cliente": r.cliente.nombre, "vencimiento": r.check_out.isoformat()} for r in proximas]
+        logger.info(f"Reservas próximas a vencer: {len(alertas)}")
+        notifier.emit("alerta_proxima", {"alertas": alertas})
+
+        for reserva in proximas:
+            reserva.notificado = True
+        db.session.commit()
+
+    # 2. Procesar reservas vencidas
+    vencidas = Booking.query.filter(
+        Booking.check_out <= ahora
+    ).all()
+
+    if vencidas:
+        for reserva in vencidas:
+            # Cambiar estado de la reserva
+            reserva.estado = 'vencida'
+            
+            # Liberar la habitación
+            if reserva.habitacion:
+                habitacion = Room.query.get(reserva.habitacion.id)
+                if habitacion:
+                    habitacion.estado = 'disponible'
+        
+        db.session.commit()
+        
+        vencidas_data = [{"id": r.id, "cliente": r.cliente.nombre, "vencimiento": r.check_out.isoformat()} for r in vencidas]
+        logger.info(f"Reservas marcadas como vencidas: {len(vencidas)}")
+        notifier.emit("reserva_vencida", {"vencidas": vencidas_data})
+
+    return len(proximas) + len(vencidas)
+
 
 def register_tasks():
+    @scheduler.task('interval', id='scheduler_heartbeat', seconds=leader.heartbeat_interval,
+                    next_run_time=datetime.now())
+    def scheduler_heartbeat():
+        # Mantener el lease para que solo un proceso ejecute las tareas programadas
+        with scheduler.app.app_context():
+            leader.heartbeat()
+
     @scheduler.task('interval', id='verificar_reservas', minutes=1)
+    @leader.only
+    @metrics.job('verificar_reservas')
     def verificar_reservas():
         with scheduler.app.app_context():
             try:
-                ahora = datetime.now()
-                umbral = ahora + timedelta(minutes=10)
-                logger.info(f"Ejecutando verificación de reservas en {ahora.strftime('%Y-%m-%d %H:%M:%S')}")
-
-                # 1. Verificar reservas próximas a vencer (para notificaciones)
-                proximas = Booking.query.filter(
-                    Booking.check_out <= umbral,
-                    Booking.check_out > ahora,
-                    Booking.notificado == False,
-                    Booking.estado != 'vencida'
-                ).all()
-
-                if proximas:
-                    alertas = [{"id": r.id, "cliente": r.cliente.nombre, "vencimiento": r.check_out.isoformat()} for r in proximas]
-                    logger.info(f"Reservas próximas a vencer: {len(alertas)}")
-                    socketio.emit("alerta_proxima", {"alertas": alertas})
-
-                    for reserva in proximas:
-                        reserva.notificado = True
-                    db.session.commit()
-
-                # 2. Procesar reservas vencidas
-                vencidas = Booking.query.filter(
-                    Booking.check_out <= ahora
-                ).all()
-
-                if vencidas:
-                    for reserva in vencidas:
-                        # Cambiar estado de la reserva
-                        reserva.estado = 'vencida'
-                        
-                        # Liberar la habitación
-                        if reserva.habitacion:
-                            habitacion = Room.query.get(reserva.habitacion.id)
-                            if habitacion:
-                                habitacion.estado = 'disponible'
-                    
-                    db.session.commit()
-                    
-                    vencidas_data = [{"id": r.id, "cliente": r.cliente.nombre, "vencimiento": r.check_out.isoformat()} for r in vencidas]
-                    logger.info(f"Reservas marcadas como vencidas: {len(vencidas)}")
-                    socketio.emit("reserva_vencida", {"vencidas": vencidas_data})
-
+                return procesar_vencimientos()
             except Exception as e:
                 logger.error(f"Error al verificar reservas: {str(e)}")
-                db.session.rollback()
\ No newline at end of file
+                db.session.rollback()
+
+    @scheduler.task('interval', id='purgar_outbox', minutes=5)
+    @leader.only
+    @metrics.job('purgar_outbox')
+    def purgar_outbox():
+        with scheduler.app.app_context():
+            try:
+                eliminados = purge_outbox(scheduler.app.config.get('OUTBOX_RETENTION_SECONDS', 300))
+                if eliminados:
+                    logger.info(f"Eventos antiguos eliminados de socket_outbox: {eliminados}")
+                return eliminados
+            except Exception as e:
+                logger.error(f"Error al purgar socket_outbox: {str(e)}")
+
+    @scheduler.task('interval', id='archivar_reservas', hours=1)
+    @leader.only
+    @metrics.job('archivar_reservas')
+    def archivar_reservas():
+        with scheduler.app.app_context():
+            try:
+                archivadas = archive_expired_bookings()
+                if archivadas:
+                    logger.info(f"Reservas vencidas archivadas: {archivadas}")
+                return archivadas
+            except Exception as e:
+                logger.error(f"Error al archivar reservas vencidas: {str(e)}")
+
+    if job_runner.mode == "worker":
+        @scheduler.task('interval', id='procesar_jobs', seconds=2)
+        def procesar_jobs():
+            # Cada worker reclama trabajos de forma atómica, no requiere ser líder
+            with scheduler.app.app_context():
+                try:
+                    job_runner.poll()
+                except Exception as e:
+                    logger.error(f"Error al reclamar trabajos en cola: {str(e)}")
@@ -0,0 +1 @@
+# Scripts de operación y medición
@@ -0,0 +1,200 @@
+"""
+Prueba de carga que compara peticiones/segundo entre servidores.
+
+Levantar ambos servidores automáticamente y compararlos:
+
+    python -m backend.scripts.loadtest --spawn --duration 15 --concurrency 32
+
+O medir servidores ya en ejecución:
+
+    python -m backend.scripts.loadtest --target dev=http://127.0.0.1:5000 --target prod=http://127.0.0.1:8000
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+from ..utils.helpers import percentile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def login(base_url, email, password):
+    """Obtiene un token JWT del servidor indicado."""
+    url = urlsplit(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=10)
+    body = json.dumps({"email": email, "password": password})
+    conn.request("POST", "/api/auth/login", body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    data = json.loads(response.read() or b"{}")
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"Login fallido en {base_url}: {response.status} {data}")
+    return data["access_token"]
+
+
+def run_load(base_url, paths, token, concurrency, duration):
+    """Lanza `concurrency` hilos con conexiones keep-alive durante `duration` segundos."""
+    url = urlsplit(base_url)
+    headers = {"Authorization": f"Bearer {token}", "Connection": "keep-alive"}
+    deadline = time.perf_counter() + duration
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(offset):
+        conn = None
+        local_latencies = []
+        local_errors = 0
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            try:
+                if conn is None:
+                    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=30)
+                start = time.perf_counter()
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                local_latencies.append(time.perf_counter() - start)
+                if response.status >= 400:
+                    local_errors += 1
+                if response.getheader("Connection", "").lower() == "close":
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                if conn is not None:
+                    conn.close()
+                conn = None
+        if conn is not None:
+            conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def _wait_for_port(host, port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def spawn_servers(dev_port, prod_port, workers, threads):
+    """Arranca el servidor de desarrollo y el de producción como subprocesos."""
+    env = dict(os.environ, HOTEL_SCHEDULER_ENABLED="0")
+    dev_code = (
+        "from backend.app import create_app, init_db;"
+        "app = create_app(); init_db(app);"
+        f"app.run(port={dev_port}, debug=False, use_reloader=False)"
+    )
+    processes = {
+        "dev": subprocess.Popen([sys.executable, "-c", dev_code], cwd=ROOT_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL),
+        "prod": subprocess.Popen([sys.executable, "-m", "backend.serve",
+                                  "--bind", f"127.0.0.1:{prod_port}",
+                                  "--workers", str(workers), "--threads", str(threads),
+                                  "--log-level", "warning"],
+                                 cwd=ROOT_DIR, env=env,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL),
+    }
+    for name, port in (("dev", dev_port), ("prod", prod_port)):
+        if not _wait_for_port("127.0.0.1", port):
+            stop_servers(processes)
+            raise RuntimeError(f"El servidor {name} no respondió en el puerto {port}")
+    return processes
+
+
+def stop_servers(processes):
+    for process in processes.values():
+        process.terminate()
+    for process in processes.values():
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara peticiones/segundo entre servidores")
+    parser.add_argument("--target", action="append", default=[],
+                        help="nombre=url del servidor a medir (repetible)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Arranca el servidor de desarrollo y el de producción localmente")
+    parser.add_argument("--dev-port", type=int, default=5001)
+    parser.add_argument("--prod-port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=1, help="Workers del servidor de producción")
+    parser.add_argument("--threads", type=int, default=32, help="Hilos por worker de producción")
+    parser.add_argument("--path", action="append", default=[],
+                        help="Ruta GET a solicitar (repetible, por defecto /api/rooms)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--email", default="admin@hotel.com")
+    parser.add_argument("--password", default="123456")
+    parser.add_argument("--json", action="store_true", help="Imprime los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    targets = dict(t.split("=", 1) for t in args.target)
+    paths = args.path or ["/api/rooms"]
+    processes = {}
+    if args.spawn:
+        processes = spawn_servers(args.dev_port, args.prod_port, args.workers, args.threads)
+        targets.setdefault("dev", f"http://127.0.0.1:{args.dev_port}")
+        targets.setdefault("prod", f"http://127.0.0.1:{args.prod_port}")
+
+    if not targets:
+        parser.error("Indique al menos un --target o use --spawn")
+
+    results = {}
+    try:
+        for name, base_url in targets.items():
+            token = login(base_url, args.email, args.password)
+            results[name] = run_load(base_url, paths, token, args.concurrency, args.duration)
+    finally:
+        if processes:
+            stop_servers(processes)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'servidor':<10}{'peticiones':>12}{'errores':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['requests']:>12}{r['errors']:>10}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+    if "dev" in results and len(results) > 1 and results["dev"]["rps"]:
+        for name, r in results.items():
+            if name != "dev":
+                print(f"{name} / dev: {r['rps'] / results['dev']['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
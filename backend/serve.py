@@ -0,0 +1,114 @@
+"""
+Punto de entrada de producción.
+
+Ejecuta la aplicación con Gunicorn usando workers de hilos (gthread), compatibles
+con Flask-SocketIO en modo threading:
+
+    python -m backend.serve --workers 1 --threads 64 --bind 0.0.0.0:8000
+
+Todas las opciones pueden definirse también con variables de entorno HOTEL_*.
+Con más de un worker, Socket.IO necesita sesiones persistentes en el balanceador
+y una cola de mensajes (SOCKETIO_MESSAGE_QUEUE) para compartir eventos, y /metrics
+suma los valores de todos los workers a través de METRICS_DIR (un directorio
+temporal si no se define HOTEL_METRICS_DIR).
+"""
+import argparse
+import os
+import tempfile
+from gunicorn.app.base import BaseApplication
+from .app import create_app, init_db
+from .config import Config
+from .extensions import logger
+from .utils.metrics import reset_directory
+
+
+class HotelServer(BaseApplication):
+    """Aplicación Gunicorn embebida que crea la app Flask en cada worker."""
+
+    def __init__(self, options, config_class=Config):
+        self.options = options
+        self.config_class = config_class
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return create_app(self.config_class)
+
+
+def _env(name, default):
+    return os.environ.get(f"HOTEL_{name}", default)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de producción de Hotel SPA")
+    parser.add_argument("--bind", default=_env("BIND", "0.0.0.0:8000"),
+                        help="Dirección host:puerto de escucha")
+    parser.add_argument("--workers", type=int, default=int(_env("WORKERS", 1)),
+                        help="Número de procesos worker")
+    parser.add_argument("--threads", type=int, default=int(_env("THREADS", 32)),
+                        help="Hilos por worker (cada WebSocket abierto ocupa uno)")
+    parser.add_argument("--keepalive", type=int, default=int(_env("KEEPALIVE", 5)),
+                        help="Segundos que se mantiene abierta una conexión keep-alive")
+    parser.add_argument("--backlog", type=int, default=int(_env("BACKLOG", 2048)),
+                        help="Conexiones pendientes máximas en la cola del socket")
+    parser.add_argument("--timeout", type=int, default=int(_env("TIMEOUT", 60)),
+                        help="Segundos antes de reiniciar un worker bloqueado")
+    parser.add_argument("--max-requests", type=int, default=int(_env("MAX_REQUESTS", 0)),
+                        help="Reinicia el worker tras N peticiones (0 = nunca)")
+    parser.add_argument("--log-level", default=_env("LOG_LEVEL", "info"))
+    parser.add_argument("--skip-init-db", action="store_true",
+                        help="No crear tablas ni el usuario administrador al iniciar")
+    return parser.parse_args(argv)
+
+
+def build_options(args):
+    """Traduce los argumentos de la línea de comandos a opciones de Gunicorn."""
+    return {
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "gthread",
+        "threads": args.threads,
+        "keepalive": args.keepalive,
+        "backlog": args.backlog,
+        "timeout": args.timeout,
+        "graceful_timeout": args.timeout,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests // 10 if args.max_requests else 0,
+        "loglevel": args.log_level,
+        "accesslog": "-",
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.workers > 1 and not Config.SOCKETIO_MESSAGE_QUEUE:
+        logger.warning("Con varios workers Socket.IO requiere SOCKETIO_MESSAGE_QUEUE y sesiones persistentes")
+
+    if not args.skip_init_db:
+        # Inicializar la base de datos una sola vez en el proceso maestro, sin scheduler
+        class InitConfig(Config):
+            SCHEDULER_ENABLED = False
+            OUTBOX_RELAY_ENABLED = False
+            METRICS_DIR = None
+
+        init_db(create_app(InitConfig))
+
+    metrics_dir = Config.METRICS_DIR
+    if args.workers > 1 and not metrics_dir:
+        metrics_dir = tempfile.mkdtemp(prefix="hotel_spa_metrics_")
+    if metrics_dir:
+        reset_directory(metrics_dir)
+
+    class ServeConfig(Config):
+        METRICS_DIR = metrics_dir
+
+    HotelServer(build_options(args), ServeConfig).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -326,6 +326,26 @@ document.addEventListener("DOMContentLoaded", function () {
         return dateRangePickerInstance;
     }
 
+    // Consulta /api/clients/lookup mientras se escribe en el selector de clientes
+    function habilitarBusquedaClientes(nombreSelect, token) {
+        let timeout = null;
+        nombreSelect.addEventListener('search', (event) => {
+            clearTimeout(timeout);
+            const prefix = event.detail.value;
+            timeout = setTimeout(() => {
+                fetch(`/api/clients/lookup?prefix=${encodeURIComponent(prefix)}&limit=20`, {
+                    headers: { Authorization: `Bearer ${token}` }
+                })
+                .then(response => response.json())
+                .then(data => {
+                    const choices = choicesInstances["#nombreBooking"];
+                    if (choices) choices.setChoices(data, 'id', 'label', true);
+                })
+                .catch(error => console.error("Error al buscar clientes:", error));
+            }, 200);
+        });
+    }
+
     // Función para cargar clientes y habitaciones desde la API
     function cargarClientesYHabitaciones() {
         const token = localStorage.getItem("access_token");
@@ -334,8 +354,8 @@ document.addEventListener("DOMContentLoaded", function () {
             return;
         }
 
-        // Cargar clientes
-        fetch("/api/clients", {
+        // Cargar clientes: primeras opciones y búsqueda por prefijo en el servidor
+        fetch("/api/clients/lookup?limit=50", {
             headers: { Authorization: `Bearer ${token}` }
         })
         .then(response => response.json())
@@ -347,17 +367,18 @@ document.addEventListener("DOMContentLoaded", function () {
             data.forEach(cliente => {
                 let option = document.createElement("option");
                 option.value = cliente.id;
-                option.textContent = cliente.nombre;
+                option.textContent = cliente.label;
                 option.setAttribute('data-client-id', cliente.id);
                 nombreSelect.appendChild(option);
             });
 
             inicializarChoices("#nombreBooking");
+            habilitarBusquedaClientes(nombreSelect, token);
         })
         .catch(error => console.error("Error al cargar clientes:", error));
 
-        // Cargar habitaciones
-        fetch("/api/rooms", {
+        // Cargar habitaciones disponibles
+        fetch("/api/rooms/options?disponibles=true", {
             headers: { Authorization: `Bearer ${token}` }
         })
         .then(response => response.json())
@@ -373,18 +394,14 @@ document.addEventListener("DOMContentLoaded", function () {
             placeholderOption.selected = true;
             habitacionSelect.appendChild(placeholderOption);
 
-            // Filtrar solo habitaciones disponibles
-            const habitacionesDisponibles = data.filter(hab => hab.disponibilidad === "Disponible");
-            console.log("Habitaciones disponibles:", habitacionesDisponibles);
-            
-            // Guardar en localStorage para uso posterior
-            localStorage.setItem("habitaciones", JSON.stringify(habitacionesDisponibles));
+            // Guardar en localStorage para uso posterior (tipo, capacidad y precio)
+            localStorage.setItem("habitaciones", JSON.stringify(data));
 
             // Llenar el select
-            habitacionesDisponibles.forEach(hab => {
+            data.forEach(hab => {
                 let option = document.createElement("option");
                 option.value = hab.id;
-                option.textContent = `Habitación ${hab.num_habitacion}`;
+                option.textContent = hab.label;
                 option.setAttribute('data-habitacion-id', hab.id);
                 habitacionSelect.appendChild(option);
             });
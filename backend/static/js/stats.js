@@ -25,8 +25,67 @@
     return '$' + formatNumber(amount, decimals);
   }
 
+  // Limita los puntos de una serie al ancho del gráfico (el servidor aplica LTTB)
+  function seriesEndpoint(endpoint, element) {
+    const maxPoints = Math.max(Math.floor((element.clientWidth || 0) / 2), 50);
+    return `${endpoint}?max_points=${maxPoints}`;
+  }
+
+  // Endpoint que usa cada gráfico (los de series se limitan al ancho del elemento)
+  const chartEndpoints = {
+    "chart-clients": (element) => seriesEndpoint("/api/stats/daily-clients", element),
+    "chart-revenue": (element) => seriesEndpoint("/api/stats/daily-revenue", element),
+    "chart-occupancy": () => "/api/stats/current-occupancy",
+    "chart-revenue-daily": (element) => seriesEndpoint("/api/stats/daily-revenue", element),
+    "chart-revenue-monthly": () => "/api/stats/monthly-revenue",
+    "chart-payments": () => "/api/stats/current-month-payments",
+  };
+
+  // Respuestas obtenidas por adelantado con /api/batch (se consumen una sola vez)
+  const prefetched = new Map();
+
+  // Pide en una sola petición los datos de todos los gráficos visibles de la página
+  async function prefetchPage(page) {
+    const token = localStorage.getItem("access_token");
+    if (!token) return;
+
+    const endpoints = new Set();
+    (pageCharts[page] || []).forEach((chartId) => {
+      const element = document.getElementById(chartId);
+      if (element && chartEndpoints[chartId]) endpoints.add(chartEndpoints[chartId](element));
+    });
+    if (page === "cashier") endpoints.add("/api/stats/quick-stats");
+    if (endpoints.size === 0) return;
+
+    try {
+      const response = await fetch("/api/batch", {
+        method: "POST",
+        headers: {
+          Authorization: `Bearer ${token}`,
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ requests: [...endpoints] }),
+      });
+      if (!response.ok) throw new Error(`Error en la respuesta: ${response.status}`);
+
+      const { results } = await response.json();
+      Object.entries(results).forEach(([endpoint, result]) => {
+        if (result.status === 200) prefetched.set(endpoint, result.body);
+      });
+    } catch (error) {
+      // Si falla el lote, cada gráfico hace su propia petición
+      console.error("Error al obtener datos en lote:", error);
+    }
+  }
+
   // Función para obtener datos de la API con JWT
   async function fetchChartData(endpoint) {
+    if (prefetched.has(endpoint)) {
+      const data = prefetched.get(endpoint);
+      prefetched.delete(endpoint);
+      return data;
+    }
+
     try {
       const token = localStorage.getItem("access_token");
       if (!token) {
@@ -116,7 +175,7 @@
   const chartInitializers = {
     // Gráficos del Dashboard
     "chart-clients": async function (element) {
-      const data = await fetchChartData("/api/stats/daily-clients");
+      const data = await fetchChartData(chartEndpoints["chart-clients"](element));
       if (!data) return false;
 
       const formattedData = data.map((item) => ({
@@ -134,7 +193,7 @@
       });
     },
     "chart-revenue": async function (element) {
-      const data = await fetchChartData("/api/stats/daily-revenue");
+      const data = await fetchChartData(chartEndpoints["chart-revenue"](element));
       if (!data) return false;
 
       const formattedData = data.map((item) => ({
@@ -152,7 +211,7 @@
       });
     },
     "chart-occupancy": async function (element) {
-      const data = await fetchChartData("/api/stats/current-occupancy");
+      const data = await fetchChartData(chartEndpoints["chart-occupancy"](element));
       console.log(data);
       if (!data) return false;
 
@@ -203,7 +262,7 @@
     },
     // Gráficos del Cashier
     "chart-revenue-daily": async function (element) {
-      const data = await fetchChartData("/api/stats/daily-revenue");
+      const data = await fetchChartData(chartEndpoints["chart-revenue-daily"](element));
       if (!data) return false;
 
       const formattedData = data.map((item) => ({
@@ -221,7 +280,7 @@
       });
     },
     "chart-revenue-monthly": async function (element) {
-      const data = await fetchChartData("/api/stats/monthly-revenue");
+      const data = await fetchChartData(chartEndpoints["chart-revenue-monthly"](element));
       if (!data) return false;
 
       return initializeLightweightChart(element, {
@@ -234,7 +293,7 @@
       });
     },
     "chart-payments": async function (element) {
-      const data = await fetchChartData("/api/stats/current-month-payments");
+      const data = await fetchChartData(chartEndpoints["chart-payments"](element));
       if (!data) return false;
 
       const paymentMethods = data.payment_methods;
@@ -659,6 +718,8 @@
       const currentPage = window.location.hash.replace("#", "") || "dashboard";
       console.log(`Inicializando gráficos para página: ${currentPage}`);
 
+      await prefetchPage(currentPage);
+
       const chartsToInitialize = pageCharts[currentPage] || [];
       for (const chartId of chartsToInitialize) {
         if (document.getElementById(chartId)) {
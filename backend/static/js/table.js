@@ -714,6 +714,18 @@ async function prepareBookingModalForEdit(booking, form) {
       });
       choicesInstances.nombreBooking.setChoiceByValue(booking.cliente_id?.toString());
 
+      // Búsqueda de clientes por prefijo en el servidor
+      let searchTimeout = null;
+      clienteSelect.addEventListener('search', (e) => {
+        clearTimeout(searchTimeout);
+        searchTimeout = setTimeout(async () => {
+          const res = await fetch(`/api/clients/lookup?prefix=${encodeURIComponent(e.detail.value)}&limit=20`, {
+            headers: { Authorization: `Bearer ${token}` }
+          });
+          if (res.ok) choicesInstances.nombreBooking.setChoices(await res.json(), 'id', 'label', true);
+        }, 200);
+      });
+
       // Selector de habitaciones
       choicesInstances.num_habitacion = new Choices(habitacionSelect, {
         removeItemButton: true,
@@ -730,27 +742,30 @@ async function prepareBookingModalForEdit(booking, form) {
     };
 
     // 5. Cargar datos iniciales
-    const [clientes, habitaciones] = await Promise.all([
-      fetch("/api/clients", { headers: { Authorization: `Bearer ${token}` } }).then(res => res.json()),
-      fetch("/api/rooms", { headers: { Authorization: `Bearer ${token}` } }).then(res => res.json())
+    const [clientes, clienteActual, habitaciones] = await Promise.all([
+      fetch("/api/clients/lookup?limit=50", { headers: { Authorization: `Bearer ${token}` } }).then(res => res.json()),
+      fetch(`/api/clients/${booking.cliente_id}`, { headers: { Authorization: `Bearer ${token}` } }).then(res => res.ok ? res.json() : null),
+      fetch("/api/rooms/options", { headers: { Authorization: `Bearer ${token}` } }).then(res => res.json())
     ]);
 
+    // El cliente de la reserva siempre debe estar entre las opciones
+    if (clienteActual && !clientes.some(c => c.id === clienteActual.id)) {
+      clientes.unshift({ id: clienteActual.id, label: `${clienteActual.nombre} (${clienteActual.documento})` });
+    }
+
     localStorage.setItem("habitaciones", JSON.stringify(habitaciones));
 
     // 6. Llenar selects
     clienteSelect.innerHTML = '';
     clientes.forEach(cliente => {
-      const option = new Option(cliente.nombre, cliente.id);
+      const option = new Option(cliente.label, cliente.id);
       clienteSelect.add(option);
     });
 
     habitacionSelect.innerHTML = '';
     habitaciones.forEach(hab => {
-      const option = new Option(
-        `Habitación ${hab.num_habitacion} (${hab.tipo})`, 
-        hab.id
-      );
-      option.disabled = !(hab.id === booking.habitacion_id) && hab.disponibilidad !== "Disponible";
+      const option = new Option(hab.label, hab.id);
+      option.disabled = !(hab.id === booking.habitacion_id) && !hab.disponible;
       if (hab.id === booking.habitacion_id) {
         option.selected = true;
         option.text += " (Actual)";
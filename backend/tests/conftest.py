@@ -1,4 +1,5 @@
 import pytest
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from flask_jwt_extended import create_access_token
 
@@ -10,6 +11,7 @@ from backend.models.client import Client
 from backend.models.room import Room
 from backend.models.booking import Booking
 from backend.config import TestConfig  # Importar TestConfig directamente
+from backend.utils.query_stats import capture
 
 @pytest.fixture(scope="session")
 def app():
@@ -80,4 +82,20 @@ def db_session(app):
     """Fixture que provee una sesión de base de datos para tests"""
     with app.app_context():
         yield db.session
-        db.session.rollback()  # Limpieza después de cada test
\ No newline at end of file
+        db.session.rollback()  # Limpieza después de cada test
+
+@pytest.fixture
+def query_budget():
+    """
+    Presupuesto de sentencias SQL para un bloque:
+
+        with query_budget(3) as log:
+            client.get("/api/rooms", headers=...)
+    """
+    @contextmanager
+    def budget(max_queries):
+        with capture() as log:
+            yield log
+        shapes = "\n".join(f"  {n}x {shape[:150]}" for shape, n in log.shapes.most_common(5))
+        assert log.count <= max_queries, f"{log.count} sentencias SQL (presupuesto {max_queries}):\n{shapes}"
+    return budget
@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from backend.models import Income, Archivo, Booking, Client, Room, ClientYearTotal
+from backend.utils.archival import archive_expired_bookings
+from backend.utils.client_totals import rebuild_client_year_totals
+
+NOW = datetime(2024, 6, 30, 12)
+
+@pytest.fixture
+def expired(session):
+    """Reservas vencidas hace 10 días (con pago), una vencida ayer y una confirmada."""
+    client = Client(nombre="Cliente Archivo", email="archivo@test.com", telefono="555",
+                    documento="ARC001", fecha_nacimiento="1990-01-01")
+    room = Room(num_habitacion=970, tipo="Suite", capacidad=2, precio_noche=100.0)
+    session.add_all([client, room])
+    session.flush()
+
+    def booking(check_out, estado, notas=None):
+        return Booking(cliente_id=client.id, habitacion_id=room.id, check_in=check_out - timedelta(days=2),
+                       check_out=check_out, tipo_habitacion="Suite", num_huespedes=2, metodo_pago="Tarjeta",
+                       estado=estado, valor_reservacion=200.0, notas=notas)
+
+    old = [booking(NOW - timedelta(days=10), "vencida", notas=f"Reserva {i}") for i in range(5)]
+    recent = booking(NOW - timedelta(days=1), "vencida")
+    active = booking(NOW - timedelta(days=10), "confirmada")
+    session.add_all(old + [recent, active])
+    session.flush()
+    for b in old + [active]:
+        session.add(Income(booking_id=b.id, cliente_id=client.id, nombre_cliente=client.nombre,
+                           documento=client.documento, fecha_pago=b.check_in, monto=200.0, metodo_pago="Tarjeta"))
+    session.commit()
+    return client, [b.id for b in old], recent.id, active.id
+
+def test_archives_expired_bookings_in_chunks(session, expired):
+    """Solo se archivan las vencidas fuera del periodo de gracia, en lotes, con sus ingresos reapuntados."""
+    client, old_ids, recent_id, active_id = expired
+
+    assert archive_expired_bookings(grace_days=7, batch_size=2, now=NOW) == 5
+    assert set(session.scalars(select(Booking.id))) == {recent_id, active_id}
+
+    archivos = session.scalars(select(Archivo).order_by(Archivo.booking_id)).all()
+    assert [a.booking_id for a in archivos] == old_ids
+    assert {a.estado for a in archivos} == {"vencida"}
+    assert archivos[0].notas == "Reserva 0"
+
+    incomes = session.scalars(select(Income).where(Income.archive_id.isnot(None))).all()
+    assert sorted((i.archive_id, i.booking_id) for i in incomes) == sorted((a.id, None) for a in archivos)
+
+    # Los totales ajustados en bloque coinciden con un recálculo completo
+    row = session.get(ClientYearTotal, (client.id, 2024))
+    adjusted = (row.transacciones, row.total, row.reservas_booking, row.reservas_archive)
+    assert adjusted == (6, 1200.0, 1, 5)
+    rebuild_client_year_totals()
+    row = session.get(ClientYearTotal, (client.id, 2024))
+    session.refresh(row)
+    assert (row.transacciones, row.total, row.reservas_booking, row.reservas_archive) == adjusted
+
+    assert archive_expired_bookings(grace_days=7, batch_size=2, now=NOW) == 0
+
+def test_reused_booking_id_points_to_new_archive(session, expired):
+    """Si ya existe un archivo con el mismo booking_id, el ingreso apunta al archivo nuevo."""
+    client, old_ids, _, _ = expired
+    room_id = session.scalars(select(Room.id)).one()
+    stale = Archivo(booking_id=old_ids[0], cliente_id=client.id, habitacion_id=room_id, check_in=datetime(2020, 1, 1),
+                    check_out=datetime(2020, 1, 2), tipo_habitacion="Suite", num_huespedes=1,
+                    metodo_pago="Efectivo", estado="cancelada", fecha_archivo=datetime(2020, 1, 2))
+    session.add(stale)
+    session.commit()
+
+    archive_expired_bookings(grace_days=7, now=NOW)
+    income = session.scalars(select(Income).join(Archivo, Archivo.id == Income.archive_id)
+                             .where(Archivo.booking_id == old_ids[0])).one()
+    assert income.archive_id != stale.id
@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime
+from backend.models import Income, Booking, Client, Room, ClientYearTotal
+from backend.utils.client_totals import rebuild_client_year_totals
+
+@pytest.fixture
+def spender(session):
+    """Cliente con una reserva y una habitación para registrar ingresos."""
+    client = Client(nombre="Cliente Gasto", email="gasto@test.com", telefono="555",
+                    documento="GAS001", fecha_nacimiento="1990-01-01")
+    room = Room(num_habitacion=930, tipo="Suite", capacidad=2, precio_noche=100.0)
+    session.add_all([client, room])
+    session.flush()
+    booking = Booking(cliente_id=client.id, habitacion_id=room.id, check_in=datetime(2024, 5, 1),
+                      check_out=datetime(2024, 5, 3), tipo_habitacion="Suite", num_huespedes=2,
+                      metodo_pago="Tarjeta", estado="confirmada", valor_reservacion=200.0)
+    session.add(booking)
+    session.commit()
+    return client, booking
+
+def add_income(session, client, booking, monto, fecha=datetime(2024, 5, 1), estado="confirmado"):
+    income = Income(booking_id=booking.id, cliente_id=client.id, nombre_cliente=client.nombre,
+                    documento=client.documento, fecha_pago=fecha, monto=monto,
+                    metodo_pago="Tarjeta", estado_pago=estado)
+    session.add(income)
+    session.commit()
+    return income
+
+def totals(session, client, year=2024):
+    return session.get(ClientYearTotal, (client.id, year))
+
+def test_insert_updates_totals(session, spender):
+    """Cada ingreso confirmado suma a los totales del año; los demás estados no."""
+    client, booking = spender
+    add_income(session, client, booking, 200.0)
+    add_income(session, client, booking, 50.0)
+    add_income(session, client, booking, 70.0, estado="reembolso")
+
+    row = totals(session, client)
+    assert (row.transacciones, row.total, row.reservas_booking, row.reservas_archive) == (2, 250.0, 2, 0)
+
+def test_update_and_delete_adjust_totals(session, spender):
+    """Cambios de estado, monto o año y eliminaciones ajustan los totales."""
+    client, booking = spender
+    income = add_income(session, client, booking, 200.0)
+    other = add_income(session, client, booking, 50.0)
+
+    income.monto = 300.0
+    session.commit()
+    assert totals(session, client).total == 350.0
+
+    other.fecha_pago = datetime(2025, 1, 2)
+    session.commit()
+    assert totals(session, client).total == 300.0
+    assert totals(session, client, 2025).total == 50.0
+
+    income.estado_pago = "reembolso"
+    session.commit()
+    session.expire_all()
+    assert totals(session, client) is None
+
+    session.expire(other)
+    session.delete(other)
+    session.commit()
+    session.expire_all()
+    assert totals(session, client, 2025) is None
+
+def test_rebuild_matches_incremental(session, spender):
+    """La reconstrucción completa da el mismo resultado que el mantenimiento incremental."""
+    client, booking = spender
+    add_income(session, client, booking, 200.0)
+    add_income(session, client, booking, 25.0, fecha=datetime(2023, 12, 31))
+    expected = {(r.cliente_id, r.year, r.transacciones, r.total) for r in session.query(ClientYearTotal)}
+
+    assert rebuild_client_year_totals() == 2
+    assert {(r.cliente_id, r.year, r.transacciones, r.total) for r in session.query(ClientYearTotal)} == expected
@@ -0,0 +1,107 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+from flask import Flask
+from backend.extensions import db
+from backend.models import SchedulerLease
+from backend.utils.lease import try_acquire, release, LeaderElection
+
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+def test_first_process_acquires_lease(app, session):
+    """El primer proceso que intenta adquirir el lease se convierte en líder."""
+    assert try_acquire("scheduler", "proceso-a", 30, now=NOW) is True
+
+    lease = session.get(SchedulerLease, "scheduler")
+    assert lease.holder == "proceso-a"
+    assert lease.expires_at == NOW + timedelta(seconds=30)
+
+def test_second_process_cannot_acquire_active_lease(app, session):
+    """Mientras el lease está vigente, otro proceso no puede tomarlo."""
+    assert try_acquire("scheduler", "proceso-a", 30, now=NOW)
+    assert try_acquire("scheduler", "proceso-b", 30, now=NOW + timedelta(seconds=10)) is False
+
+def test_holder_renews_lease(app, session):
+    """El titular renueva el lease y conserva la fecha de adquisición."""
+    assert try_acquire("scheduler", "proceso-a", 30, now=NOW)
+    assert try_acquire("scheduler", "proceso-a", 30, now=NOW + timedelta(seconds=10))
+
+    lease = session.get(SchedulerLease, "scheduler")
+    session.refresh(lease)
+    assert lease.acquired_at == NOW
+    assert lease.expires_at == NOW + timedelta(seconds=40)
+
+def test_expired_lease_is_taken_over(app, session):
+    """Si el líder deja de renovar, otro proceso toma el lease al expirar."""
+    assert try_acquire("scheduler", "proceso-a", 30, now=NOW)
+    assert try_acquire("scheduler", "proceso-b", 30, now=NOW + timedelta(seconds=31))
+    assert try_acquire("scheduler", "proceso-a", 30, now=NOW + timedelta(seconds=35)) is False
+
+def test_release_lets_other_process_acquire(app, session):
+    """Al liberar el lease otro proceso lo adquiere sin esperar la expiración."""
+    assert try_acquire("scheduler", "proceso-a", 30, now=NOW)
+    release("scheduler", "proceso-a")
+    assert try_acquire("scheduler", "proceso-b", 30, now=NOW + timedelta(seconds=1))
+
+def test_only_leader_runs_tasks(app, session):
+    """Las tareas decoradas con `only` solo se ejecutan en el líder."""
+    leader_a = LeaderElection()
+    leader_b = LeaderElection()
+    leader_a.init_app(app)
+    leader_b.init_app(app)
+    calls = []
+
+    @leader_b.only
+    def tarea():
+        calls.append(1)
+
+    assert leader_a.heartbeat() is True
+    assert leader_b.heartbeat() is False
+    tarea()
+    assert calls == []
+
+    leader_a.release()
+    assert leader_b.heartbeat() is True
+    tarea()
+    assert calls == [1]
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requiere os.fork")
+def test_forked_workers_elect_a_single_leader(tmp_path):
+    """Los workers creados por fork (gunicorn) no comparten holder: solo uno adquiere el lease."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'lease.db'}"
+    db.init_app(app)
+    with app.app_context():
+        SchedulerLease.__table__.create(db.engine)
+    elector = LeaderElection()
+    elector.init_app(app)
+    parent_holder = elector.holder  # Generado en el maestro, antes del fork
+
+    children = []
+    for _ in range(4):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 1
+            try:
+                with app.app_context():
+                    db.engine.dispose(close=False)  # No reutilizar las conexiones del padre
+                    acquired = elector.heartbeat()
+                os.write(write_fd, f"{int(acquired)}:{elector.holder}".encode())
+                code = 0
+            finally:
+                os._exit(code)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd) as f:
+            results.append(f.read())
+        os.waitpid(pid, 0)
+
+    holders = [r.split(":", 1)[1] for r in results]
+    assert len(results) == 4
+    assert len(set(holders)) == 4 and parent_holder not in holders
+    assert sum(int(r.split(":", 1)[0]) for r in results) == 1
@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import select, func
+from backend.models import Client, Room, Booking, Archivo, Income, ClientYearTotal
+from backend.utils.seed import generate
+from backend.utils.client_totals import rebuild_client_year_totals
+
+TODAY = datetime(2024, 6, 15)
+
+def _snapshot(session):
+    return {
+        "counts": [session.scalar(select(func.count()).select_from(m)) for m in (Room, Client, Booking, Archivo, Income)],
+        "clients": session.execute(select(Client.nombre, Client.telefono).order_by(Client.id)).all(),
+        "bookings": session.execute(select(Booking.cliente_id, Booking.check_in, Booking.estado).order_by(Booking.id)).all(),
+        "income": session.scalar(select(func.sum(Income.monto))),
+    }
+
+def test_generate_is_deterministic(session):
+    """La misma semilla y fecha generan los mismos datos; los totales por cliente quedan al día."""
+    counts = generate(200, seed=7, today=TODAY, batch_size=100)
+    first = _snapshot(session)
+    assert counts["client"] == 200 and counts["archivo"] == 400
+    assert first["counts"][:2] == [10, 200]
+
+    totals = session.execute(select(ClientYearTotal.cliente_id, ClientYearTotal.year, ClientYearTotal.total)
+                             .order_by(ClientYearTotal.cliente_id, ClientYearTotal.year)).all()
+    rebuild_client_year_totals()
+    assert session.execute(select(ClientYearTotal.cliente_id, ClientYearTotal.year, ClientYearTotal.total)
+                           .order_by(ClientYearTotal.cliente_id, ClientYearTotal.year)).all() == totals
+
+    for table in (Income, Archivo, Booking, ClientYearTotal, Client, Room):
+        session.execute(table.__table__.delete())
+    session.commit()
+    generate(200, seed=7, today=TODAY, batch_size=100)
+    assert _snapshot(session) == first
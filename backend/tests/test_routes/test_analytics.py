@@ -0,0 +1,340 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from backend.models import Income, Archivo, Booking, Client, Room
+from backend.analytics.revenue import income_store
+from backend.analytics.kpi import kpi_cache
+from backend.analytics.lttb import lttb_indices
+from backend.analytics.dashboard import dashboard_cache
+from .test_stats_queries import capture_queries
+
+@pytest.fixture
+def revenue_data(session):
+    """Crea ingresos con distintos métodos de pago y estados a lo largo de enero y febrero de 2024."""
+    income_store.invalidate()
+    client = Client(nombre="Cliente Analítica", email="analitica@test.com", telefono="555",
+                    documento="ANA001", fecha_nacimiento="1990-01-01")
+    room = Room(num_habitacion=901, tipo="Suite", capacidad=2, precio_noche=100.0)
+    session.add_all([client, room])
+    session.flush()
+
+    archivo = Archivo(booking_id=1, cliente_id=client.id, habitacion_id=room.id,
+                      check_in=datetime(2024, 1, 1), check_out=datetime(2024, 1, 2),
+                      tipo_habitacion="Suite", num_huespedes=2, metodo_pago="Tarjeta",
+                      valor_reservacion=100.0, estado="vencida", fecha_archivo=datetime(2024, 1, 2))
+    session.add(archivo)
+    session.flush()
+
+    for fecha, monto, metodo, estado in [
+        (datetime(2024, 1, 1, 10), 100.0, "Tarjeta", "confirmado"),   # Lunes
+        (datetime(2024, 1, 3, 18), 50.0, "Efectivo", "confirmado"),
+        (datetime(2024, 1, 3, 20), 25.0, "tarjeta", "confirmado"),
+        (datetime(2024, 1, 4, 9), 70.0, "Tarjeta", "reembolso"),
+        (datetime(2024, 2, 10, 12), 200.0, "Transferencia", "confirmado"),
+    ]:
+        session.add(Income(archive_id=archivo.id, cliente_id=client.id, nombre_cliente=client.nombre,
+                           documento=client.documento, fecha_pago=fecha, monto=monto,
+                           metodo_pago=metodo, estado_pago=estado))
+    session.commit()
+    yield archivo
+    income_store.invalidate()
+
+def get_revenue(client, token, query):
+    return client.get(f'/api/stats/revenue?{query}', headers={'Authorization': f'Bearer {token}'})
+
+def test_daily_revenue_series_is_dense(client, admin_token, revenue_data):
+    """La serie diaria incluye los días sin ingresos y excluye pagos no confirmados."""
+    response = get_revenue(client, admin_token, 'from=2024-01-01&to=2024-01-05')
+    assert response.status_code == 200
+
+    series = response.get_json()["series"]
+    assert [p["time"] for p in series] == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    assert [p["revenue"] for p in series] == [100.0, 0.0, 75.0, 0.0, 0.0]
+    assert [p["transactions"] for p in series] == [1, 0, 2, 0, 0]
+
+def test_weekly_and_monthly_buckets(client, admin_token, revenue_data):
+    """Las semanas empiezan en lunes y los meses en el día 1."""
+    weekly = get_revenue(client, admin_token, 'from=2024-01-03&to=2024-01-14&granularity=week').get_json()
+    assert [p["time"] for p in weekly["series"]] == ["2024-01-01", "2024-01-08"]
+    assert weekly["series"][0]["revenue"] == 75.0
+
+    monthly = get_revenue(client, admin_token, 'from=2024-01-01&to=2024-02-29&granularity=month').get_json()
+    assert [(p["time"], p["revenue"]) for p in monthly["series"]] == [("2024-01-01", 175.0), ("2024-02-01", 200.0)]
+
+def test_revenue_grouped_by_payment_method(client, admin_token, revenue_data):
+    """La agrupación por método de pago unifica mayúsculas y omite métodos sin movimientos."""
+    data = get_revenue(client, admin_token, 'from=2024-01-01&to=2024-01-31&granularity=month&by=metodo_pago').get_json()
+    groups = {g["key"]: g["series"][0] for g in data["groups"]}
+    assert groups == {
+        "tarjeta": {"time": "2024-01-01", "revenue": 125.0, "transactions": 2},
+        "efectivo": {"time": "2024-01-01", "revenue": 50.0, "transactions": 1},
+    }
+
+def test_store_picks_up_changes(client, admin_token, session, revenue_data):
+    """Los ingresos nuevos y modificados se reflejan sin recargar toda la tabla."""
+    query = 'from=2024-01-01&to=2024-01-31&granularity=month'
+    assert get_revenue(client, admin_token, query).get_json()["series"][0]["revenue"] == 175.0
+
+    income = session.query(Income).filter_by(monto=100.0).one()
+    income.estado_pago = "reembolso"
+    session.add(Income(archive_id=revenue_data.id, cliente_id=income.cliente_id, nombre_cliente="x",
+                       documento="x", fecha_pago=datetime(2024, 1, 20), monto=30.0,
+                       metodo_pago="Efectivo", estado_pago="confirmado"))
+    session.commit()
+
+    series = get_revenue(client, admin_token, query).get_json()["series"]
+    assert series[0] == {"time": "2024-01-01", "revenue": 105.0, "transactions": 3}
+
+def test_store_marks_incomes_dirty_on_commit(session, revenue_data):
+    """Las filas se marcan como modificadas al confirmar, no en el flush ni tras un rollback."""
+    income_store.columns()
+    income = session.query(Income).filter_by(monto=100.0).one()
+
+    income.estado_pago = "reembolso"
+    session.flush()
+    assert income.id not in income_store._dirty  # Otro hilo aún leería la versión confirmada
+    session.rollback()
+    assert income.id not in income_store._dirty
+
+    income.monto = 120.0
+    session.commit()
+    assert income.id in income_store._dirty
+    columns = income_store.columns()
+    assert columns.monto[columns.ids == income.id][0] == 120.0
+
+@pytest.mark.parametrize("query", ["granularity=year", "by=cliente", "from=2024-13-01", "from=2024-02-01&to=2024-01-01"])
+def test_revenue_invalid_params(client, admin_token, query):
+    """Los parámetros inválidos devuelven 400."""
+    assert get_revenue(client, admin_token, query).status_code == 400
+
+@pytest.mark.parametrize("endpoint", ["revenue", "occupancy-timeline"])
+def test_analytics_range_is_capped(app, client, admin_token, endpoint):
+    """Los rangos de más de ANALYTICS_MAX_DAYS días devuelven 400 sin calcular la serie."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    assert client.get(f'/api/stats/{endpoint}?from=1990-01-01&to=2024-01-01', headers=headers).status_code == 400
+    app.config["ANALYTICS_MAX_DAYS"] = 10
+    try:
+        assert client.get(f'/api/stats/{endpoint}?from=2024-01-01&to=2024-01-10', headers=headers).status_code == 200
+        assert client.get(f'/api/stats/{endpoint}?from=2024-01-01&to=2024-01-11', headers=headers).status_code == 400
+    finally:
+        app.config["ANALYTICS_MAX_DAYS"] = 3660
+
+@pytest.fixture
+def occupancy_data(session):
+    """Dos habitaciones con una reserva vigente, una estadía archivada y una cancelación."""
+    client = Client(nombre="Cliente Ocupación", email="ocupacion@test.com", telefono="555",
+                    documento="OCU001", fecha_nacimiento="1990-01-01")
+    rooms = [Room(num_habitacion=910 + i, tipo="Doble", capacidad=2, precio_noche=80.0) for i in range(2)]
+    session.add(client)
+    session.add_all(rooms)
+    session.flush()
+
+    session.add(Booking(cliente_id=client.id, habitacion_id=rooms[0].id,
+                        check_in=datetime(2024, 3, 2, 15), check_out=datetime(2024, 3, 5, 12),
+                        tipo_habitacion="Doble", num_huespedes=2, metodo_pago="Tarjeta", estado="confirmada"))
+    for estado, check_in, check_out in [("vencida", datetime(2024, 2, 28, 15), datetime(2024, 3, 3, 12)),
+                                        ("cancelada", datetime(2024, 3, 1, 15), datetime(2024, 3, 4, 12))]:
+        session.add(Archivo(booking_id=99, cliente_id=client.id, habitacion_id=rooms[1].id,
+                            check_in=check_in, check_out=check_out, tipo_habitacion="Doble",
+                            num_huespedes=2, metodo_pago="Tarjeta", estado=estado))
+    session.commit()
+
+def test_occupancy_timeline(client, admin_token, occupancy_data):
+    """Cuenta las noches ocupadas por reservas y estadías cumplidas, no las canceladas."""
+    response = client.get('/api/stats/occupancy-timeline?from=2024-03-01&to=2024-03-05',
+                          headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+
+    data = response.get_json()
+    assert data["total_habitaciones"] == 2
+    assert [(p["time"], p["habitaciones_ocupadas"]) for p in data["series"]] == [
+        ("2024-03-01", 1), ("2024-03-02", 2), ("2024-03-03", 1), ("2024-03-04", 1), ("2024-03-05", 0)
+    ]
+    assert data["series"][1]["porcentaje_ocupacion"] == 100.0
+
+@pytest.fixture
+def kpi_data(session):
+    """Una suite y dos dobles; dos estadías pagadas, una de ellas entre dos meses."""
+    kpi_cache.clear()
+    client = Client(nombre="Cliente KPI", email="kpi@test.com", telefono="555",
+                    documento="KPI001", fecha_nacimiento="1990-01-01")
+    rooms = [Room(num_habitacion=920, tipo="Suite", capacidad=2, precio_noche=200.0),
+             Room(num_habitacion=921, tipo="Doble", capacidad=2, precio_noche=100.0),
+             Room(num_habitacion=922, tipo="Doble", capacidad=2, precio_noche=100.0)]
+    session.add(client)
+    session.add_all(rooms)
+    session.flush()
+
+    # Suite del 30 de enero al 3 de febrero (4 noches, 800) y doble del 10 al 12 de enero (2 noches, 200)
+    for room, check_in, check_out, monto in [(rooms[0], datetime(2024, 1, 30, 15), datetime(2024, 2, 3, 12), 800.0),
+                                             (rooms[1], datetime(2024, 1, 10, 15), datetime(2024, 1, 12, 12), 200.0)]:
+        archivo = Archivo(booking_id=room.id, cliente_id=client.id, habitacion_id=room.id,
+                          check_in=check_in, check_out=check_out, tipo_habitacion=room.tipo,
+                          num_huespedes=2, metodo_pago="Tarjeta", valor_reservacion=monto, estado="vencida")
+        session.add(archivo)
+        session.flush()
+        session.add(Income(archive_id=archivo.id, cliente_id=client.id, nombre_cliente=client.nombre,
+                           documento=client.documento, fecha_pago=check_in, monto=monto,
+                           metodo_pago="Tarjeta", estado_pago="confirmado"))
+    session.commit()
+    yield
+    kpi_cache.clear()
+
+def test_kpis_by_month_and_room_type(client, admin_token, kpi_data):
+    """Los ingresos de una estadía se reparten por noche entre los meses que abarca."""
+    response = client.get('/api/stats/kpi?from=2024-01&to=2024-02',
+                          headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+
+    enero, febrero = response.get_json()["meses"]
+    assert enero["month"] == "2024-01"
+    assert enero["por_tipo"]["Suite"]["noches_vendidas"] == 2
+    assert enero["por_tipo"]["Suite"]["ingresos"] == 400.0
+    assert enero["por_tipo"]["Suite"]["alos"] == 4.0
+    assert enero["por_tipo"]["Doble"]["revpar"] == round(200.0 / (31 * 2), 2)
+    assert enero["total"]["adr"] == 150.0
+    assert enero["total"]["noches_disponibles"] == 31 * 3
+
+    assert febrero["por_tipo"]["Suite"]["ingresos"] == 400.0
+    assert febrero["total"]["estadias"] == 0
+
+def test_closed_months_are_cached(client, admin_token, session, kpi_data):
+    """Los meses cerrados se sirven de la caché hasta que se confirma una escritura que los afecta."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    before = client.get('/api/stats/kpi?from=2024-01&to=2024-01', headers=headers).get_json()
+    with capture_queries() as queries:
+        assert client.get('/api/stats/kpi?from=2024-01&to=2024-01', headers=headers).get_json() == before
+    assert not [q for q, _ in queries if "archivo" in q]
+
+    income = session.query(Income).filter_by(monto=200.0).one()
+    income.monto = 0.0
+    session.flush()
+    assert client.get('/api/stats/kpi?from=2024-01&to=2024-01', headers=headers).get_json() == before
+    session.commit()
+
+    after = client.get('/api/stats/kpi?from=2024-01&to=2024-01', headers=headers).get_json()
+    assert after["meses"][0]["por_tipo"]["Doble"]["ingresos"] == 0.0
+
+    session.query(Income).update({"monto": 0.0})
+    session.commit()
+    assert client.get('/api/stats/kpi?from=2024-01&to=2024-01', headers=headers).get_json()["meses"][0]["total"]["ingresos"] == 0.0
+
+def test_kpi_range_is_capped(client, admin_token):
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    assert client.get('/api/stats/kpi?from=1000-01&to=9999-12', headers=headers).status_code == 400
+    assert client.get('/api/stats/kpi?from=2015-01&to=2024-12', headers=headers).status_code == 200
+
+def test_lttb_keeps_endpoints_and_peaks():
+    """LTTB conserva el primer y último punto y los picos de la serie."""
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[500] = 100.0
+    indices = lttb_indices(x, y, 20)
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 500 in indices
+    assert np.all(np.diff(indices) > 0)
+
+def test_revenue_series_downsampled(client, admin_token, revenue_data):
+    """?max_points= limita el número de puntos de la serie."""
+    data = get_revenue(client, admin_token, 'from=2023-01-01&to=2024-12-31&max_points=30').get_json()
+    series = data["series"]
+    assert len(series) == 30
+    assert series[0]["time"] == "2023-01-01" and series[-1]["time"] == "2024-12-31"
+    assert {"2024-01-01", "2024-02-10"} <= {p["time"] for p in series}
+
+    assert get_revenue(client, admin_token, 'max_points=1').status_code == 400
+
+def test_top_spenders_by_year(client, admin_token, revenue_data):
+    """El top de clientes se lee de client_year_totals para cualquier año y límite."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    data = client.get('/api/stats/top-spenders?year=2024&limit=5', headers=headers).get_json()
+    assert data["year"] == 2024
+    assert len(data["top_clientes"]) == 1
+    top = data["top_clientes"][0]
+    assert (top["nombre"], top["total_transacciones"], top["total_gastado"], top["reservas_archive"]) == \
+        ("Cliente Analítica", 4, 375.0, 4)
+
+    assert client.get('/api/stats/top-spenders?year=2023', headers=headers).get_json()["top_clientes"] == []
+    assert client.get('/api/stats/top-spenders?limit=0', headers=headers).status_code == 400
+
+@pytest.fixture
+def dashboard_data(session):
+    """Reserva actual con pagos de hoy y del mes pasado, y una habitación ocupada."""
+    dashboard_cache.invalidate()
+    now = datetime.now().replace(microsecond=0)
+    client = Client(nombre="Cliente Dashboard", email="dashboard@test.com", telefono="555",
+                    documento="DSH001", fecha_nacimiento="1990-01-01")
+    rooms = [Room(num_habitacion=960, tipo="Suite", capacidad=2, precio_noche=100.0, disponibilidad="Ocupada"),
+             Room(num_habitacion=961, tipo="Doble", capacidad=2, precio_noche=80.0)]
+    session.add_all([client] + rooms)
+    session.flush()
+    booking = Booking(cliente_id=client.id, habitacion_id=rooms[0].id, check_in=now - timedelta(days=2),
+                      check_out=now + timedelta(days=1), tipo_habitacion="Suite", num_huespedes=2,
+                      metodo_pago="Tarjeta", estado="activa")
+    session.add(booking)
+    session.flush()
+    for fecha, monto, metodo in [(now, 120.0, "Tarjeta"), (now - timedelta(days=40), 80.0, "Efectivo")]:
+        session.add(Income(booking_id=booking.id, cliente_id=client.id, nombre_cliente=client.nombre,
+                           documento=client.documento, fecha_pago=fecha, monto=monto, metodo_pago=metodo))
+    session.commit()
+    yield booking
+    dashboard_cache.invalidate()
+
+def test_dashboard_matches_individual_endpoints(client, admin_token, dashboard_data):
+    """Cada widget de la instantánea coincide con su endpoint individual."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    data = client.get('/api/stats/dashboard', headers=headers).get_json()
+
+    for key, endpoint in [("daily_revenue", "daily-revenue"), ("daily_clients", "daily-clients"),
+                          ("monthly_revenue", "monthly-revenue"), ("current_month_payments", "current-month-payments"),
+                          ("top_spenders", "top-spenders"), ("current_occupancy", "current-occupancy")]:
+        assert data[key] == client.get(f'/api/stats/{endpoint}', headers=headers).get_json(), key
+
+    quick = client.get('/api/stats/quick-stats', headers=headers).get_json()
+    quick.pop("last_updated")
+    assert data["quick_stats"].pop("last_updated")
+    assert data["quick_stats"] == quick
+    assert data["daily_revenue"][0]["revenue"] == 200.0
+
+def test_dashboard_uses_one_read_transaction(app, client, admin_token, dashboard_data):
+    """Todas las consultas van en una transacción y Income se recorre una sola vez por fecha_pago."""
+    with capture_queries() as queries:
+        client.get('/api/stats/dashboard', headers={'Authorization': f'Bearer {admin_token}'})
+    statements = [s for s, _ in queries]
+    assert statements[0] == "BEGIN" and statements[-1] == "ROLLBACK"
+    assert len([s for s in statements if "income.fecha_pago >= ?" in s]) == 1
+
+def test_dashboard_etag(client, admin_token, session, dashboard_data):
+    """Responde 304 con el ETag vigente y cambia de ETag al registrar un pago."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    first = client.get('/api/stats/dashboard', headers=headers)
+    assert first.headers["ETag"].startswith('W/')
+    assert "max-age" in first.headers["Cache-Control"]
+
+    cached = client.get('/api/stats/dashboard', headers={**headers, 'If-None-Match': first.headers["ETag"]})
+    assert cached.status_code == 304
+
+    session.add(Income(booking_id=dashboard_data.id, cliente_id=dashboard_data.cliente_id, nombre_cliente="Cliente Dashboard",
+                       documento="DSH001", fecha_pago=datetime.now(), monto=10.0, metodo_pago="Efectivo"))
+    session.commit()
+    fresh = client.get('/api/stats/dashboard', headers={**headers, 'If-None-Match': first.headers["ETag"]})
+    assert fresh.status_code == 200
+    assert fresh.get_json()["quick_stats"]["monthly_revenue"] == 130.0
+
+def test_dashboard_invalidated_on_commit(client, admin_token, session, dashboard_data):
+    """La caché se descarta al confirmar, no en el flush ni tras un rollback."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    first = client.get('/api/stats/dashboard', headers=headers).get_json()
+
+    nuevo = dict(nombre="Cliente Nuevo", email="nuevo@test.com", telefono="556",
+                 documento="DSH002", fecha_nacimiento="1990-01-01")
+    session.add(Client(**nuevo))
+    session.flush()
+    assert client.get('/api/stats/dashboard', headers=headers).get_json()["generated_at"] == first["generated_at"]
+    session.rollback()
+    assert client.get('/api/stats/dashboard', headers=headers).get_json()["generated_at"] == first["generated_at"]
+
+    session.add(Client(**nuevo))
+    session.commit()
+    assert client.get('/api/stats/dashboard', headers=headers).get_json()["generated_at"] != first["generated_at"]
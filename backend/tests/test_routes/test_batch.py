@@ -0,0 +1,52 @@
+import pytest
+from backend.models import Client, Room
+
+@pytest.fixture
+def batch_data(session):
+    """Un cliente y una habitación para consultar en lote."""
+    client = Client(nombre="Lote Cliente", email="lote@correo.com", telefono="3001230000",
+                    documento="CC7001", fecha_nacimiento="1980-01-01")
+    room = Room(num_habitacion=950, tipo="Doble", capacidad=2, precio_noche=80.0)
+    session.add_all([client, room])
+    session.commit()
+    return client, room
+
+def batch(client, token, payload):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    return client.post('/api/batch', json=payload, headers=headers)
+
+def test_batch_returns_keyed_results(client, admin_token, batch_data):
+    """Cada subpetición se devuelve bajo su ruta o su identificador."""
+    response = batch(client, admin_token, {"requests": [
+        "/api/stats/quick-stats",
+        {"id": "lookup", "path": "/api/clients/lookup?prefix=lote"},
+        {"id": "missing", "path": "/api/clients/999999"},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+
+    assert set(results) == {"/api/stats/quick-stats", "lookup", "missing"}
+    assert results["/api/stats/quick-stats"]["status"] == 200
+    assert results["lookup"]["body"][0]["label"] == "Lote Cliente (CC7001)"
+    assert results["missing"]["status"] == 404
+
+def test_batch_parallel_matches_serial(client, admin_token, batch_data):
+    """El modo paralelo devuelve lo mismo que la ejecución en serie."""
+    paths = ["/api/stats/current-occupancy", "/api/rooms/options", "/api/clients/lookup?prefix=lote"]
+    serial = batch(client, admin_token, {"requests": paths}).get_json()["results"]
+    parallel = batch(client, admin_token, {"requests": paths, "parallel": True}).get_json()["results"]
+    assert parallel == serial
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {"requests": []},
+    {"requests": ["/login"]},
+    {"requests": ["/api/batch"]},
+    {"requests": ["/api/stats/quick-stats", "/api/stats/quick-stats"]},
+    {"requests": ["/api/stats/quick-stats"] * 21},
+])
+def test_batch_rejects_invalid_requests(client, admin_token, payload):
+    assert batch(client, admin_token, payload).status_code == 400
+
+def test_batch_requires_token(client):
+    assert batch(client, None, {"requests": ["/api/stats/quick-stats"]}).status_code == 401
@@ -0,0 +1,19 @@
+from backend.benchmarks.run import run_scale, compare, stats_endpoints
+
+def test_run_scale_covers_hot_paths(app, session):
+    """El benchmark mide listas, todas las rutas de estadísticas, el ciclo de reservas y la tarea."""
+    results = run_scale(app, 30, iterations=1, write_iterations=1, job_iterations=1)
+
+    expected = {f"GET {path}" for path in stats_endpoints(app)} | {
+        "GET /api/bookings", "booking_create", "booking_update", "booking_delete", "job verificar_reservas"}
+    assert expected <= set(results)
+    assert all(m["runs"] >= 1 and m["p95_ms"] >= m["p50_ms"] >= 0 for m in results.values())
+
+def test_compare_flags_regressions_over_threshold():
+    baseline = {"small": {"GET /api/rooms": {"p50_ms": 10.0, "p95_ms": 20.0, "peak_kb": 100.0}}}
+    current = {"small": {"GET /api/rooms": {"p50_ms": 11.0, "p95_ms": 40.0, "peak_kb": 100.5}},
+               "large": {"GET /api/rooms": {"p50_ms": 99.0, "p95_ms": 99.0, "peak_kb": 99.0}}}
+
+    regressions = compare(current, baseline, threshold=0.25)
+    assert [(r["case"], r["metric"]) for r in regressions] == [("GET /api/rooms", "p95_ms")]
+    assert compare(current, baseline, threshold=1.0) == []
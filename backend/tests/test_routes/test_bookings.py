@@ -217,4 +217,89 @@ def test_update_booking_basic(client, admin_token, create_test_booking):
         data=json.dumps(update_data),
         content_type='application/json'
     )
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+
+def test_bulk_archive_bookings(client, admin_token, booking_data, session):
+    """Archiva varias reservas en una transacción y devuelve el resultado de cada id."""
+    ids, incomes = {}, {}
+    for estado in ("confirmada", "pendiente", "vencida"):
+        booking = Booking(**{**booking_data, 'estado': estado,
+                             'check_in': datetime.fromisoformat(booking_data['check_in']),
+                             'check_out': datetime.fromisoformat(booking_data['check_out'])})
+        session.add(booking)
+        session.flush()
+        ids[estado] = booking.id
+        if estado != "pendiente":
+            incomes[estado] = Income(booking_id=booking.id, cliente_id=booking.cliente_id, nombre_cliente="Cliente Prueba",
+                                     documento="ABC123456789", monto=400.0, metodo_pago="Tarjeta")
+            session.add(incomes[estado])
+    session.commit()
+    vencida_income = incomes["vencida"]
+
+    response = client.post('/api/bookings/archive', headers={'Authorization': f'Bearer {admin_token}'},
+                           json={"ids": [ids["confirmada"], ids["pendiente"], ids["vencida"], 999999]})
+    assert response.status_code == 200
+    data = response.get_json()
+    results = data["results"]
+
+    assert data["archived"] == 3
+    assert results["999999"] == {"status": "not_found"}
+    assert results[str(ids["confirmada"])]["archived_status"] == "reembolso"
+    assert results[str(ids["confirmada"])]["income_status"] == "reembolso"
+    assert results[str(ids["pendiente"])]["archived_status"] == "cancelada"
+    assert results[str(ids["pendiente"])]["income_updated"] is False
+    assert results[str(ids["vencida"])]["income_ids"] == [vencida_income.id]
+    assert results[str(ids["vencida"])]["income_status"] == "confirmado"
+
+    assert session.query(Booking).filter(Booking.id.in_(ids.values())).count() == 0
+    income = session.get(Income, vencida_income.id)
+    session.refresh(income)
+    assert income.booking_id is None
+    assert income.archive_id == results[str(ids["vencida"])]["archived_id"]
+
+def test_bulk_and_single_archive_leave_same_income(client, admin_token, booking_data, session):
+    """Sin estado de pago para el archivo, el ingreso pasa al archivo sin cambiar estado ni notas, en bloque y por id."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    incomes = []
+    for _ in range(2):
+        booking = Booking(**{**booking_data, 'estado': 'pendiente',
+                             'check_in': datetime.fromisoformat(booking_data['check_in']),
+                             'check_out': datetime.fromisoformat(booking_data['check_out'])})
+        session.add(booking)
+        session.flush()
+        income = Income(booking_id=booking.id, cliente_id=booking.cliente_id, nombre_cliente="Cliente Prueba",
+                        documento="ABC123456789", monto=50.0, metodo_pago="Efectivo", estado_pago="confirmado",
+                        notas="Anticipo")
+        session.add(income)
+        incomes.append(income)
+    session.commit()
+    bulk_id, single_id = (income.booking_id for income in incomes)
+
+    result = client.post('/api/bookings/archive', headers=headers, json={"ids": [bulk_id]}).get_json()["results"][str(bulk_id)]
+    assert result["income_updated"] is False
+    assert result["income_status"] is None
+    assert client.delete(f'/api/bookings/{single_id}', headers=headers).get_json()["income_updated"] is False
+
+    for income in incomes:
+        session.refresh(income)
+        assert income.booking_id is None and income.archive_id is not None
+        assert (income.estado_pago, income.notas) == ("confirmado", "Anticipo")
+
+@pytest.mark.parametrize("payload", [{}, {"ids": []}, {"ids": ["1"]}, {"ids": [True]}])
+def test_bulk_archive_invalid_ids(client, admin_token, payload):
+    response = client.post('/api/bookings/archive', headers={'Authorization': f'Bearer {admin_token}'}, json=payload)
+    assert response.status_code == 400
+
+def test_bulk_archive_error_shape(client, admin_token, create_test_booking, monkeypatch):
+    """Un fallo interno revierte el lote y responde con el mismo formato que la eliminación."""
+    def fail(estado):
+        raise RuntimeError("fallo simulado")
+    monkeypatch.setattr("backend.routes.booking.archive_state", fail)
+    response = client.post('/api/bookings/archive', headers={'Authorization': f'Bearer {admin_token}'},
+                           json={"ids": [create_test_booking.id]})
+    assert response.status_code == 500
+    assert response.get_json() == {"error": "delete_failed", "type": "RuntimeError",
+                                   "message": "Error interno al archivar las reservas: fallo simulado"}
+    assert client.get(f'/api/bookings/{create_test_booking.id}',
+                      headers={'Authorization': f'Bearer {admin_token}'}).status_code == 200
@@ -1,3 +1,4 @@
+import io
 import json
 import pytest
 from datetime import datetime
@@ -236,4 +237,123 @@ def test_delete_client(client, admin_token, client_data):
         f'/api/clients/{client_to_delete["id"]}',
         headers={'Authorization': f'Bearer {admin_token}'}
     )
-    assert get_response.status_code == 404
\ No newline at end of file
+    assert get_response.status_code == 404
+
+
+@pytest.fixture
+def lookup_clients(session):
+    """Clientes para el autocompletado; reinicia el índice en memoria."""
+    from backend.models import Client
+    from backend.utils.lookup import client_lookup
+    client_lookup.invalidate()
+    session.add_all([
+        Client(nombre="Álvaro Núñez", email="alvaro@test.com", telefono="1", documento="CC9001", fecha_nacimiento="1990-01-01"),
+        Client(nombre="Alba Ruiz", email="alba@test.com", telefono="2", documento="CC9002", fecha_nacimiento="1990-01-01"),
+        Client(nombre="Bruno Alzate", email="bruno@test.com", telefono="3", documento="TI5000", fecha_nacimiento="1990-01-01"),
+    ])
+    session.commit()
+    yield
+    client_lookup.invalidate()
+
+def test_client_lookup_by_prefix(client, admin_token, lookup_clients):
+    """El prefijo se compara sin tildes con nombre, apellidos y documento."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    data = client.get('/api/clients/lookup?prefix=al', headers=headers).get_json()
+    assert [c["label"] for c in data] == ["Alba Ruiz (CC9002)", "Álvaro Núñez (CC9001)", "Bruno Alzate (TI5000)"]
+    assert set(data[0]) == {"id", "label"}
+
+    assert [c["label"] for c in client.get('/api/clients/lookup?prefix=nun', headers=headers).get_json()] == ["Álvaro Núñez (CC9001)"]
+    assert len(client.get('/api/clients/lookup?prefix=cc90&limit=1', headers=headers).get_json()) == 1
+    assert client.get('/api/clients/lookup?limit=500', headers=headers).status_code == 400
+
+def test_client_lookup_follows_writes(client, admin_token, lookup_clients):
+    """Crear, renombrar y eliminar clientes actualiza el índice."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    assert client.get('/api/clients/lookup?prefix=zoe', headers=headers).get_json() == []
+
+    client.post('/api/clients', headers=headers, json={
+        "nombre": "Zoe Castro", "email": "zoe@test.com", "telefono": "4",
+        "documento": "CC9100", "fecha_nacimiento": "1990-01-01"
+    })
+    zoe = client.get('/api/clients/lookup?prefix=zoe', headers=headers).get_json()
+    assert [c["label"] for c in zoe] == ["Zoe Castro (CC9100)"]
+
+    client.put(f'/api/clients/{zoe[0]["id"]}', headers=headers, json={"nombre": "Zoila Castro"})
+    assert [c["label"] for c in client.get('/api/clients/lookup?prefix=castro', headers=headers).get_json()] == ["Zoila Castro (CC9100)"]
+
+    client.delete(f'/api/clients/{zoe[0]["id"]}', headers=headers)
+    assert client.get('/api/clients/lookup?prefix=castro', headers=headers).get_json() == []
+
+def test_client_lookup_marks_dirty_on_commit(client, admin_token, session, lookup_clients):
+    """Los clientes se marcan como modificados al confirmar, no en el flush ni tras un rollback."""
+    from backend.models import Client
+    from backend.utils.lookup import client_lookup
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    client.get('/api/clients/lookup?prefix=al', headers=headers)
+    alba = session.query(Client).filter_by(documento="CC9002").one()
+
+    alba.nombre = "Alba Rosales"
+    session.flush()
+    assert alba.id not in client_lookup._dirty  # Otro hilo aún leería la versión confirmada
+    session.rollback()
+    assert alba.id not in client_lookup._dirty
+
+    alba.nombre = "Alba Rosales"
+    session.commit()
+    assert alba.id in client_lookup._dirty
+    assert [c["label"] for c in client.get('/api/clients/lookup?prefix=rosales', headers=headers).get_json()] == ["Alba Rosales (CC9002)"]
+
+def import_file(client, token, content, filename):
+    return client.post('/api/clients/import', headers={'Authorization': f'Bearer {token}'},
+                       data={'file': (io.BytesIO(content.encode('utf-8')), filename)},
+                       content_type='multipart/form-data')
+
+def guest(i, **overrides):
+    return {"nombre": f"Huésped {i}", "email": f"huesped{i}@socio.com", "telefono": f"300{i}",
+            "documento": f"IMP{i:04d}", "fecha_nacimiento": "1990-01-01", **overrides}
+
+def test_import_clients_json_upserts_and_reports_errors(client, admin_token, session, monkeypatch):
+    """Inserta y actualiza por documento en lotes; las filas inválidas se reportan sin abortar."""
+    from backend.models import Client
+    from backend.utils import client_import
+    monkeypatch.setattr(client_import, "_CHUNK_SIZE", 7)  # Forzar cortes de bloque dentro de los objetos
+    client.application.config["IMPORT_BATCH_SIZE"] = 2
+    try:
+        session.add(Client(**guest(1, nombre="Nombre Antiguo")))
+        session.add(Client(**guest(9, email="ocupado@socio.com")))
+        session.commit()
+
+        rows = [guest(1), guest(2), guest(3, email="sin-arroba"), guest(4, email="ocupado@socio.com"),
+                guest(5, fecha_nacimiento="01/01/1990"), guest(6), guest(6, nombre="Repetido")]
+        response = import_file(client, admin_token, json.dumps(rows), "socios.json")
+    finally:
+        client.application.config["IMPORT_BATCH_SIZE"] = 1000
+    assert response.status_code == 200
+
+    report = response.get_json()
+    assert (report["processed"], report["inserted"], report["updated"], report["failed"]) == (7, 2, 1, 4)
+    assert [e["row"] for e in report["errors"]] == [3, 4, 5, 7]
+    assert report["aborted"] is None
+
+    updated = session.query(Client).filter_by(documento="IMP0001").one()
+    session.refresh(updated)
+    assert updated.nombre == "Huésped 1"
+    assert session.query(Client).filter(Client.documento.like("IMP%")).count() == 4
+
+def test_import_clients_csv_body(client, admin_token, session):
+    """Acepta CSV en el cuerpo de la petición."""
+    content = "nombre,email,telefono,documento,fecha_nacimiento,preferencias\n" \
+              "Ana CSV,ana@csv.com,3001,CSV001,1991-02-03,Vista al mar\n"
+    response = client.post('/api/clients/import', headers={'Authorization': f'Bearer {admin_token}'},
+                           data=content.encode('utf-8'), content_type='text/csv')
+    assert response.get_json()["inserted"] == 1
+
+    lookup = client.get('/api/clients/lookup?prefix=ana', headers={'Authorization': f'Bearer {admin_token}'})
+    assert [c["label"] for c in lookup.get_json()] == ["Ana CSV (CSV001)"]
+
+def test_import_clients_malformed_json_keeps_previous_rows(client, admin_token, session):
+    """Un archivo truncado importa lo leído e indica dónde se detuvo."""
+    content = json.dumps([guest(1), guest(2)])[:-30]
+    report = import_file(client, admin_token, content, "roto.json").get_json()
+    assert report["inserted"] == 1
+    assert report["aborted"].startswith("Lectura interrumpida tras 1 registros")
@@ -0,0 +1,80 @@
+import csv
+import io
+from datetime import datetime, timedelta
+import pytest
+from openpyxl import load_workbook
+from backend.models import Income, Archivo, Client, Room
+
+@pytest.fixture
+def export_data(session):
+    """Crea archivos e ingresos en distintas fechas y estados."""
+    client = Client(nombre="Cliente Exportación", email="export@test.com", telefono="555",
+                    documento="EXP001", fecha_nacimiento="1990-01-01")
+    room = Room(num_habitacion=801, tipo="Suite", capacidad=2, precio_noche=150.0)
+    session.add_all([client, room])
+    session.flush()
+
+    for dia, estado, estado_pago in [(5, "vencida", "confirmado"), (20, "reembolso", "reembolso"),
+                                     (40, "vencida", "confirmado")]:
+        fecha = datetime(2024, 1, 1) + timedelta(days=dia - 1)
+        archivo = Archivo(booking_id=dia, cliente_id=client.id, habitacion_id=room.id,
+                          check_in=fecha, check_out=fecha.replace(hour=12),
+                          tipo_habitacion="Suite", num_huespedes=2, metodo_pago="Tarjeta",
+                          valor_reservacion=150.0, estado=estado, fecha_archivo=fecha)
+        session.add(archivo)
+        session.flush()
+        session.add(Income(archive_id=archivo.id, cliente_id=client.id, nombre_cliente=client.nombre,
+                           documento=client.documento, fecha_pago=fecha, monto=150.0,
+                           metodo_pago="Tarjeta", estado_pago=estado_pago))
+    session.commit()
+
+def read_csv(response):
+    text = response.data.decode("utf-8-sig")
+    return list(csv.DictReader(io.StringIO(text)))
+
+def test_export_incomes_csv_filters(client, admin_token, export_data):
+    """La exportación CSV de ingresos aplica rango de fechas y estado."""
+    response = client.get(
+        '/api/incomes/export?from=2024-01-01&to=2024-01-31&estado=confirmado',
+        headers={'Authorization': f'Bearer {admin_token}'}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert "attachment" in response.headers["Content-Disposition"]
+
+    rows = read_csv(response)
+    assert len(rows) == 1
+    assert rows[0]["origen"] == "archive"
+    assert rows[0]["estado_pago"] == "confirmado"
+    assert rows[0]["fecha_pago"].startswith("2024-01-05")
+
+def test_export_archives_csv(client, admin_token, export_data):
+    """La exportación CSV de archivos incluye el nombre del cliente y la habitación."""
+    response = client.get('/api/archives/export?estado=vencida',
+                          headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+
+    rows = read_csv(response)
+    assert [row["booking_id"] for row in rows] == ["5", "40"]
+    assert rows[0]["nombre_cliente"] == "Cliente Exportación"
+    assert rows[0]["num_habitacion"] == "801"
+
+def test_export_invalid_date(client, admin_token):
+    response = client.get('/api/incomes/export?from=01/01/2024',
+                          headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 400
+
+def test_export_archives_xlsx_job(client, admin_token, export_data):
+    """El formato XLSX se genera como trabajo en segundo plano y se descarga al terminar."""
+    response = client.get('/api/archives/export?format=xlsx&from=2024-01-01',
+                          headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job["status"] == "done"
+
+    download = client.get(job["download_url"], headers={'Authorization': f'Bearer {admin_token}'})
+    assert download.status_code == 200
+    sheet = load_workbook(io.BytesIO(download.data)).active
+    rows = list(sheet.values)
+    assert rows[0][0] == "id"
+    assert len(rows) == 4
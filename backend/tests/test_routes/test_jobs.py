@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+from datetime import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from backend.models import Income, Booking, Client, Room, Job
+
+@pytest.fixture
+def income_data(session):
+    """Crea ingresos confirmados para los reportes."""
+    client = Client(nombre="Cliente Reporte", email="reporte@test.com", telefono="555",
+                    documento="REP001", fecha_nacimiento="1990-01-01")
+    room = Room(num_habitacion=700, tipo="Doble", capacidad=2, precio_noche=100.0)
+    session.add_all([client, room])
+    session.flush()
+
+    for dia, monto, metodo in [(1, 100.0, "Efectivo"), (1, 50.0, "Tarjeta"), (2, 200.0, "Tarjeta")]:
+        booking = Booking(cliente_id=client.id, habitacion_id=room.id,
+                          check_in=datetime(2025, 3, dia), check_out=datetime(2025, 3, dia + 1),
+                          tipo_habitacion="Doble", num_huespedes=1, metodo_pago=metodo,
+                          estado="confirmada", valor_reservacion=monto)
+        session.add(booking)
+        session.flush()
+        session.add(Income(booking_id=booking.id, cliente_id=client.id, nombre_cliente=client.nombre,
+                           documento=client.documento, fecha_pago=datetime(2025, 3, dia, 10),
+                           monto=monto, metodo_pago=metodo, estado_pago="confirmado"))
+    session.commit()
+
+def submit(client, token, payload):
+    return client.post('/api/jobs', headers={'Authorization': f'Bearer {token}'},
+                       data=json.dumps(payload), content_type='application/json')
+
+def test_list_reports(client, admin_token):
+    """Los reportes de estadísticas e ingresos están registrados."""
+    response = client.get('/api/jobs/reports', headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+    reports = response.get_json()["reports"]
+    assert "stats_daily_revenue" in reports
+    assert "incomes_monthly_summary" in reports
+
+def test_submit_unknown_report(client, admin_token):
+    response = submit(client, admin_token, {"name": "no_existe"})
+    assert response.status_code == 400
+
+def test_daily_revenue_job_and_download(client, admin_token, income_data):
+    """El trabajo termina, informa su estado y permite descargar el CSV."""
+    response = submit(client, admin_token, {
+        "name": "stats_daily_revenue",
+        "params": {"from": "2025-03-01", "to": "2025-03-31"}
+    })
+    assert response.status_code == 202
+    job_id = response.get_json()["id"]
+
+    status = client.get(f'/api/jobs/{job_id}', headers={'Authorization': f'Bearer {admin_token}'})
+    assert status.status_code == 200
+    assert status.get_json()["status"] == "done"
+    assert status.get_json()["progress"] == 1.0
+
+    download = client.get(f'/api/jobs/{job_id}/download', headers={'Authorization': f'Bearer {admin_token}'})
+    assert download.status_code == 200
+    rows = list(csv.reader(io.StringIO(download.data.decode("utf-8"))))
+    assert rows[0] == ["fecha", "ingresos", "transacciones", "clientes"]
+    assert rows[1] == ["2025-03-01", "150.0", "2", "1"]
+    assert rows[2] == ["2025-03-02", "200.0", "1", "1"]
+
+def test_failed_job_reports_error(client, admin_token, session):
+    """Un parámetro inválido marca el trabajo como fallido con su error."""
+    response = submit(client, admin_token, {"name": "stats_daily_revenue", "params": {"from": "ayer"}})
+    job_id = response.get_json()["id"]
+
+    data = client.get(f'/api/jobs/{job_id}', headers={'Authorization': f'Bearer {admin_token}'}).get_json()
+    assert data["status"] == "failed"
+    assert "Fecha inválida" in data["error"]
+
+    download = client.get(f'/api/jobs/{job_id}/download', headers={'Authorization': f'Bearer {admin_token}'})
+    assert download.status_code == 409
+
+def test_job_not_visible_to_other_users(client, admin_token, income_data):
+    """Un usuario no administrador no ve trabajos de otros usuarios."""
+    response = submit(client, admin_token, {"name": "incomes_monthly_summary", "params": {"year": 2025}})
+    job_id = response.get_json()["id"]
+
+    other_token = create_access_token(identity="otro@hotel.com", additional_claims={"role": "user"})
+    response = client.get(f'/api/jobs/{job_id}', headers={'Authorization': f'Bearer {other_token}'})
+    assert response.status_code == 404
+
+def test_worker_mode_queues_and_claims_once(client, admin_token, session):
+    """En modo worker el trabajo queda en cola y solo puede reclamarse una vez."""
+    from backend.utils.jobs import job_runner
+
+    job_runner.mode = "worker"
+    try:
+        response = submit(client, admin_token, {"name": "incomes_monthly_summary", "params": {"year": 2025}})
+    finally:
+        job_runner.mode = "local"
+    job_id = response.get_json()["id"]
+    assert response.get_json()["status"] == "queued"
+
+    assert job_runner.claim_next() == job_id
+    assert job_runner.claim_next() is None
+    assert session.get(Job, job_id).status == "running"
@@ -0,0 +1,119 @@
+import os
+import re
+import threading
+from backend.utils.metrics import Metrics
+
+def _value(text, series):
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+def test_metrics_counts_requests_per_endpoint(client, admin_token, session):
+    """Cada petición suma en el contador y en el histograma de su blueprint y endpoint."""
+    labels = '{blueprint="room",endpoint="room.get_all_rooms"'
+    before = client.get("/metrics").get_data(as_text=True)
+    for _ in range(3):
+        client.get("/api/rooms", headers={"Authorization": f"Bearer {admin_token}"})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert "# TYPE hotel_http_request_duration_seconds histogram" in text
+    total = f'hotel_http_requests_total{labels},method="GET",status="200"}}'
+    assert _value(text, total) - _value(before, total) == 3
+    count = f"hotel_http_request_duration_seconds_count{labels}}}"
+    assert _value(text, count) - _value(before, count) == 3
+    assert _value(text, f'hotel_http_request_duration_seconds_bucket{labels},le="+Inf"}}') == _value(text, count)
+    # Solo la propia petición a /metrics está en curso
+    assert _value(text, "hotel_http_requests_in_flight") == 1
+
+def test_metrics_token(app, client):
+    app.config["METRICS_TOKEN"] = "secreto"
+    try:
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer secreto"}).status_code == 200
+    finally:
+        app.config["METRICS_TOKEN"] = None
+
+def test_metrics_restricted_to_local_addresses(app, client):
+    """Sin token, solo se atiende a las direcciones permitidas, salvo METRICS_PUBLIC."""
+    remote = {"REMOTE_ADDR": "10.0.0.5"}
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics", environ_base=remote).status_code == 403
+    app.config["METRICS_PUBLIC"] = True
+    try:
+        assert client.get("/metrics", environ_base=remote).status_code == 200
+    finally:
+        app.config["METRICS_PUBLIC"] = False
+
+def test_thread_shards_are_merged():
+    """Los contadores de cada hilo se suman al exportar, también los de hilos terminados."""
+    registry = Metrics()
+
+    def work():
+        for _ in range(1000):
+            registry.inc("hotel_test_total", (("kind", "a"),))
+        registry.observe("hotel_test_seconds", (), 0.02)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert 'hotel_test_total{kind="a"} 4000' in text
+    assert 'hotel_test_seconds_bucket{le="0.01"} 0' in text
+    assert 'hotel_test_seconds_bucket{le="0.025"} 4' in text
+    assert "hotel_test_seconds_count 4" in text
+    assert registry.render() == text  # Plegar fragmentos de hilos terminados no altera los totales
+
+def test_job_decorator_records_rows():
+    registry = Metrics()
+
+    @registry.job("archivar_reservas")
+    def job():
+        return 7
+
+    job()
+    job()
+    text = registry.render()
+    assert 'hotel_job_runs_total{job="archivar_reservas"} 2' in text
+    assert 'hotel_job_rows_total{job="archivar_reservas"} 14' in text
+    assert 'hotel_job_duration_seconds_count{job="archivar_reservas"} 2' in text
+
+def test_workers_are_aggregated(tmp_path):
+    """Con un directorio compartido se suman los workers; de los terminados solo quedan los contadores."""
+    registry = Metrics()
+    registry.describe("hotel_test_in_flight", "gauge", "")
+    registry.directory = str(tmp_path)
+    registry.inc("hotel_test_total", (("kind", "a"),))
+
+    ready_read, ready_write = os.pipe()
+    stop_read, stop_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        registry._after_fork()
+        registry.inc("hotel_test_total", (("kind", "a"),), 2)
+        registry.inc("hotel_test_in_flight")
+        registry.observe("hotel_test_seconds", (), 0.02)
+        registry.flush()
+        os.write(ready_write, b"1")
+        os.close(stop_write)
+        os.read(stop_read, 1)  # Sigue vivo hasta que el padre cierre el pipe
+        os._exit(0)
+
+    os.close(ready_write)
+    os.close(stop_read)
+    assert os.read(ready_read, 1) == b"1"
+    text = registry.render()
+    assert 'hotel_test_total{kind="a"} 3' in text
+    assert "hotel_test_in_flight 1" in text
+    assert "hotel_test_seconds_count 1" in text
+
+    os.close(stop_write)
+    os.waitpid(pid, 0)
+    os.close(ready_read)
+    text = registry.render()
+    assert 'hotel_test_total{kind="a"} 3' in text
+    assert "hotel_test_in_flight" not in text
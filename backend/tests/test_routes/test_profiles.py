@@ -0,0 +1,43 @@
+import pstats
+import pytest
+from flask_jwt_extended import create_access_token
+
+@pytest.fixture
+def user_token(app):
+    with app.app_context():
+        return create_access_token(identity="recepcion@hotel.com", additional_claims={"role": "user"})
+
+def test_admin_profiles_request(client, admin_token, session, tmp_path):
+    """?__profile=1 guarda el perfil y la línea de tiempo SQL, y devuelve su id."""
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.get("/api/rooms?__profile=1", headers=headers)
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    summary = client.get(f"/api/profiles/{profile_id}", headers=headers).get_json()
+    assert summary["path"] == "/api/rooms"
+    assert summary["status"] == 200
+    assert summary["sql"]["count"] == len(summary["sql"]["timeline"]) >= 1
+    assert any("get_all_rooms" in f["function"] for f in summary["functions"])
+
+    listed = client.get("/api/profiles", headers=headers).get_json()["profiles"]
+    assert listed[0]["id"] == profile_id and "timeline" not in listed[0]["sql"]
+
+    download = client.get(f"/api/profiles/{profile_id}/download", headers=headers)
+    assert download.status_code == 200
+    path = tmp_path / "perfil.pstats"
+    path.write_bytes(download.data)
+    assert pstats.Stats(str(path)).total_calls > 0
+    assert client.get("/api/profiles/..%2F..%2Fconfig/download", headers=headers).status_code == 404
+
+def test_profile_header_switch(client, admin_token, session):
+    response = client.get("/api/rooms", headers={"Authorization": f"Bearer {admin_token}", "X-Profile": "1"})
+    assert "X-Profile-Id" in response.headers
+    assert "X-Profile-Id" not in client.get("/api/rooms", headers={"Authorization": f"Bearer {admin_token}"}).headers
+
+def test_profiling_requires_admin(client, user_token, session):
+    headers = {"Authorization": f"Bearer {user_token}"}
+    response = client.get("/api/rooms?__profile=1", headers=headers)
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert client.get("/api/profiles", headers=headers).status_code == 403
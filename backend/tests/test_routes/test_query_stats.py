@@ -0,0 +1,48 @@
+import logging
+from datetime import datetime, timedelta
+import pytest
+from backend.models import Client, Room, Booking
+from backend.utils.query_stats import statement_shape
+
+@pytest.fixture
+def many_bookings(session):
+    """Doce reservas, cada una con su cliente y su habitación."""
+    start = datetime(2024, 3, 1, 15)
+    for i in range(12):
+        client = Client(nombre=f"Cliente {i}", email=f"qs{i}@test.com", telefono="555",
+                        documento=f"QS{i:03d}", fecha_nacimiento="1990-01-01")
+        room = Room(num_habitacion=800 + i, tipo="Doble", capacidad=2, precio_noche=100.0)
+        session.add_all([client, room])
+        session.flush()
+        session.add(Booking(cliente_id=client.id, habitacion_id=room.id, check_in=start,
+                            check_out=start + timedelta(days=2), tipo_habitacion="Doble", num_huespedes=2,
+                            metodo_pago="Tarjeta", estado="pendiente", valor_reservacion=200.0))
+    session.commit()
+    session.expunge_all()  # Como en una petición real: sin objetos en el identity map
+
+def test_statement_shape_collapses_in_lists():
+    assert statement_shape("SELECT *  FROM client\n WHERE id IN (?, ?, ?)") == "SELECT * FROM client WHERE id IN (?)"
+
+def test_server_timing_header(client, admin_token, session):
+    """Cada respuesta informa del número de sentencias y del tiempo de base de datos."""
+    response = client.get("/api/rooms", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and 'queries"' in timing
+
+def test_warns_on_repeated_statements(client, admin_token, many_bookings, caplog):
+    """La carga perezosa por fila en GET /api/bookings se detecta como posible N+1."""
+    with caplog.at_level(logging.WARNING, logger="hotel_spa"):
+        response = client.get("/api/bookings", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert any("Posible N+1 en GET /api/bookings" in r.message for r in caplog.records)
+
+def test_query_budget_fixture(client, admin_token, many_bookings, query_budget):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    with query_budget(3) as log:
+        client.get("/api/rooms", headers=headers)
+    assert log.count >= 1
+
+    with pytest.raises(AssertionError, match="presupuesto 3"):
+        with query_budget(3):
+            client.get("/api/bookings", headers=headers)
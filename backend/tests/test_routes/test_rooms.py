@@ -234,4 +234,23 @@ def test_filter_rooms_by_availability(client, admin_token):
     
     assert response.status_code == 200
     data = json.loads(response.data)
-    assert all(room['disponibilidad'] == 'disponible' for room in data)
\ No newline at end of file
+    assert all(room['disponibilidad'] == 'disponible' for room in data)
+
+
+def test_room_options(client, admin_token, session):
+    """Las opciones devuelven id, etiqueta y los datos del formulario, sin habitaciones eliminadas."""
+    from backend.models import Room
+    session.add_all([
+        Room(num_habitacion=302, tipo="Doble", capacidad=2, precio_noche=90.0, disponibilidad="Ocupada"),
+        Room(num_habitacion=301, tipo="Suite", capacidad=4, precio_noche=200.0, disponibilidad="Disponible"),
+        Room(num_habitacion=303, tipo="Doble", capacidad=2, precio_noche=90.0, is_deleted=True),
+    ])
+    session.commit()
+    headers = {'Authorization': f'Bearer {admin_token}'}
+
+    options = client.get('/api/rooms/options', headers=headers).get_json()
+    assert [o["label"] for o in options] == ["Habitación 301 (Suite)", "Habitación 302 (Doble)"]
+    assert options[0]["precio_noche"] == 200.0 and options[0]["disponible"] is True
+
+    available = client.get('/api/rooms/options?disponibles=true', headers=headers).get_json()
+    assert [o["label"] for o in available] == ["Habitación 301 (Suite)"]
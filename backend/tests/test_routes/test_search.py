@@ -0,0 +1,90 @@
+from datetime import datetime
+import pytest
+from backend.models import Client, Room, Booking
+
+@pytest.fixture
+def search_data(session):
+    """Clientes y una reserva con notas para la búsqueda de texto completo."""
+    clients = [
+        Client(nombre="José Martínez", email="jose@correo.com", telefono="3001112233",
+               documento="CC1001", fecha_nacimiento="1985-05-05", comentarios="Prefiere piso alto"),
+        Client(nombre="Josefina Pérez", email="josefina@correo.com", telefono="3004445566",
+               documento="CC1002", fecha_nacimiento="1990-01-01"),
+        Client(nombre="Ana Gómez", email="ana@correo.com", telefono="3007778899",
+               documento="CC2001", fecha_nacimiento="1992-02-02", is_deleted=True),
+    ]
+    room = Room(num_habitacion=940, tipo="Suite", capacidad=2, precio_noche=100.0)
+    session.add_all(clients + [room])
+    session.flush()
+    session.add(Booking(cliente_id=clients[1].id, habitacion_id=room.id, check_in=datetime(2024, 6, 1),
+                        check_out=datetime(2024, 6, 3), tipo_habitacion="Suite", num_huespedes=2,
+                        metodo_pago="Efectivo", estado="pendiente", notas="Llega tarde, cuna para bebé"))
+    session.commit()
+    return clients
+
+def search(client, token, query):
+    return client.get(f'/api/search?{query}', headers={'Authorization': f'Bearer {token}'})
+
+def test_search_by_prefix_ignores_accents(client, admin_token, search_data):
+    """Los términos se buscan por prefijo y sin distinguir tildes."""
+    data = search(client, admin_token, 'q=jose').get_json()
+    assert data["total"] == 2
+    assert {r["label"] for r in data["results"]} == {"José Martínez", "Josefina Pérez"}
+
+    data = search(client, admin_token, 'q=martinez').get_json()
+    assert [r["label"] for r in data["results"]] == ["José Martínez"]
+    assert "<mark>" in data["results"][0]["snippet"]
+
+def test_search_document_and_notes(client, admin_token, search_data):
+    """Busca por documento en clientes y por notas en reservas."""
+    data = search(client, admin_token, 'q=CC1002').get_json()
+    assert [(r["type"], r["label"]) for r in data["results"]] == [("client", "Josefina Pérez")]
+
+    data = search(client, admin_token, 'q=bebe').get_json()
+    assert [(r["type"], r["detail"]) for r in data["results"]] == [("booking", "Josefina Pérez")]
+
+    assert search(client, admin_token, 'q=bebe&type=client').get_json()["total"] == 0
+
+def test_search_index_follows_writes(client, admin_token, session, search_data):
+    """Los triggers mantienen el índice al actualizar y eliminar, y se omiten los eliminados lógicamente."""
+    assert search(client, admin_token, 'q=ana').get_json()["total"] == 0
+
+    search_data[0].nombre = "José Ramírez"
+    session.commit()
+    assert search(client, admin_token, 'q=martinez').get_json()["total"] == 0
+    assert search(client, admin_token, 'q=ramirez').get_json()["total"] == 1
+
+    session.query(Booking).delete()
+    session.commit()
+    assert search(client, admin_token, 'q=bebe').get_json()["total"] == 0
+
+def test_search_pagination(client, admin_token, search_data):
+    """Los resultados se paginan conservando el total."""
+    first = search(client, admin_token, 'q=correo&per_page=1').get_json()
+    second = search(client, admin_token, 'q=correo&per_page=1&page=2').get_json()
+    assert first["total"] == second["total"] == 2
+    assert first["results"][0]["id"] != second["results"][0]["id"]
+    assert search(client, admin_token, 'q=correo&page=5').get_json() == {
+        "q": "correo", "page": 5, "per_page": 20, "total": 2, "results": []
+    }
+
+@pytest.mark.parametrize("query", ["q=", "q=jose&type=rooms", "q=jose&per_page=0"])
+def test_search_invalid_params(client, admin_token, query):
+    assert search(client, admin_token, query).status_code == 400
+
+def test_search_snippet_is_escaped(client, admin_token, session, search_data):
+    """El texto original se escapa: solo los marcadores de coincidencia son HTML."""
+    search_data[0].comentarios = 'Piso alto <img src=x onerror="alert(1)">'
+    session.commit()
+    snippet = search(client, admin_token, 'q=piso').get_json()["results"][0]["snippet"]
+    assert "<img" not in snippet
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in snippet
+    assert "<mark>Piso</mark>" in snippet
+
+def test_create_all_only_rebuilds_new_indexes(app, session):
+    """create_all en cada arranque no reindexa las tablas FTS ya existentes."""
+    from backend.extensions import db
+    from .test_stats_queries import capture_queries
+    with capture_queries() as queries:
+        db.create_all()
+    assert not [statement for statement, _ in queries if "'rebuild'" in statement]
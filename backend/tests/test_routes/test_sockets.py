@@ -0,0 +1,81 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from backend.extensions import socketio
+from backend.utils.notifier import notifier, role_room
+
+@pytest.fixture
+def socket_client(app, admin_token):
+    """Crea un cliente Socket.IO autenticado con el token del administrador."""
+    client = socketio.test_client(app, auth={"token": admin_token, "desk": "recepcion"})
+    yield client
+    if client.is_connected():
+        client.disconnect()
+
+def test_connect_without_token_is_rejected(app):
+    """Verifica que las conexiones sin JWT son rechazadas."""
+    client = socketio.test_client(app)
+    assert not client.is_connected()
+
+def test_connect_with_invalid_token_is_rejected(app):
+    """Verifica que un token inválido es rechazado."""
+    client = socketio.test_client(app, auth={"token": "token-invalido"})
+    assert not client.is_connected()
+
+def test_connect_with_token(socket_client):
+    """Verifica que un token válido permite conectarse."""
+    assert socket_client.is_connected()
+
+def test_events_are_coalesced(socket_client):
+    """Verifica que varios eventos dentro de la ventana se envían en un solo mensaje."""
+    socket_client.get_received()
+
+    for i in range(50):
+        notifier.emit("reserva_vencida", {"vencidas": [{"id": i, "cliente": f"Cliente {i}"}]})
+    notifier.emit("reserva_vencida", {"vencidas": [{"id": 0, "cliente": "Cliente actualizado"}]})
+    notifier.flush()
+
+    received = [r for r in socket_client.get_received() if r["name"] == "reserva_vencida"]
+    assert len(received) == 1
+    vencidas = received[0]["args"][0]["vencidas"]
+    assert len(vencidas) == 50
+    assert vencidas[0]["cliente"] == "Cliente actualizado"
+
+def test_events_only_reach_relevant_rooms(app, socket_client):
+    """Verifica que los eventos dirigidos a otro rol no llegan al cliente."""
+    token = create_access_token(identity="recepcion@hotel.com", additional_claims={"role": "user"})
+    user_client = socketio.test_client(app, auth={"token": token})
+    socket_client.get_received()
+    user_client.get_received()
+
+    notifier.emit("alerta_proxima", {"alertas": [{"id": 1}]}, rooms=[role_room("admin")])
+    notifier.flush()
+
+    assert [r["name"] for r in socket_client.get_received()] == ["alerta_proxima"]
+    assert user_client.get_received() == []
+    user_client.disconnect()
+
+def test_outbox_transport_relays_events(app, session, socket_client):
+    """Verifica que los eventos escritos en socket_outbox por otro proceso se reenvían."""
+    from backend.models import SocketOutbox
+    from backend.utils.notifier import OutboxRelay
+
+    relay = OutboxRelay()
+    relay.init_app(app)
+    relay.poll_once()  # Inicializa el cursor
+    socket_client.get_received()
+
+    notifier.transport = "outbox"
+    try:
+        notifier.emit("reserva_vencida", {"vencidas": [{"id": 1}, {"id": 2}]})
+        notifier.flush()
+    finally:
+        notifier.transport = "direct"
+
+    assert session.query(SocketOutbox).count() == 1
+    assert socket_client.get_received() == []
+
+    assert relay.poll_once() == 1
+    received = socket_client.get_received()
+    assert [r["name"] for r in received] == ["reserva_vencida"]
+    assert received[0]["args"][0]["vencidas"] == [{"id": 1}, {"id": 2}]
+    assert relay.poll_once() == 0
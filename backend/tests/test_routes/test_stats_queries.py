@@ -0,0 +1,97 @@
+import re
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from backend.extensions import db
+from backend.utils.date_range import DateRange, date_range
+from backend.utils.lookup import client_lookup
+
+@contextmanager
+def capture_queries():
+    """Registra las sentencias SQL (con sus parámetros) ejecutadas dentro del bloque."""
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+def query_plan(statement, parameters):
+    rows = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+def test_date_range_is_half_open():
+    """from/to inclusivos se convierten en [from, to + 1 día)."""
+    rango = date_range({"from": "2024-01-01", "to": "2024-01-31"})
+    assert (rango.start, rango.end) == (datetime(2024, 1, 1), datetime(2024, 2, 1))
+    assert rango.to_dict() == {"from": "2024-01-01", "to": "2024-01-31"}
+
+    assert date_range({"year": "2024", "month": "12"}).end == datetime(2025, 1, 1)
+    assert date_range({"year": "2024"}).start == datetime(2024, 1, 1)
+    assert DateRange.month(datetime(2024, 2, 15, 10)).end == datetime(2024, 3, 1)
+
+@pytest.mark.parametrize("args", [{"from": "2024-02-01", "to": "2024-01-01"}, {"year": "24x"},
+                                  {"year": "2024", "month": "13"}, {"from": "01/02/2024"}])
+def test_date_range_invalid(args):
+    with pytest.raises(ValueError):
+        date_range(args)
+
+@pytest.mark.parametrize("endpoint", [
+    "/api/stats/daily-revenue",
+    "/api/stats/daily-clients",
+    "/api/stats/monthly-revenue",
+    "/api/stats/current-month-payments",
+    "/api/stats/quick-stats",
+    "/api/incomes/export?from=2024-01-01&to=2024-01-31&estado=confirmado",
+    "/api/archives/export?from=2024-01-01&to=2024-01-31",
+])
+def test_stats_queries_use_index_range_scans(app, client, admin_token, endpoint):
+    """Los filtros por fecha son predicados de rango sobre columnas indexadas, nunca SCAN."""
+    with capture_queries() as queries:
+        response = client.get(endpoint, headers={'Authorization': f'Bearer {admin_token}'})
+        response.get_data()
+    assert response.status_code == 200
+
+    ranged = [(s, p) for s, p in queries if re.search(r"(fecha_pago|check_in) >= \?", s)]
+    assert ranged, "No se ejecutó ninguna consulta con rango de fechas"
+    for statement, parameters in ranged:
+        assert "strftime" not in statement.split("WHERE", 1)[1].split("GROUP BY")[0]
+        plan = query_plan(statement, parameters)
+        for table in ("income", "booking", "archivo"):
+            assert not any(line.startswith(f"SCAN {table}") and "INDEX" not in line for line in plan), plan
+        assert any("USING INDEX" in line or "USING COVERING INDEX" in line for line in plan), plan
+        if " JOIN " not in statement:
+            # Consultas sobre una sola tabla: el rango de fechas forma parte de la búsqueda en el índice
+            assert any(re.search(r"(fecha_pago|check_in)>\?", line) for line in plan), plan
+
+def test_current_month_payments_requires_month_with_year(client, admin_token):
+    """Con year hay que indicar month: el endpoint siempre devuelve un mes."""
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    assert client.get('/api/stats/current-month-payments?year=2025', headers=headers).status_code == 400
+    response = client.get('/api/stats/current-month-payments?year=2025&month=3', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["month"] == "2025-03"
+
+@pytest.mark.parametrize("endpoint, table, index", [
+    ("/api/stats/current-occupancy", "room", "ix_room_active_disponibilidad"),
+    ("/api/rooms/options", "room", "ix_room_active_num_habitacion"),
+    ("/api/clients/lookup?prefix=a", "client", "ix_client_active_nombre"),
+])
+def test_active_rows_use_partial_covering_indexes(app, client, admin_token, endpoint, table, index):
+    """Las consultas sobre registros activos (is_deleted = 0) se resuelven con índices parciales cubrientes."""
+    client_lookup.invalidate()
+
+    with capture_queries() as queries:
+        response = client.get(endpoint, headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+
+    active = [(s, p) for s, p in queries if f"{table}.is_deleted = 0" in s]
+    assert active
+    for statement, parameters in active:
+        plan = query_plan(statement, parameters)
+        assert any(f"USING COVERING INDEX {index}" in line for line in plan), plan
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from flask import current_app
+from sqlalchemy import select, insert, update, delete, func, literal
+from ..extensions import db
+from ..models import Booking, Archivo, Income
+from ..analytics.dashboard import dashboard_cache
+from ..analytics.kpi import kpi_cache
+from .client_totals import shift_bookings_to_archive
+
+# Estado con el que se archiva una reserva según su estado actual
+ARCHIVE_STATES = {
+    "vencida": "vencida",
+    "pendiente": "cancelada",
+    "confirmada": "reembolso",
+}
+
+# Estado del pago al archivar; las reservas sin entrada conservan el estado de su pago
+ARCHIVE_PAYMENT_STATES = {
+    "vencida": "confirmado",
+    "confirmada": "reembolso",
+}
+
+_ARCHIVE_COLUMNS = ["booking_id", "cliente_id", "habitacion_id", "check_in", "check_out", "tipo_habitacion",
+                    "num_huespedes", "metodo_pago", "notas", "valor_reservacion", "estado", "fecha_archivo"]
+
+
+def archive_state(estado):
+    return ARCHIVE_STATES.get(estado, estado)
+
+
+def archive_payment_state(estado):
+    return ARCHIVE_PAYMENT_STATES.get(estado)
+
+
+def archive_date():
+    """Fecha de archivo en hora de Bogotá, sin zona (como el resto de fechas de la base)."""
+    return datetime.now(ZoneInfo("America/Bogota")).replace(tzinfo=None)
+
+
+def _begin_write():
+    # pysqlite abre la transacción en el primer INSERT: el SELECT de ids quedaría fuera.
+    # BEGIN IMMEDIATE toma el bloqueo de escritura antes de elegir las filas del lote.
+    connection = db.session.connection()
+    if connection.dialect.name == "sqlite" and not connection.connection.driver_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def _archive_chunk(cutoff, batch_size, fecha_archivo):
+    """Archiva un lote en una sola transacción. Devuelve el número de reservas movidas."""
+    booking, archivo, income = Booking.__table__, Archivo.__table__, Income.__table__
+    try:
+        _begin_write()
+        ids = db.session.execute(
+            select(booking.c.id).where(
+                booking.c.estado == "vencida",
+                booking.c.check_out < cutoff
+            ).order_by(booking.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            db.session.commit()
+            return 0
+
+        last_archive_id = db.session.execute(select(func.max(archivo.c.id))).scalar() or 0
+
+        # 1. Copiar las reservas al archivo
+        db.session.execute(insert(archivo).from_select(_ARCHIVE_COLUMNS, select(
+            booking.c.id, booking.c.cliente_id, booking.c.habitacion_id, booking.c.check_in, booking.c.check_out,
+            booking.c.tipo_habitacion, booking.c.num_huespedes, booking.c.metodo_pago,
+            func.coalesce(booking.c.notas, ""), func.coalesce(booking.c.valor_reservacion, 0.0),
+            literal(archive_state("vencida")), literal(fecha_archivo, type_=archivo.c.fecha_archivo.type)
+        ).where(booking.c.id.in_(ids)).order_by(booking.c.id)))
+
+        # 2. Reapuntar sus ingresos al archivo recién creado (el id de reserva puede repetirse en archivos antiguos)
+        shift_bookings_to_archive(ids)
+        new_archive = select(archivo.c.id).where(
+            archivo.c.booking_id == income.c.booking_id,
+            archivo.c.id > last_archive_id
+        ).scalar_subquery()
+        db.session.execute(update(income).where(income.c.booking_id.in_(ids)).values(
+            archive_id=new_archive, booking_id=None
+        ))
+
+        # 3. Eliminar las reservas de la tabla activa
+        db.session.execute(delete(booking).where(booking.c.id.in_(ids)))
+        db.session.commit()
+        return len(ids)
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def archive_expired_bookings(grace_days=None, batch_size=None, now=None):
+    """
+    Mueve a Archivo las reservas vencidas cuyo check_out es anterior al periodo de
+    gracia, por lotes de batch_size reservas por transacción. Devuelve el total archivado.
+    """
+    config = current_app.config
+    grace_days = config.get("ARCHIVE_GRACE_DAYS", 7) if grace_days is None else grace_days
+    batch_size = batch_size or config.get("ARCHIVE_BATCH_SIZE", 500)
+    cutoff = (now or datetime.now()) - timedelta(days=grace_days)
+    fecha_archivo = archive_date()
+
+    total = 0
+    while True:
+        archived = _archive_chunk(cutoff, batch_size, fecha_archivo)
+        total += archived
+        if archived < batch_size:
+            break
+
+    if total:
+        # Los totales por cliente y los KPIs cambiaron fuera del ORM
+        dashboard_cache.invalidate()
+        kpi_cache.clear()
+    return total
@@ -0,0 +1,214 @@
+import codecs
+import csv
+import json
+import re
+from sqlalchemy import select, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db
+from ..models import Client
+from ..analytics.dashboard import dashboard_cache
+from .lookup import client_lookup
+
+IMPORT_FORMATS = ("json", "csv")
+MAX_REPORTED_ERRORS = 1000
+
+_REQUIRED = ("nombre", "email", "telefono", "documento", "fecha_nacimiento")
+_OPTIONAL = ("preferencias", "comentarios")
+_MAX_LENGTHS = {"nombre": 120, "email": 120, "telefono": 20, "documento": 20, "preferencias": 255}
+_FECHA = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+$")
+_CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(stream):
+    """Recorre un arreglo JSON de objetos leyendo el archivo por bloques, sin cargarlo entero."""
+    decoder = json.JSONDecoder()
+    reader = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, pos, started = "", 0, False
+    eof = False
+
+    while True:
+        # Saltar espacios y separadores entre elementos
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if not started and pos < len(buffer):
+            if buffer[pos] != "[":
+                raise ValueError("El archivo JSON debe contener un arreglo de clientes")
+            started, pos = True, pos + 1
+            continue
+        if started and pos < len(buffer) and buffer[pos] == "]":
+            return
+        if pos < len(buffer):
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield item
+                pos = end
+                continue
+        if eof:
+            if started:
+                raise ValueError("Arreglo JSON incompleto")
+            return
+
+        chunk = stream.read(_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + reader.decode(chunk or b"", final=eof)
+        pos = 0
+
+
+def iter_csv(stream):
+    """Filas de un CSV con encabezados (UTF-8), leído de forma incremental."""
+    text = codecs.getreader("utf-8-sig")(stream)
+    yield from csv.DictReader(text)
+
+
+def iter_records(stream, fmt):
+    if fmt == "csv":
+        return iter_csv(stream)
+    return iter_json_array(stream)
+
+
+def validate_client(record):
+    """Devuelve (fila, None) con los campos de Client normalizados, o (None, error)."""
+    if not isinstance(record, dict):
+        return None, "Cada registro debe ser un objeto"
+    row = {}
+    for field in _REQUIRED + _OPTIONAL:
+        value = record.get(field)
+        value = str(value).strip() if value is not None else ""
+        if field in _REQUIRED and not value:
+            return None, f"Falta el campo obligatorio {field}"
+        if len(value) > _MAX_LENGTHS.get(field, len(value)):
+            return None, f"{field} supera {_MAX_LENGTHS[field]} caracteres"
+        row[field] = value or None
+    if not _EMAIL.match(row["email"]):
+        return None, "email inválido"
+    if not _FECHA.match(row["fecha_nacimiento"]):
+        return None, "fecha_nacimiento debe tener el formato YYYY-MM-DD"
+    row["email"] = row["email"].lower()
+    return row, None
+
+
+def _upsert(rows):
+    table = Client.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.documento],
+        set_={field: stmt.excluded[field] for field in ("nombre", "email", "telefono", "fecha_nacimiento",
+                                                         "preferencias", "comentarios")}
+    )
+    db.session.execute(stmt, rows)  # executemany
+
+
+class ImportReport:
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.fatal = None
+        self.seen = {}  # documento -> primera fila del archivo en que aparece
+
+    def error(self, row_number, documento, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "documento": documento, "error": message})
+
+    def to_dict(self):
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "aborted": self.fatal,
+        }
+
+
+def _import_batch(batch, report):
+    """Valida un lote contra la base de datos y lo inserta/actualiza con un solo executemany."""
+    valid = {}  # documento -> (fila del archivo, datos)
+    for row_number, record in batch:
+        row, error = validate_client(record)
+        if error:
+            report.error(row_number, record.get("documento") if isinstance(record, dict) else None, error)
+        elif row["documento"] in report.seen:
+            report.error(row_number, row["documento"], f"Documento repetido en la fila {report.seen[row['documento']]}")
+        else:
+            report.seen[row["documento"]] = row_number
+            valid[row["documento"]] = (row_number, row)
+    if not valid:
+        return
+
+    emails = {row["email"] for _, row in valid.values()}
+    existing = db.session.execute(
+        select(Client.documento, Client.email).where(or_(Client.documento.in_(list(valid)), Client.email.in_(emails)))
+    ).all()
+    existing_documentos = {documento for documento, _ in existing}
+    email_owner = {email: documento for documento, email in existing}
+
+    rows = []
+    for documento, (row_number, row) in valid.items():
+        owner = email_owner.setdefault(row["email"], documento)
+        if owner != documento:
+            report.error(row_number, documento, f"El email {row['email']} pertenece a otro cliente ({owner})")
+            continue
+        rows.append((row_number, row))
+
+    try:
+        if rows:
+            _upsert([row for _, row in rows])
+        db.session.commit()
+    except IntegrityError:
+        # Escrituras concurrentes: reintentar fila a fila para aislar el error
+        db.session.rollback()
+        accepted = []
+        for row_number, row in rows:
+            try:
+                with db.session.begin_nested():
+                    _upsert([row])
+                accepted.append((row_number, row))
+            except IntegrityError as e:
+                report.error(row_number, row["documento"], str(e.orig))
+        db.session.commit()
+        rows = accepted
+
+    for _, row in rows:
+        if row["documento"] in existing_documentos:
+            report.updated += 1
+        else:
+            report.inserted += 1
+
+
+def import_clients(stream, fmt="json", batch_size=1000):
+    """
+    Importa clientes desde un archivo JSON (arreglo) o CSV leído en streaming. Cada lote
+    se valida y se confirma por separado: los errores se reportan por fila sin abortar.
+    """
+    report = ImportReport()
+    batch = []
+    try:
+        try:
+            for item in enumerate(iter_records(stream, fmt), start=1):
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    report.processed += len(batch)
+                    _import_batch(batch, report)
+                    batch = []
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            # Archivo mal formado: se conservan los lotes ya importados y se indica dónde se detuvo
+            report.fatal = f"Lectura interrumpida tras {report.processed + len(batch)} registros: {e}"
+        if batch:
+            report.processed += len(batch)
+            _import_batch(batch, report)
+    finally:
+        # Las escrituras en bloque no disparan los eventos del ORM
+        client_lookup.invalidate()
+        dashboard_cache.invalidate()
+    return report
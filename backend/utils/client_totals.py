@@ -0,0 +1,149 @@
+from datetime import datetime
+from sqlalchemy import event, inspect, delete, insert, select, func, case, cast, literal, Integer
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from ..extensions import db
+from ..models import Income, ClientYearTotal
+
+_FIELDS = ("cliente_id", "fecha_pago", "monto", "estado_pago", "booking_id", "archive_id")
+
+
+def _values(target, old=False):
+    """Valores actuales (o anteriores al cambio) de los campos que afectan a los totales."""
+    state = inspect(target)
+    values = {}
+    for key in _FIELDS:
+        history = state.attrs[key].history  # No dispara cargas desde la base de datos
+        if old and history.deleted:
+            values[key] = history.deleted[0]
+        elif not old and history.added:
+            values[key] = history.added[0]
+        elif history.unchanged:
+            values[key] = history.unchanged[0]
+        else:
+            values[key] = state.dict.get(key)
+    return values
+
+
+def _contribution(values):
+    """Aporte de un ingreso a client_year_totals (solo los pagos confirmados cuentan)."""
+    if values["estado_pago"] != "confirmado" or values["cliente_id"] is None:
+        return None
+    fecha = values["fecha_pago"] or datetime.now()  # server_default aún no leído tras el INSERT
+    return {
+        "cliente_id": values["cliente_id"],
+        "year": fecha.year,
+        "transacciones": 1,
+        "total": values["monto"] or 0.0,
+        "reservas_booking": 1 if values["booking_id"] is not None else 0,
+        "reservas_archive": 1 if values["archive_id"] is not None else 0,
+    }
+
+
+def _apply(connection, contribution, sign):
+    """Suma (o resta) un aporte con un UPSERT en la misma transacción del flush."""
+    if contribution is None:
+        return
+    table = ClientYearTotal.__table__
+    row = {k: (v * sign if k not in ("cliente_id", "year") else v) for k, v in contribution.items()}
+    stmt = sqlite_insert(table).values(**row)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.cliente_id, table.c.year],
+        set_={c: table.c[c] + stmt.excluded[c]
+              for c in ("transacciones", "total", "reservas_booking", "reservas_archive")}
+    ))
+    if sign < 0:
+        connection.execute(delete(table).where(
+            table.c.cliente_id == row["cliente_id"], table.c.year == row["year"],
+            table.c.transacciones <= 0
+        ))
+
+
+@event.listens_for(Income, "after_insert")
+def _income_inserted(mapper, connection, target):
+    _apply(connection, _contribution(_values(target)), 1)
+
+
+def _old_values(connection, target):
+    """Valores anteriores: de la historia si estaban cargados, si no desde la fila aún sin modificar."""
+    state = inspect(target)
+    old = _values(target, old=True)
+    if any(key not in state.dict and not state.attrs[key].history.deleted for key in _FIELDS) or \
+            any(state.attrs[key].history.added and not state.attrs[key].history.deleted for key in _FIELDS):
+        table = Income.__table__
+        row = connection.execute(
+            select(*(table.c[key] for key in _FIELDS)).where(table.c.id == target.id)
+        ).mappings().first()
+        old = dict(row) if row else old
+    return old
+
+
+@event.listens_for(Income, "before_update")
+def _income_updating(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[key].history.has_changes() for key in _FIELDS):
+        state.info["client_totals_old"] = _contribution(_old_values(connection, target))
+
+
+@event.listens_for(Income, "after_update")
+def _income_updated(mapper, connection, target):
+    state = inspect(target)
+    if "client_totals_old" not in state.info:
+        return
+    old, new = state.info.pop("client_totals_old"), _contribution(_values(target))
+    if old != new:
+        _apply(connection, old, -1)
+        _apply(connection, new, 1)
+
+
+@event.listens_for(Income, "before_delete")
+def _income_deleting(mapper, connection, target):
+    inspect(target).info["client_totals_old"] = _contribution(_old_values(connection, target))
+
+
+@event.listens_for(Income, "after_delete")
+def _income_deleted(mapper, connection, target):
+    _apply(connection, inspect(target).info.pop("client_totals_old", None), -1)
+
+
+def shift_bookings_to_archive(booking_ids):
+    """
+    Ajuste en bloque para los ingresos de estas reservas que pasan a apuntar a su archivo
+    (UPDATE sin ORM, sin eventos): mueve cada pago confirmado de reservas_booking a reservas_archive.
+    """
+    table = ClientYearTotal.__table__
+    year = cast(func.strftime('%Y', Income.fecha_pago), Integer)
+    moved = select(
+        Income.cliente_id, year, literal(0), literal(0.0), -func.count(Income.id), func.count(Income.id)
+    ).where(
+        Income.booking_id.in_(booking_ids),
+        Income.estado_pago == 'confirmado'
+    ).group_by(Income.cliente_id, year)
+
+    stmt = sqlite_insert(table).from_select(
+        ["cliente_id", "year", "transacciones", "total", "reservas_booking", "reservas_archive"], moved
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.cliente_id, table.c.year],
+        set_={c: table.c[c] + stmt.excluded[c] for c in ("reservas_booking", "reservas_archive")}
+    ))
+
+
+def rebuild_client_year_totals():
+    """Recalcula la tabla completa desde Income (tras cargas masivas o cambios fuera del ORM)."""
+    table = ClientYearTotal.__table__
+    year = cast(func.strftime('%Y', Income.fecha_pago), Integer)
+    source = select(
+        Income.cliente_id,
+        year,
+        func.count(Income.id),
+        func.sum(Income.monto),
+        func.sum(case((Income.booking_id.isnot(None), 1), else_=0)),
+        func.sum(case((Income.archive_id.isnot(None), 1), else_=0)),
+    ).where(Income.estado_pago == 'confirmado').group_by(Income.cliente_id, year)
+
+    db.session.execute(delete(table))
+    db.session.execute(insert(table).from_select(
+        ["cliente_id", "year", "transacciones", "total", "reservas_booking", "reservas_archive"], source
+    ))
+    db.session.commit()
+    return db.session.execute(select(func.count()).select_from(table)).scalar()
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, true
+from .helpers import parse_date
+
+
+def today():
+    """Inicio del día actual (medianoche)."""
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def month_start(value):
+    """Primer instante del mes de una fecha."""
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value, months):
+    """Suma (o resta) meses a una fecha de inicio de mes."""
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+class DateRange:
+    """
+    Rango semiabierto [start, end). Los predicados se aplican sobre la columna sin
+    envolverla en funciones, de modo que SQLite puede recorrer el índice por rango.
+    Un extremo None deja el rango abierto por ese lado.
+    """
+
+    def __init__(self, start=None, end=None):
+        if start is not None and end is not None and start >= end:
+            raise ValueError("from debe ser anterior o igual a to")
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def day(cls, value):
+        start = value.replace(hour=0, minute=0, second=0, microsecond=0)
+        return cls(start, start + timedelta(days=1))
+
+    @classmethod
+    def month(cls, value):
+        start = month_start(value)
+        return cls(start, add_months(start, 1))
+
+    @classmethod
+    def year(cls, year):
+        return cls(datetime(year, 1, 1), datetime(year + 1, 1, 1))
+
+    @property
+    def last_day(self):
+        """Último día incluido en el rango."""
+        return self.end - timedelta(days=1) if self.end else None
+
+    def filter(self, column):
+        """Predicado `column >= start AND column < end` para WHERE."""
+        conditions = []
+        if self.start is not None:
+            conditions.append(column >= self.start)
+        if self.end is not None:
+            conditions.append(column < self.end)
+        return and_(*conditions) if conditions else true()
+
+    def to_dict(self):
+        return {
+            "from": self.start.date().isoformat() if self.start else None,
+            "to": self.last_day.date().isoformat() if self.end else None,
+        }
+
+
+def date_range(args, default_start=None, default_end=None):
+    """
+    Construye un DateRange a partir de ?year=&month= o de ?from=&to= (días inclusivos).
+    Lanza ValueError si los parámetros son inválidos.
+    """
+    year, month = args.get("year"), args.get("month")
+    if year:
+        if not year.isdigit() or (month and (not month.isdigit() or not 1 <= int(month) <= 12)):
+            raise ValueError("year y month deben ser numéricos (month entre 1 y 12)")
+        if month:
+            return DateRange.month(datetime(int(year), int(month), 1))
+        return DateRange.year(int(year))
+
+    start = parse_date(args.get("from")) or default_start
+    to = parse_date(args.get("to"))
+    end = DateRange.day(to).end if to else default_end
+    return DateRange(start, end)
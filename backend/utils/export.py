@@ -0,0 +1,58 @@
+import csv
+import io
+from datetime import datetime
+from ..extensions import db
+
+# Filas por lote al leer de la base de datos y al escribir en la respuesta
+EXPORT_BATCH_SIZE = 1000
+
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(stmt, batch_size=EXPORT_BATCH_SIZE):
+    """Itera las filas de una consulta en lotes (yield_per) sin cargarla completa en memoria."""
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        for row in partition:
+            yield [_format_value(value) for value in row]
+
+
+def stream_csv(header, rows, batch_size=EXPORT_BATCH_SIZE):
+    """Generador de texto CSV: emite la cabecera y luego un bloque por cada lote de filas."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM para que Excel detecte UTF-8 al abrir el archivo
+    buffer.write("\ufeff")
+    writer.writerow(header)
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    yield buffer.getvalue()
+
+
+def write_xlsx(path, header, rows, total=None, ctx=None, sheet_title="Datos"):
+    """Escribe un XLSX en modo write_only (memoria constante) informando el progreso."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    sheet.append(header)
+
+    for count, row in enumerate(rows, start=1):
+        sheet.append(row)
+        if ctx is not None and total and count % 10000 == 0:
+            ctx.progress(count / total)
+
+    workbook.save(path)
+    return path
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 def remove_sensitive_fields(data, sensitive_fields=["password"]):
     """
     Elimina campos sensibles de una lista de diccionarios o de un solo diccionario.
@@ -7,4 +9,28 @@ def remove_sensitive_fields(data, sensitive_fields=["password"]):
     elif isinstance(data, dict):
         return {k: v for k, v in data.items() if k not in sensitive_fields}
     else:
-        return data
\ No newline at end of file
+        return data
+
+def parse_date(value):
+    """
+    Convierte una cadena YYYY-MM-DD (o YYYY-MM-DDTHH:MM:SS) en datetime.
+    Devuelve None si el valor está vacío y lanza ValueError si el formato es inválido.
+    """
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha inválida: {value}. Use YYYY-MM-DD")
+
+def percentile(sorted_values, pct):
+    """
+    Percentil `pct` (0-100) de una lista ya ordenada, por el método del rango más cercano.
+    Devuelve 0.0 si la lista está vacía.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import update, select
+from ..extensions import db, logger
+from ..models import Job
+
+# Reportes disponibles: nombre -> función(params, ctx) que devuelve la ruta del archivo generado
+REPORTS = {}
+
+
+def register_report(name):
+    """Registra una función como reporte ejecutable en segundo plano."""
+    def decorator(func):
+        REPORTS[name] = func
+        return func
+    return decorator
+
+
+class JobError(ValueError):
+    """Error de validación de un trabajo (p. ej. parámetros inválidos)."""
+
+
+class JobContext:
+    """Contexto que recibe cada reporte para informar progreso y ubicar su resultado."""
+
+    def __init__(self, job_id, results_dir):
+        self.job_id = job_id
+        self.results_dir = results_dir
+        self._last_progress = 0.0
+
+    def output_path(self, filename):
+        """Ruta donde el reporte debe escribir su archivo de resultado."""
+        directory = os.path.join(self.results_dir, self.job_id)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, filename)
+
+    def progress(self, fraction, message=None):
+        """Actualiza el progreso (0.0 - 1.0). Solo escribe cambios de al menos un 1%."""
+        fraction = max(0.0, min(1.0, float(fraction)))
+        if fraction - self._last_progress < 0.01 and message is None:
+            return
+        self._last_progress = fraction
+        values = {"progress": fraction}
+        if message is not None:
+            values["message"] = message[:255]
+        with db.engine.begin() as conn:
+            conn.execute(update(Job.__table__).where(Job.__table__.c.id == self.job_id).values(**values))
+
+
+class JobRunner:
+    """
+    Ejecuta los reportes en un pool de hilos. En modo "worker" los procesos web solo
+    encolan los trabajos y el worker los reclama de la tabla jobs.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.max_workers = 2
+        self.eager = False
+        self.mode = "local"
+        self.results_dir = None
+        self._executor = None
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = app.config.get("JOBS_MAX_WORKERS", self.max_workers)
+        self.eager = app.config.get("JOBS_EAGER", False)
+        self.mode = app.config.get("JOBS_MODE", "local")
+        self.results_dir = app.config["JOBS_RESULTS_DIR"]
+        os.makedirs(self.results_dir, exist_ok=True)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        return self._executor
+
+    def submit(self, name, params=None, submitted_by=None):
+        """Crea el trabajo y lo despacha (o lo deja en cola para el worker)."""
+        if name not in REPORTS:
+            raise JobError(f"Reporte desconocido: {name}")
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            name=name,
+            params=json.dumps(params or {}),
+            status="queued",
+            submitted_by=submitted_by,
+            created_at=datetime.now()
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        if self.mode == "local":
+            if self.eager:
+                self._execute(job.id)
+            else:
+                self._start(job.id)
+        return job
+
+    def _start(self, job_id):
+        with self._lock:
+            self._running += 1
+        self.executor.submit(self._execute, job_id)
+
+    def claim_next(self):
+        """Marca como 'running' el trabajo en cola más antiguo y devuelve su id (o None)."""
+        table = Job.__table__
+        with db.engine.begin() as conn:
+            job_id = conn.execute(
+                select(table.c.id).where(table.c.status == "queued").order_by(table.c.created_at).limit(1)
+            ).scalar()
+            if job_id is None:
+                return None
+            claimed = conn.execute(
+                update(table)
+                .where(table.c.id == job_id, table.c.status == "queued")
+                .values(status="running", started_at=datetime.now())
+            ).rowcount
+        return job_id if claimed else None
+
+    def poll(self):
+        """Reclama trabajos en cola mientras haya hilos libres. Se usa en el worker."""
+        claimed = 0
+        while self._running < self.max_workers:
+            job_id = self.claim_next()
+            if job_id is None:
+                break
+            self._start(job_id)
+            claimed += 1
+        return claimed
+
+    def _execute(self, job_id):
+        with self.app.app_context():
+            try:
+                job = db.session.get(Job, job_id)
+                if job is None:
+                    return
+                job.status = "running"
+                job.started_at = job.started_at or datetime.now()
+                db.session.commit()
+
+                ctx = JobContext(job.id, self.results_dir)
+                path = REPORTS[job.name](json.loads(job.params or "{}"), ctx)
+
+                job.status = "done"
+                job.progress = 1.0
+                job.result_path = path
+                job.result_name = os.path.basename(path) if path else None
+                job.finished_at = datetime.now()
+                db.session.commit()
+            except Exception as e:
+                logger.error(f"Error en el trabajo {job_id}: {str(e)}")
+                db.session.rollback()
+                job = db.session.get(Job, job_id)
+                if job is not None:
+                    job.status = "failed"
+                    job.error = str(e)
+                    job.finished_at = datetime.now()
+                    db.session.commit()
+            finally:
+                db.session.remove()
+                if not self.eager:
+                    with self._lock:
+                        self._running -= 1
+
+
+def job_to_dict(job):
+    """Representación JSON de un trabajo."""
+    return {
+        "id": job.id,
+        "name": job.name,
+        "params": json.loads(job.params or "{}"),
+        "status": job.status,
+        "progress": round(job.progress or 0.0, 4),
+        "message": job.message,
+        "error": job.error,
+        "result_name": job.result_name,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "status_url": f"/api/jobs/{job.id}",
+        "download_url": f"/api/jobs/{job.id}/download",
+    }
+
+
+job_runner = JobRunner()
@@ -0,0 +1,143 @@
+import functools
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update, insert, delete, case, or_
+from sqlalchemy.exc import IntegrityError
+from ..extensions import db, logger
+from ..models import SchedulerLease
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def try_acquire(name, holder, ttl, now=None):
+    """
+    Adquiere o renueva el lease `name` para `holder` durante `ttl` segundos.
+    Devuelve True si `holder` es el titular tras la operación.
+    """
+    now = now or _utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    table = SchedulerLease.__table__
+
+    # Renovar si ya somos titulares o tomar el lease si expiró (operación atómica)
+    with db.engine.begin() as conn:
+        result = conn.execute(
+            update(table)
+            .where(table.c.name == name, or_(table.c.holder == holder, table.c.expires_at < now))
+            .values(
+                holder=holder,
+                acquired_at=case((table.c.holder == holder, table.c.acquired_at), else_=now),
+                heartbeat_at=now,
+                expires_at=expires_at,
+            )
+        )
+        if result.rowcount:
+            return True
+
+    # El lease no existe todavía: el primero en insertarlo es el líder
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(table).values(
+                name=name, holder=holder, acquired_at=now, heartbeat_at=now, expires_at=expires_at
+            ))
+        return True
+    except IntegrityError:
+        return False
+
+
+def release(name, holder):
+    """Libera el lease si `holder` es su titular, para que otro proceso lo tome de inmediato."""
+    table = SchedulerLease.__table__
+    with db.engine.begin() as conn:
+        conn.execute(delete(table).where(table.c.name == name, table.c.holder == holder))
+
+
+class LeaderElection:
+    """
+    Elección de líder basada en un lease en la base de datos. Solo el proceso que
+    mantiene el lease vigente ejecuta las tareas programadas.
+    """
+
+    def __init__(self, name="scheduler"):
+        self.name = name
+        self.ttl = 30
+        self.heartbeat_interval = 10
+        self.app = None
+        self._valid_until = None
+        self._holder = None
+        self._holder_pid = None
+
+    @property
+    def holder(self):
+        """
+        Identificador del proceso titular. Se genera por pid: los workers de gunicorn
+        heredan este objeto del maestro al hacer fork y cada uno necesita el suyo.
+        """
+        pid = os.getpid()
+        if self._holder_pid != pid:
+            self._holder = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+            self._holder_pid = pid
+            self._valid_until = None  # El liderazgo del proceso padre no se hereda
+        return self._holder
+
+    def init_app(self, app):
+        self.app = app
+        self.ttl = app.config.get("SCHEDULER_LEASE_TTL", self.ttl)
+        self.heartbeat_interval = app.config.get("SCHEDULER_LEASE_HEARTBEAT", self.heartbeat_interval)
+
+    @property
+    def is_leader(self):
+        # Se deja de ser líder localmente al expirar el lease, aunque no se haya podido renovar
+        if self._holder_pid != os.getpid():
+            return False
+        return self._valid_until is not None and _utcnow() < self._valid_until
+
+    def heartbeat(self):
+        """Renueva el lease o intenta adquirirlo. Debe ejecutarse dentro de un app context."""
+        was_leader = self.is_leader
+        now = _utcnow()
+        try:
+            acquired = try_acquire(self.name, self.holder, self.ttl, now=now)
+        except Exception as e:
+            # Ante un error transitorio se conserva el liderazgo hasta que expire localmente
+            logger.error(f"Error al renovar el lease del scheduler: {str(e)}")
+            acquired = False
+            if not self.is_leader:
+                self._valid_until = None
+        else:
+            if acquired:
+                # Margen de un heartbeat para no solaparse con un nuevo líder
+                self._valid_until = now + timedelta(seconds=max(self.ttl - self.heartbeat_interval, 1))
+            else:
+                self._valid_until = None
+
+        if acquired and not was_leader:
+            logger.info(f"Proceso {self.holder} es ahora el líder del scheduler")
+        elif was_leader and not acquired:
+            logger.warning(f"Proceso {self.holder} perdió el liderazgo del scheduler")
+        return acquired
+
+    def release(self):
+        if self._valid_until is None or self.app is None:
+            return
+        self._valid_until = None
+        try:
+            with self.app.app_context():
+                release(self.name, self.holder)
+        except Exception as e:
+            logger.error(f"Error al liberar el lease del scheduler: {str(e)}")
+
+    def only(self, func):
+        """Decorador: la tarea solo se ejecuta en el proceso líder."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.is_leader:
+                return None
+            return func(*args, **kwargs)
+        return wrapper
+
+
+leader = LeaderElection()
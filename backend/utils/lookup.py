@@ -0,0 +1,157 @@
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+from ..extensions import db
+from ..models import Client
+
+_SESSION_KEY = "client_lookup_dirty"
+
+
+def normalize(value):
+    """Minúsculas sin tildes ni espacios repetidos, para comparar prefijos."""
+    value = unicodedata.normalize("NFKD", value or "")
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(value.lower().split())
+
+
+class PrefixIndex:
+    """Arreglo ordenado de (clave, id) consultado por prefijo con bisect."""
+
+    def __init__(self):
+        self._entries = []
+        self._keys_by_id = {}
+        self.labels = {}
+
+    def __len__(self):
+        return len(self.labels)
+
+    @staticmethod
+    def _keys(name, documento):
+        name = normalize(name)
+        words = name.split(" ")
+        # Nombre completo, cada apellido o nombre posterior y el documento
+        keys = {" ".join(words[i:]) for i in range(len(words))}
+        if documento:
+            keys.add(normalize(documento))
+        return keys
+
+    def load(self, rows):
+        """Reconstruye el índice a partir de filas (id, nombre, documento)."""
+        entries, keys_by_id, labels = [], {}, {}
+        for item_id, name, documento in rows:
+            keys = self._keys(name, documento)
+            entries.extend((key, item_id) for key in keys)
+            keys_by_id[item_id] = keys
+            labels[item_id] = f"{name} ({documento})" if documento else name
+        entries.sort()
+        self._entries, self._keys_by_id, self.labels = entries, keys_by_id, labels
+
+    def remove(self, item_id):
+        for key in self._keys_by_id.pop(item_id, ()):
+            i = bisect_left(self._entries, (key, item_id))
+            if i < len(self._entries) and self._entries[i] == (key, item_id):
+                del self._entries[i]
+        self.labels.pop(item_id, None)
+
+    def add(self, item_id, name, documento):
+        self.remove(item_id)
+        keys = self._keys(name, documento)
+        for key in keys:
+            insort(self._entries, (key, item_id))
+        self._keys_by_id[item_id] = keys
+        self.labels[item_id] = f"{name} ({documento})" if documento else name
+
+    def search(self, prefix, limit=10):
+        """Ids cuyo nombre, apellido o documento empieza por el prefijo (sin repetir)."""
+        prefix = normalize(prefix)
+        found = []
+        seen = set()
+        i = bisect_left(self._entries, (prefix,))
+        while i < len(self._entries) and len(found) < limit:
+            key, item_id = self._entries[i]
+            if not key.startswith(prefix):
+                break
+            if item_id not in seen:
+                seen.add(item_id)
+                found.append(item_id)
+            i += 1
+        return found
+
+
+class ClientLookup:
+    """
+    Índice de prefijos de clientes activos en memoria. Las escrituras de este proceso
+    se aplican de forma incremental; las de otros procesos, al recargar por antigüedad.
+    """
+
+    def __init__(self):
+        self.max_staleness = 60
+        self.index = PrefixIndex()
+        self._loaded_at = None
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_staleness = app.config.get("LOOKUP_MAX_STALENESS_SECONDS", self.max_staleness)
+
+    def mark_dirty(self, client_id):
+        if client_id is not None:
+            with self._lock:
+                self._dirty.add(client_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    @staticmethod
+    def _select():
+        return select(Client.id, Client.nombre, Client.documento).where(Client.is_deleted == False)
+
+    def refresh(self):
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.max_staleness:
+                self._dirty = set()
+                self.index.load(db.session.execute(self._select()).all())
+                self._loaded_at = time.monotonic()
+            elif self._dirty:
+                dirty, self._dirty = self._dirty, set()
+                for client_id in dirty:
+                    self.index.remove(client_id)
+                for row in db.session.execute(self._select().where(Client.id.in_(dirty))):
+                    self.index.add(*row)
+
+    def lookup(self, prefix, limit=10):
+        """Lista de {id, label} de los clientes que coinciden con el prefijo."""
+        self.refresh()
+        labels = self.index.labels
+        return [{"id": client_id, "label": labels[client_id]}
+                for client_id in self.index.search(prefix, limit)]
+
+
+client_lookup = ClientLookup()
+
+
+@event.listens_for(Client, "after_insert")
+@event.listens_for(Client, "after_update")
+@event.listens_for(Client, "after_delete")
+def _mark_client_dirty(mapper, connection, target):
+    # Se publica al confirmar: antes, otro hilo recargaría la versión anterior
+    session = object_session(target)
+    if session is None:
+        client_lookup.mark_dirty(target.id)
+    elif target.id is not None:
+        session.info.setdefault(_SESSION_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_dirty_clients(session):
+    for client_id in session.info.pop(_SESSION_KEY, ()):
+        client_lookup.mark_dirty(client_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_clients(session):
+    session.info.pop(_SESSION_KEY, None)
@@ -0,0 +1,387 @@
+import atexit
+import functools
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites (segundos) de los histogramas, como los de prometheus_client
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_ENVIRON_KEY = "hotel_spa.metrics_start"
+_WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "BEGIN", "REPLACE")
+_WORKER_FILE = "metrics-{pid}.json"
+
+
+class _Shard:
+    """Contadores de un hilo: solo ese hilo escribe, así que no necesitan lock."""
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = defaultdict(float)  # (nombre, etiquetas) -> valor
+        self.histograms = {}  # (nombre, etiquetas) -> [cuenta por intervalo..., +Inf, suma]
+
+    def merge(self, other):
+        for key, value in list(other.counters.items()):
+            self.counters[key] += value
+        for key, values in list(other.histograms.items()):
+            mine = self.histograms.setdefault(key, [0] * len(values))
+            for i, value in enumerate(list(values)):
+                mine[i] += value
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(pairs):
+    # JSON convierte las tuplas de etiquetas en listas
+    return tuple(tuple(pair) for pair in pairs)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def reset_directory(directory):
+    """Crea METRICS_DIR y elimina los archivos de una ejecución anterior (los pid pueden repetirse)."""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, _WORKER_FILE.format(pid="*"))):
+        os.remove(path)
+
+
+class Metrics:
+    """
+    Contadores e histogramas en memoria con formato de exposición de Prometheus. Cada hilo
+    escribe en su propio fragmento; el lock solo se toma al crear un fragmento y al exportar.
+
+    Con varios workers de gunicorn, cada scrape llega a un worker cualquiera. Si se define
+    un directorio compartido (METRICS_DIR), cada proceso vuelca sus valores en él cada
+    `flush_interval` segundos y /metrics exporta la suma de todos los procesos: los contadores
+    de workers terminados se conservan y sus gauges se descartan.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards = []  # (hilo, fragmento)
+        self._retired = _Shard()  # Fragmentos de hilos ya terminados
+        self._lock = threading.Lock()
+        self._descriptions = {}  # nombre -> (tipo, ayuda)
+        self._collectors = []  # Funciones que devuelven [(nombre, etiquetas, valor)] al exportar
+        self.directory = None
+        self.flush_interval = 5.0
+        self._writer_pid = None  # Proceso con el hilo de volcado en marcha
+
+    def describe(self, name, kind, help_text):
+        self._descriptions[name] = (kind, help_text)
+
+    def collector(self, func):
+        """Registra una función evaluada en cada exportación (gauges de estado)."""
+        self._collectors.append(func)
+        return func
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            if self.directory and self._writer_pid != os.getpid():
+                self._start_writer()
+        return shard
+
+    def inc(self, name, labels=(), value=1):
+        self._shard().counters[(name, labels)] += value
+
+    def observe(self, name, labels, value):
+        histograms = self._shard().histograms
+        values = histograms.get((name, labels))
+        if values is None:
+            values = histograms[(name, labels)] = [0] * (len(self.buckets) + 2)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def snapshot(self):
+        """Suma de todos los fragmentos; los de hilos terminados se pliegan en uno solo."""
+        total = _Shard()
+        with self._lock:
+            alive = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, shard))
+                else:
+                    self._retired.merge(shard)
+            self._shards = alive
+            total.merge(self._retired)
+            shards = [shard for _, shard in alive]
+        for shard in shards:
+            total.merge(shard)
+        return total
+
+    def reset(self):
+        with self._lock:
+            self._shards = []
+            self._retired = _Shard()
+        self._local = threading.local()
+
+    def share(self, directory, flush_interval=None):
+        """Agrega los valores de todos los procesos que vuelcan en `directory` (None: solo este proceso)."""
+        self.directory = directory
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._start_writer()
+
+    def _after_fork(self):
+        # El worker no hereda los contadores del maestro ni su hilo de volcado
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = _Shard()
+        self._local = threading.local()
+        self._writer_pid = None
+
+    def _start_writer(self):
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+        threading.Thread(target=self._write_loop, args=(os.getpid(),), name="metrics-writer", daemon=True).start()
+
+    def _write_loop(self, pid):
+        while self.directory and self._writer_pid == pid:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                from ..extensions import logger
+                logger.warning(f"No se pudieron volcar las métricas: {str(e)}")
+
+    def _collect(self):
+        return [series for func in self._collectors for series in func()]
+
+    def flush(self):
+        """Escribe los valores de este proceso en el directorio compartido."""
+        if not self.directory:
+            return
+        total = self.snapshot()
+        data = {
+            "counters": [[name, labels, value] for (name, labels), value in total.counters.items()],
+            "histograms": [[name, labels, values] for (name, labels), values in total.histograms.items()],
+            "gauges": self._collect(),
+        }
+        path = os.path.join(self.directory, _WORKER_FILE.format(pid=os.getpid()))
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _merge_workers(self, total, gauges):
+        own = os.path.join(self.directory, _WORKER_FILE.format(pid=os.getpid()))
+        for path in glob.glob(os.path.join(self.directory, _WORKER_FILE.format(pid="*"))):
+            if path == own:
+                continue
+            try:
+                pid = int(os.path.basename(path)[len("metrics-"):-len(".json")])
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (ValueError, OSError):
+                continue
+            alive = _pid_alive(pid)
+            for name, labels, value in data["counters"]:
+                # Los gauges que se llevan como contador (en curso, conexiones) mueren con el proceso
+                if alive or self._descriptions.get(name, ("untyped",))[0] != "gauge":
+                    total.counters[(name, _labels(labels))] += value
+            for name, labels, values in data["histograms"]:
+                mine = total.histograms.setdefault((name, _labels(labels)), [0] * len(values))
+                for i, value in enumerate(values):
+                    mine[i] += value
+            if alive:
+                gauges.extend((name, _labels(labels), value) for name, labels, value in data["gauges"])
+
+    def render(self):
+        """Texto en formato de exposición de Prometheus (text/plain; version=0.0.4)."""
+        total = self.snapshot()
+        gauges = self._collect()
+        if self.directory:
+            self._merge_workers(total, gauges)
+        series = defaultdict(list)
+        for (name, labels), value in total.counters.items():
+            series[name].append((labels, value))
+        values = defaultdict(float)
+        for name, labels, value in gauges:
+            values[(name, labels)] += value
+        for (name, labels), value in values.items():
+            series[name].append((labels, value))
+
+        lines = []
+        for name in sorted(set(series) | {name for name, _ in total.histograms}):
+            kind, help_text = self._descriptions.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(series.get(name, ())):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for (hist_name, labels), values in sorted(total.histograms.items()):
+                if hist_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), values[:-1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {_format_value(cumulative)}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-1])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+    def job(self, name):
+        """Decorador: duración, ejecuciones y filas procesadas (valor entero devuelto) de una tarea."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                rows = func(*args, **kwargs)
+                labels = (("job", name),)
+                self.observe("hotel_job_duration_seconds", labels, time.perf_counter() - start)
+                self.inc("hotel_job_runs_total", labels)
+                if isinstance(rows, int):
+                    self.inc("hotel_job_rows_total", labels, rows)
+                return rows
+            return wrapper
+        return decorator
+
+
+metrics = Metrics()
+# Al salir, el último volcado conserva los contadores del worker (p. ej. con --max-requests)
+atexit.register(metrics.flush)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=metrics._after_fork)
+
+metrics.describe("hotel_http_requests_total", "counter", "Peticiones HTTP atendidas")
+metrics.describe("hotel_http_request_duration_seconds", "histogram", "Duración de las peticiones HTTP")
+metrics.describe("hotel_http_requests_in_flight", "gauge", "Peticiones HTTP en curso")
+metrics.describe("hotel_db_pool_size", "gauge", "Conexiones del pool de la base de datos")
+metrics.describe("hotel_db_pool_checked_out", "gauge", "Conexiones del pool en uso")
+metrics.describe("hotel_sqlite_busy_errors_total", "counter", "Sentencias fallidas por base de datos bloqueada")
+metrics.describe("hotel_sqlite_busy_waits_total", "counter", "Escrituras que superaron METRICS_BUSY_WAIT_SECONDS (probable espera por bloqueo)")
+metrics.describe("hotel_sqlite_busy_wait_seconds_total", "counter", "Tiempo acumulado de esas escrituras")
+metrics.describe("hotel_job_runs_total", "counter", "Ejecuciones de tareas programadas")
+metrics.describe("hotel_job_duration_seconds", "histogram", "Duración de las tareas programadas")
+metrics.describe("hotel_job_rows_total", "counter", "Filas procesadas por las tareas programadas")
+metrics.describe("hotel_scheduler_leader", "gauge", "1 si este proceso ejecuta las tareas programadas")
+metrics.describe("hotel_socketio_connections", "gauge", "Conexiones Socket.IO abiertas")
+metrics.describe("hotel_socketio_connections_total", "counter", "Intentos de conexión Socket.IO por resultado")
+metrics.describe("hotel_socketio_emits_total", "counter", "Eventos emitidos por Socket.IO")
+
+
+class RequestMetrics:
+    """Instrumenta las peticiones de la app y expone el estado del pool y del scheduler."""
+
+    def __init__(self):
+        self.busy_wait_seconds = 0.1
+        self.app = None
+
+    def init_app(self, app):
+        if not app.config.get("METRICS_ENABLED", True):
+            return
+        self.app = app
+        self.busy_wait_seconds = app.config.get("METRICS_BUSY_WAIT_SECONDS", self.busy_wait_seconds)
+        metrics.share(app.config.get("METRICS_DIR"), app.config.get("METRICS_FLUSH_SECONDS"))
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+
+    def _start(self):
+        request.environ[_ENVIRON_KEY] = [time.perf_counter(), 500]
+        metrics.inc("hotel_http_requests_in_flight")
+
+    def _finish(self, response):
+        state = request.environ.get(_ENVIRON_KEY)
+        if state is not None:
+            state[1] = response.status_code
+        return response
+
+    def _teardown(self, exc):
+        state = request.environ.pop(_ENVIRON_KEY, None)
+        if state is None:
+            return
+        start, status = state
+        blueprint, endpoint = request.blueprint or "", request.endpoint or "none"
+        metrics.inc("hotel_http_requests_in_flight", value=-1)
+        metrics.inc("hotel_http_requests_total", (("blueprint", blueprint), ("endpoint", endpoint),
+                                                  ("method", request.method), ("status", status)))
+        metrics.observe("hotel_http_request_duration_seconds", (("blueprint", blueprint), ("endpoint", endpoint)),
+                        time.perf_counter() - start)
+
+
+request_metrics = RequestMetrics()
+
+
+@metrics.collector
+def _pool_metrics():
+    from ..extensions import db
+    app = request_metrics.app
+    if app is None:
+        return []
+    with app.app_context():
+        pool = db.engine.pool
+    series = []
+    if hasattr(pool, "size"):
+        series.append(("hotel_db_pool_size", (), pool.size()))
+    if hasattr(pool, "checkedout"):
+        series.append(("hotel_db_pool_checked_out", (), pool.checkedout()))
+    return series
+
+
+@metrics.collector
+def _leader_metrics():
+    from .lease import leader
+    return [("hotel_scheduler_leader", (), 1 if leader.is_leader else 0)]
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_write(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and statement.lstrip()[:7].upper().startswith(_WRITE_PREFIXES):
+        context._metrics_write_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_write(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_write_start", None)
+    if start is None:
+        return
+    # sqlite3 no expone el busy handler: una escritura lenta es, casi siempre, espera por el bloqueo
+    elapsed = time.perf_counter() - start
+    if elapsed >= request_metrics.busy_wait_seconds:
+        metrics.inc("hotel_sqlite_busy_waits_total")
+        metrics.inc("hotel_sqlite_busy_wait_seconds_total", value=elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    error = context.original_exception
+    if isinstance(error, sqlite3.OperationalError) and "locked" in str(error):
+        metrics.inc("hotel_sqlite_busy_errors_total")
@@ -0,0 +1,176 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, func
+from ..extensions import db, socketio, logger
+from ..models import SocketOutbox
+from .metrics import metrics
+
+# Salas a las que se une cada conexión autenticada
+STAFF_ROOM = "staff"
+
+
+def role_room(role):
+    """Nombre de la sala asociada a un rol."""
+    return f"role:{role}"
+
+
+def desk_room(desk):
+    """Nombre de la sala asociada a un puesto de recepción."""
+    return f"desk:{desk}"
+
+
+def _merge_payload(pending, payload):
+    """
+    Fusiona un payload nuevo sobre uno pendiente. Las listas se concatenan
+    (reemplazando elementos con el mismo "id") y el resto de valores se sobrescriben.
+    """
+    for key, value in payload.items():
+        if isinstance(value, list) and isinstance(pending.get(key), list):
+            existing = pending[key]
+            index = {item["id"]: i for i, item in enumerate(existing)
+                     if isinstance(item, dict) and "id" in item}
+            for item in value:
+                if isinstance(item, dict) and item.get("id") in index:
+                    existing[index[item["id"]]] = item
+                else:
+                    existing.append(item)
+        elif isinstance(value, list):
+            pending[key] = list(value)
+        else:
+            pending[key] = value
+
+
+class EventCoalescer:
+    """
+    Agrupa los eventos de Socket.IO emitidos dentro de una ventana de tiempo y
+    los envía como un único mensaje por evento y grupo de salas.
+    """
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self.alert_rooms = [role_room("admin"), role_room("user")]
+        self.transport = "direct"
+        self.app = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._scheduled = False
+
+    def init_app(self, app):
+        self.app = app
+        self.window = app.config.get("SOCKETIO_DEBOUNCE_SECONDS", self.window)
+        self.alert_rooms = [role_room(role) for role in app.config.get("SOCKETIO_ALERT_ROLES", ["admin", "user"])]
+        # "direct": emitir por Socket.IO (o su cola de mensajes); "outbox": escribir en socket_outbox
+        self.transport = app.config.get("EVENTS_TRANSPORT", "direct")
+
+    def emit(self, event, payload, rooms=None):
+        """Encola un evento para las salas indicadas (por defecto, las de alertas)."""
+        key = (event, tuple(sorted(rooms or self.alert_rooms)))
+        with self._lock:
+            _merge_payload(self._pending.setdefault(key, {}), payload)
+            if self.window <= 0:
+                schedule = False
+            else:
+                schedule = not self._scheduled
+                self._scheduled = True
+
+        if self.window <= 0:
+            self.flush()
+        elif schedule:
+            socketio.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        socketio.sleep(self.window)
+        self.flush()
+
+    def flush(self):
+        """Envía inmediatamente todos los eventos pendientes."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+
+        if not pending:
+            return
+
+        if self.transport == "outbox":
+            self._write_outbox(pending)
+            return
+
+        for (event, rooms), payload in pending.items():
+            try:
+                socketio.emit(event, payload, to=list(rooms))
+                metrics.inc("hotel_socketio_emits_total", (("event", event),))
+            except Exception as e:
+                logger.error(f"Error al emitir {event}: {str(e)}")
+
+    def _write_outbox(self, pending):
+        ahora = datetime.now()
+        rows = [{"event": event, "rooms": json.dumps(list(rooms)), "payload": json.dumps(payload), "created_at": ahora}
+                for (event, rooms), payload in pending.items()]
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(insert(SocketOutbox.__table__), rows)
+        except Exception as e:
+            logger.error(f"Error al escribir eventos en socket_outbox: {str(e)}")
+
+
+class OutboxRelay:
+    """
+    Reenvía a los clientes conectados a este proceso los eventos que otros procesos
+    (el worker) dejan en socket_outbox. Cada proceso web mantiene su propio cursor.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.interval = 1.0
+        self.last_id = None
+        self._started = False
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get("OUTBOX_POLL_SECONDS", self.interval)
+        if app.config.get("OUTBOX_RELAY_ENABLED", False) and not self._started:
+            self._started = True
+            socketio.start_background_task(self._run)
+
+    def _run(self):
+        while True:
+            socketio.sleep(self.interval)
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Error al reenviar eventos de socket_outbox: {str(e)}")
+
+    def poll_once(self):
+        """Emite los eventos nuevos desde la última consulta. Devuelve cuántos se enviaron."""
+        table = SocketOutbox.__table__
+        with self.app.app_context():
+            with db.engine.connect() as conn:
+                if self.last_id is None:
+                    # Al arrancar no se reenvían eventos antiguos
+                    self.last_id = conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+                    return 0
+                rows = conn.execute(
+                    select(table.c.id, table.c.event, table.c.rooms, table.c.payload)
+                    .where(table.c.id > self.last_id)
+                    .order_by(table.c.id)
+                ).all()
+
+        for row in rows:
+            socketio.emit(row.event, json.loads(row.payload), to=json.loads(row.rooms))
+            metrics.inc("hotel_socketio_emits_total", (("event", row.event),))
+            self.last_id = row.id
+        return len(rows)
+
+
+def purge_outbox(retention_seconds):
+    """Elimina los eventos de socket_outbox más antiguos que la retención indicada."""
+    table = SocketOutbox.__table__
+    limite = datetime.now() - timedelta(seconds=retention_seconds)
+    with db.engine.begin() as conn:
+        return conn.execute(delete(table).where(table.c.created_at < limite)).rowcount
+
+
+notifier = EventCoalescer()
+outbox_relay = OutboxRelay()
@@ -0,0 +1,174 @@
+import cProfile
+import glob
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+from contextlib import ExitStack
+from datetime import datetime
+from flask import request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from ..extensions import logger
+from .query_stats import capture
+
+PROFILE_PARAM = "__profile"
+PROFILE_HEADER = "X-Profile"
+_ENVIRON_KEY = "hotel_spa.profile"
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+TOP_FUNCTIONS = 40
+
+
+def _requested():
+    # Comprobación sobre los bytes de la URL: sin parsear argumentos en las peticiones normales
+    if PROFILE_PARAM.encode() in request.query_string:
+        return request.args.get(PROFILE_PARAM) not in (None, "", "0")
+    value = request.headers.get(PROFILE_HEADER)
+    return value is not None and value not in ("", "0")
+
+
+def _is_admin():
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    return get_jwt().get("role") == "admin"
+
+
+def _function_rows(stats):
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+class RequestProfiler:
+    """
+    Perfila con cProfile las peticiones de administradores que lo solicitan
+    (?__profile=1 o cabecera X-Profile: 1). Guarda el .pstats y un resumen JSON con la
+    línea de tiempo SQL, y devuelve su id en la cabecera X-Profile-Id.
+    """
+
+    def __init__(self):
+        self.results_dir = None
+        self.keep = 50
+
+    def init_app(self, app):
+        if not app.config.get("PROFILING_ENABLED", True):
+            return
+        self.results_dir = app.config["PROFILE_RESULTS_DIR"]
+        self.keep = app.config.get("PROFILE_KEEP", self.keep)
+        os.makedirs(self.results_dir, exist_ok=True)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+
+    def _start(self):
+        if not _requested() or not _is_admin():
+            return
+        profiler = cProfile.Profile()
+        stack = ExitStack()
+        log = stack.enter_context(capture())
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Otro perfilador activo en el proceso (Python 3.12+ solo admite uno)
+            stack.close()
+            logger.warning(f"No se pudo perfilar {request.path}: {str(e)}")
+            return
+        request.environ[_ENVIRON_KEY] = (profiler, stack, log, time.perf_counter())
+
+    def _stop(self, status):
+        state = request.environ.pop(_ENVIRON_KEY, None)
+        if state is None:
+            return None
+        profiler, stack, log, start = state
+        profiler.disable()
+        duration = time.perf_counter() - start
+        stack.close()
+        try:
+            return self._save(profiler, log, duration, status)
+        except Exception as e:
+            logger.error(f"Error al guardar el perfil de {request.path}: {str(e)}")
+            return None
+
+    def _finish(self, response):
+        profile_id = self._stop(response.status_code)
+        if profile_id:
+            response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    def _teardown(self, exc):
+        # Excepciones no manejadas: after_request no se ejecuta
+        self._stop(500)
+
+    def _save(self, profiler, log, duration, status):
+        profile_id = uuid.uuid4().hex
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(self.path(profile_id, "pstats"))
+        summary = {
+            "id": profile_id,
+            "method": request.method,
+            "path": request.path,
+            "query_string": request.query_string.decode("utf-8", "replace"),
+            "status": status,
+            "user": get_jwt_identity(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_ms": round(duration * 1000, 3),
+            "sql": {
+                "count": log.count,
+                "duration_ms": round(log.duration * 1000, 3),
+                "repeated": [{"statement": shape, "count": n} for shape, n in log.repeated(1)],
+                "timeline": [{"start_ms": round(offset * 1000, 3), "duration_ms": round(elapsed * 1000, 3),
+                              "statement": statement} for offset, elapsed, statement in log.timeline],
+            },
+            "functions": _function_rows(stats),
+        }
+        with open(self.path(profile_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False)
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        summaries = sorted(glob.glob(os.path.join(self.results_dir, "*.json")), key=os.path.getmtime)
+        for path in summaries[:-self.keep] if self.keep else summaries:
+            for extension in ("json", "pstats"):
+                try:
+                    os.remove(f"{os.path.splitext(path)[0]}.{extension}")
+                except FileNotFoundError:
+                    pass
+
+    def path(self, profile_id, extension):
+        if not _PROFILE_ID.match(profile_id or ""):
+            raise ValueError("Id de perfil inválido")
+        return os.path.join(self.results_dir, f"{profile_id}.{extension}")
+
+    def load(self, profile_id):
+        """Resumen JSON de un perfil, o None si no existe."""
+        try:
+            with open(self.path(profile_id, "json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (ValueError, FileNotFoundError):
+            return None
+
+    def recent(self, limit=50):
+        """Perfiles guardados, del más reciente al más antiguo (sin línea de tiempo ni funciones)."""
+        paths = sorted(glob.glob(os.path.join(self.results_dir, "*.json")), key=os.path.getmtime, reverse=True)
+        profiles = []
+        for path in paths[:limit]:
+            summary = self.load(os.path.splitext(os.path.basename(path))[0])
+            if summary:
+                summary["sql"] = {"count": summary["sql"]["count"], "duration_ms": summary["sql"]["duration_ms"]}
+                summary.pop("functions", None)
+                profiles.append(summary)
+        return profiles
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,124 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..extensions import logger
+
+_ENVIRON_KEY = "hotel_spa.query_log"
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_local = threading.local()
+
+
+def statement_shape(statement):
+    """Sentencia sin espacios repetidos y con las listas IN (?, ?, ...) reducidas a (?)."""
+    return " ".join(_IN_LIST.sub("(?)", statement).split())
+
+
+class QueryLog:
+    """Sentencias ejecutadas en un bloque: número, tiempo total, repeticiones por forma y línea de tiempo."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.timeline = []  # (inicio relativo en s, duración en s, sentencia)
+
+    def record(self, statement, start, elapsed):
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[statement_shape(statement)] += 1
+        self.timeline.append((start - self.started, elapsed, statement))
+
+    def repeated(self, threshold):
+        """Formas ejecutadas más de `threshold` veces (posibles N+1), de más a menos frecuentes."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def server_timing(self):
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+def _active_logs():
+    logs = getattr(_local, "logs", None)
+    if logs is None:
+        logs = _local.logs = []
+    return logs
+
+
+@contextmanager
+def capture():
+    """Registra en un QueryLog las sentencias ejecutadas por este hilo dentro del bloque."""
+    log = QueryLog()
+    logs = _active_logs()
+    logs.append(log)
+    try:
+        yield log
+    finally:
+        logs.remove(log)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_local, "logs", None) and context is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_stats_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    # Las peticiones anidadas (/api/batch en serie) cuentan también en la petición externa
+    for log in getattr(_local, "logs", ()):
+        log.record(statement, start, elapsed)
+
+
+class QueryStats:
+    """
+    Cuenta las sentencias SQL y su tiempo por petición, los expone en Server-Timing y
+    avisa cuando una misma forma de sentencia se repite más de QUERY_REPEAT_THRESHOLD veces.
+    """
+
+    def __init__(self):
+        self.repeat_threshold = 10
+
+    def init_app(self, app):
+        if not app.config.get("QUERY_STATS_ENABLED", True):
+            return
+        self.repeat_threshold = app.config.get("QUERY_REPEAT_THRESHOLD", self.repeat_threshold)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+
+    def _start(self):
+        log = QueryLog()
+        request.environ[_ENVIRON_KEY] = log
+        _active_logs().append(log)
+
+    def _finish(self, response):
+        log = request.environ.get(_ENVIRON_KEY)
+        if log is None:
+            return response
+        response.headers.add("Server-Timing", log.server_timing())
+        for shape, n in log.repeated(self.repeat_threshold):
+            logger.warning(f"Posible N+1 en {request.method} {request.path}: {n} ejecuciones de {shape[:200]}")
+        return response
+
+    def _teardown(self, exc):
+        log = request.environ.pop(_ENVIRON_KEY, None)
+        logs = getattr(_local, "logs", None)
+        if log is not None and logs and log in logs:
+            logs.remove(log)
+
+
+def current_log():
+    """QueryLog de la petición en curso, o None."""
+    return request.environ.get(_ENVIRON_KEY)
+
+
+query_stats = QueryStats()
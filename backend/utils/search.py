@@ -0,0 +1,165 @@
+import html
+import re
+from sqlalchemy import event, text, bindparam
+from ..extensions import db
+
+# Tablas FTS5 de contenido externo: el índice guarda solo los términos, el texto se lee
+# de la tabla original. Los triggers las mantienen sincronizadas en cada escritura.
+FTS_TABLES = {
+    "client_fts": ("client", ["nombre", "email", "documento", "telefono", "comentarios"]),
+    "booking_fts": ("booking", ["notas"]),
+    "archivo_fts": ("archivo", ["notas"]),
+}
+
+SEARCH_TYPES = ("client", "booking", "archive")
+
+
+def _ddl(fts, source, columns):
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{source}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+def create_search_index(connection):
+    """
+    Crea las tablas FTS5 y sus triggers (idempotente). Solo las tablas recién creadas
+    indexan las filas existentes: create_all se ejecuta en cada arranque.
+    """
+    existing = {row[0] for row in connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    )}
+    for fts, (source, columns) in FTS_TABLES.items():
+        for statement in _ddl(fts, source, columns):
+            connection.exec_driver_sql(statement)
+        if fts not in existing:
+            connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def drop_search_index(connection):
+    for fts in FTS_TABLES:
+        for suffix in ("ai", "ad", "au"):
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts}")
+
+
+@event.listens_for(db.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        create_search_index(connection)
+
+
+@event.listens_for(db.metadata, "before_drop")
+def _before_drop(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        drop_search_index(connection)
+
+
+def fts_query(q):
+    """Convierte el texto del usuario en una consulta FTS5 segura: todos los términos, por prefijo."""
+    terms = re.findall(r"\w+", q or "")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+# Primera fase: solo identificadores y relevancia, sin leer el texto original
+_RANK_SQL = {
+    "client": """
+        SELECT 'client' AS type, client_fts.rowid AS id, bm25(client_fts, 10.0, 4.0, 8.0, 4.0, 1.0) AS rank
+        FROM client_fts JOIN client c ON c.id = client_fts.rowid
+        WHERE client_fts MATCH :q AND c.is_deleted = 0
+    """,
+    "booking": """
+        SELECT 'booking' AS type, rowid AS id, bm25(booking_fts) AS rank
+        FROM booking_fts WHERE booking_fts MATCH :q
+    """,
+    "archive": """
+        SELECT 'archive' AS type, rowid AS id, bm25(archivo_fts) AS rank
+        FROM archivo_fts WHERE archivo_fts MATCH :q
+    """,
+}
+
+# Marcadores del fragmento: se sustituyen por <mark> después de escapar el texto
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+# Segunda fase: etiqueta y fragmento resaltado solo para los resultados de la página
+_DETAIL_SQL = {
+    "client": """
+        SELECT c.id AS id, c.nombre AS label, c.documento AS detail,
+               snippet(client_fts, -1, char(2), char(3), '…', 10) AS snippet
+        FROM client_fts JOIN client c ON c.id = client_fts.rowid
+        WHERE client_fts MATCH :q AND client_fts.rowid IN :ids
+    """,
+    "booking": """
+        SELECT b.id AS id, 'Reserva #' || b.id AS label, c.nombre AS detail,
+               snippet(booking_fts, 0, char(2), char(3), '…', 10) AS snippet
+        FROM booking_fts JOIN booking b ON b.id = booking_fts.rowid
+        LEFT JOIN client c ON c.id = b.cliente_id
+        WHERE booking_fts MATCH :q AND booking_fts.rowid IN :ids
+    """,
+    "archive": """
+        SELECT a.id AS id, 'Archivo #' || a.id AS label, c.nombre AS detail,
+               snippet(archivo_fts, 0, char(2), char(3), '…', 10) AS snippet
+        FROM archivo_fts JOIN archivo a ON a.id = archivo_fts.rowid
+        LEFT JOIN client c ON c.id = a.cliente_id
+        WHERE archivo_fts MATCH :q AND archivo_fts.rowid IN :ids
+    """,
+}
+
+
+def highlight(snippet):
+    """Fragmento como HTML seguro: el texto original escapado y los términos entre <mark>."""
+    if snippet is None:
+        return None
+    escaped = html.escape(snippet)
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def search(q, types=SEARCH_TYPES, page=1, per_page=20):
+    """
+    Busca en clientes, notas de reservas y de archivos. Devuelve (resultados, total)
+    ordenados por relevancia (bm25, menor es mejor).
+    """
+    query = fts_query(q)
+    if not query:
+        return [], 0
+
+    union = " UNION ALL ".join(_RANK_SQL[t] for t in types)
+    ranked = db.session.execute(text(
+        f"SELECT type, id, rank, COUNT(*) OVER () AS total FROM ({union}) "
+        f"ORDER BY rank, type, id LIMIT :limit OFFSET :offset"
+    ), {"q": query, "limit": per_page, "offset": (page - 1) * per_page}).all()
+
+    if ranked:
+        total = ranked[0].total
+    else:
+        total = db.session.execute(text(f"SELECT COUNT(*) FROM ({union})"), {"q": query}).scalar() if page > 1 else 0
+
+    details = {}
+    for search_type in {row.type for row in ranked}:
+        ids = [row.id for row in ranked if row.type == search_type]
+        stmt = text(_DETAIL_SQL[search_type]).bindparams(bindparam("ids", expanding=True))
+        for row in db.session.execute(stmt, {"q": query, "ids": ids}).mappings():
+            details[(search_type, row["id"])] = row
+
+    results = []
+    for row in ranked:
+        detail = details.get((row.type, row.id), {})
+        results.append({
+            "type": row.type,
+            "id": row.id,
+            "label": detail.get("label"),
+            "detail": detail.get("detail"),
+            "snippet": highlight(detail.get("snippet")),
+            "score": round(-row.rank, 4),
+        })
+    return results, total
@@ -0,0 +1,240 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from ..extensions import db
+from ..models import User, Client, Room, Booking, Archivo, Income
+from ..analytics.revenue import income_store
+from ..analytics.dashboard import dashboard_cache
+from ..analytics.kpi import kpi_cache
+from .client_totals import rebuild_client_year_totals
+from .client_import import import_clients
+from .lookup import client_lookup
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+NOMBRES = ("Juan", "María", "Carlos", "Ana", "Luis", "Laura", "Andrés", "Sofía", "Jorge", "Valentina",
+           "Pedro", "Camila", "Diego", "Isabel", "Miguel", "Lucía", "Santiago", "Paula", "Felipe", "Daniela")
+APELLIDOS = ("Pérez", "González", "López", "Martínez", "Rodríguez", "Gómez", "Díaz", "Torres", "Ramírez",
+             "Vargas", "Castro", "Romero", "Suárez", "Herrera", "Moreno", "Jiménez", "Rojas", "Ortiz")
+PREFERENCIAS = ("", "", "No fumador", "Piso alto", "Cama extra", "Vista al mar", "Cerca del ascensor")
+NOTAS = ("", "", "", "Llega tarde", "Aniversario", "Viaje de negocios", "Cuna para bebé", "Alergia al polvo")
+# tipo: (capacidad, precio_noche)
+ROOM_TYPES = {"Estándar": (2, 80.0), "Doble": (3, 120.0), "Suite": (4, 200.0)}
+VISTAS = ("Mar", "Ciudad", "Jardín")
+METODOS_PAGO = ("Tarjeta", "Efectivo", "Transferencia", "PayPal")
+
+ROOMS_PER_CLIENT = 0.01  # Un hotel de 100 habitaciones por cada 10.000 clientes
+ARCHIVES_PER_CLIENT = 2
+MAX_UPCOMING_PER_ROOM = 3
+
+
+class _Writer:
+    """Acumula filas por tabla y las inserta con executemany, confirmando cada batch_size filas."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.pending = {}
+        self.counts = {}
+        self.buffered = 0
+
+    def add(self, model, row):
+        self.pending.setdefault(model, []).append(row)
+        self.buffered += 1
+        if self.buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Orden de claves foráneas: habitaciones y clientes antes que reservas, archivos e ingresos
+        for model in (Room, Client, Booking, Archivo, Income):
+            rows = self.pending.pop(model, None)
+            if rows:
+                db.session.execute(insert(model.__table__), rows)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+        db.session.commit()
+        self.buffered = 0
+
+
+def _next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def generate(scale, seed=42, today=None, batch_size=50000):
+    """
+    Genera datos sintéticos para `scale` clientes: habitaciones, historial de estancias
+    archivadas (unos tres años), reservas en curso y futuras, e ingresos. Con la misma
+    semilla y la misma fecha de referencia el resultado es idéntico.
+    Devuelve el número de filas insertadas por tabla.
+    """
+    rng = random.Random(seed)
+    today = (today or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    writer = _Writer(batch_size)
+
+    # Ids explícitos a continuación de los existentes: los ingresos referencian reservas y archivos
+    room_id, client_id = _next_id(Room), _next_id(Client)
+    booking_id, archive_id, income_id = _next_id(Booking), _next_id(Archivo), _next_id(Income)
+    floor_base = (db.session.execute(select(func.max(Room.num_habitacion))).scalar() or 0) // 100 + 1
+
+    rooms = []
+    for i in range(max(10, int(scale * ROOMS_PER_CLIENT))):
+        tipo = rng.choice(tuple(ROOM_TYPES))
+        capacidad, precio = ROOM_TYPES[tipo]
+        room = {"id": room_id + i, "num_habitacion": (floor_base + i // 50) * 100 + i % 50 + 1, "tipo": tipo,
+                "capacidad": capacidad, "precio_noche": precio, "disponibilidad": "Disponible",
+                "amenidades": "WiFi, TV", "vista": rng.choice(VISTAS), "notas": "", "is_deleted": False}
+        rooms.append(room)
+        writer.add(Room, room)
+
+    # Solo (id, nombre, documento) en memoria: las filas completas se escriben por lotes
+    clients = []
+    for i in range(scale):
+        nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+        documento = f"S{seed}-{client_id + i:08d}"
+        writer.add(Client, {"id": client_id + i, "nombre": nombre, "email": f"{documento.lower()}@seed.hotel",
+                            "telefono": f"3{rng.randrange(10**9):09d}", "documento": documento,
+                            "fecha_nacimiento": (today - timedelta(days=rng.randrange(18 * 365, 80 * 365))).strftime("%Y-%m-%d"),
+                            "preferencias": rng.choice(PREFERENCIAS), "comentarios": "", "is_deleted": False})
+        clients.append((client_id + i, nombre, documento))
+
+    def stay(room, check_in, nights):
+        cliente = rng.choice(clients)
+        return cliente, {
+            "cliente_id": cliente[0],
+            "habitacion_id": room["id"],
+            "check_in": check_in.replace(hour=15),
+            "check_out": (check_in + timedelta(days=nights)).replace(hour=12),
+            "tipo_habitacion": room["tipo"],
+            "num_huespedes": rng.randint(1, room["capacidad"]),
+            "metodo_pago": rng.choice(METODOS_PAGO),
+            "notas": rng.choice(NOTAS),
+            "valor_reservacion": room["precio_noche"] * nights,
+        }
+
+    def income(cliente, values, estado_pago, **source):
+        nonlocal income_id
+        row = {"id": income_id, "booking_id": None, "archive_id": None, **source,
+               "cliente_id": cliente[0], "nombre_cliente": cliente[1], "documento": cliente[2],
+               "fecha_pago": values["check_in"] - timedelta(days=rng.randint(0, 20), hours=rng.randint(0, 10)),
+               "monto": values["valor_reservacion"], "metodo_pago": values["metodo_pago"],
+               "estado_pago": estado_pago, "notas": None}
+        income_id += 1
+        return row
+
+    if clients:
+        # Historial: estancias consecutivas por habitación hacia atrás, antes de las reservas activas
+        per_room = scale * ARCHIVES_PER_CLIENT // len(rooms)
+        for room in rooms:
+            cursor = today - timedelta(days=5)
+            for _ in range(per_room):
+                nights = rng.randint(1, 7)
+                cursor -= timedelta(days=nights + rng.randint(0, 5))
+                cliente, values = stay(room, cursor, nights)
+                estado = rng.choices(("vencida", "cancelada", "reembolso"), (85, 10, 5))[0]
+                writer.add(Archivo, {"id": archive_id, "booking_id": booking_id, **values, "estado": estado,
+                                     "fecha_archivo": values["check_out"] + timedelta(days=rng.randint(0, 7))})
+                booking_id += 1  # Los archivos conservan el id de la reserva original
+                if estado != "cancelada":
+                    pago = "confirmado" if estado == "vencida" else "reembolso"
+                    writer.add(Income, income(cliente, values, pago, archive_id=archive_id))
+                archive_id += 1
+
+        # Reservas activas: la primera puede estar en curso (habitación ocupada) o recién vencida
+        for room in rooms:
+            cursor = today - timedelta(days=rng.randint(0, 4))
+            for _ in range(rng.randint(0, MAX_UPCOMING_PER_ROOM)):
+                nights = rng.randint(1, 7)
+                cliente, values = stay(room, cursor, nights)
+                if values["check_out"] < today:
+                    estado = "vencida"
+                elif values["check_in"].date() <= today.date():
+                    estado = "confirmada"
+                    room["disponibilidad"] = "Ocupada"
+                else:
+                    estado = rng.choices(("confirmada", "pendiente"), (70, 30))[0]
+                writer.add(Booking, {"id": booking_id, **values, "estado": estado, "notificado": estado == "vencida"})
+                if estado in ("confirmada", "vencida"):
+                    writer.add(Income, income(cliente, values, "confirmado", booking_id=booking_id))
+                booking_id += 1
+                cursor += timedelta(days=nights + rng.randint(0, 10))
+
+    writer.flush()
+    # Ocupación actual (las habitaciones se insertaron antes de conocer sus reservas)
+    occupied = [room["id"] for room in rooms if room["disponibilidad"] == "Ocupada"]
+    if occupied:
+        db.session.execute(Room.__table__.update().where(Room.id.in_(occupied)).values(disponibilidad="Ocupada"))
+        db.session.commit()
+
+    _refresh_derived()
+    return writer.counts
+
+
+def _refresh_derived():
+    # Las inserciones en bloque no disparan los eventos del ORM
+    rebuild_client_year_totals()
+    income_store.invalidate()
+    client_lookup.invalidate()
+    dashboard_cache.invalidate()
+    kpi_cache.clear()
+
+
+def load_fixtures(data_dir=DATA_DIR):
+    """Carga los datos de ejemplo de backend/data (usuarios, habitaciones, clientes y reservas)."""
+    counts = {}
+
+    with open(os.path.join(data_dir, "users.json"), encoding="utf-8") as f:
+        users = json.load(f)
+    existing = set(db.session.scalars(select(User.email)))
+    for data in users:
+        if data["email"] not in existing:
+            user = User(email=data["email"], role=data.get("role", "user"),
+                        nombre=data.get("nombre", data["email"].split("@")[0]))
+            user.set_password(data["password"])
+            db.session.add(user)
+            counts["user"] = counts.get("user", 0) + 1
+    db.session.commit()
+
+    with open(os.path.join(data_dir, "rooms.json"), encoding="utf-8") as f:
+        rooms = json.load(f)
+    for room in rooms:
+        if isinstance(room.get("amenidades"), list):
+            room["amenidades"] = ", ".join(room["amenidades"])
+    table = Room.__table__
+    stmt = sqlite_insert(table).on_conflict_do_nothing(index_elements=[table.c.num_habitacion])
+    counts["room"] = db.session.execute(stmt, rooms).rowcount
+    db.session.commit()
+
+    with open(os.path.join(data_dir, "clients.json"), "rb") as f:
+        report = import_clients(f)
+    counts["client"] = report.inserted
+    with open(os.path.join(data_dir, "clients.json"), encoding="utf-8") as f:
+        documentos = [c["documento"] for c in json.load(f)]
+
+    # booking.json referencia clientes por posición en clients.json y habitaciones por número
+    client_ids = dict(db.session.execute(select(Client.documento, Client.id).where(Client.documento.in_(documentos))).all())
+    room_rows = {r.num_habitacion: r for r in db.session.scalars(select(Room))}
+    with open(os.path.join(data_dir, "booking.json"), encoding="utf-8") as f:
+        bookings = json.load(f)
+    existing = set(db.session.execute(select(Booking.cliente_id, Booking.habitacion_id, Booking.check_in)).all())
+    counts["booking"] = 0
+    for data in bookings:
+        room = room_rows.get(data["num_habitacion"])
+        cliente_id = client_ids.get(documentos[data["cliente_id"] - 1]) if data["cliente_id"] <= len(documentos) else None
+        check_in = datetime.strptime(data["check_in"], "%Y-%m-%d").replace(hour=15)
+        if room is None or cliente_id is None or (cliente_id, room.id, check_in) in existing:
+            continue
+        check_out = datetime.strptime(data["check_out"], "%Y-%m-%d").replace(hour=12)
+        booking = Booking(cliente_id=cliente_id, habitacion_id=room.id, check_in=check_in, check_out=check_out,
+                          tipo_habitacion=data["tipo_habitacion"], num_huespedes=data["num_huespedes"],
+                          metodo_pago=data["metodo_pago"], estado=data["estado"].lower(), notas=data.get("notas"),
+                          valor_reservacion=room.precio_noche * max((check_out.date() - check_in.date()).days, 1))
+        db.session.add(booking)
+        counts["booking"] += 1
+        if booking.estado == "confirmada":
+            client = db.session.get(Client, cliente_id)
+            db.session.add(Income(booking=booking, cliente_id=cliente_id, nombre_cliente=client.nombre,
+                                  documento=client.documento, fecha_pago=check_in, monto=booking.valor_reservacion,
+                                  metodo_pago=booking.metodo_pago, estado_pago="confirmado"))
+    db.session.commit()
+    return counts
@@ -0,0 +1,47 @@
+"""
+Proceso worker para tareas programadas y trabajos en segundo plano.
+
+Ejecuta el scheduler fuera de los procesos web para que el trabajo por lotes no
+compita con las peticiones HTTP (GIL, conexiones y sesión de base de datos):
+
+    HOTEL_SCHEDULER_ENABLED=0 HOTEL_EVENTS_TRANSPORT=outbox python -m backend.serve
+    python -m backend.worker
+
+Los eventos de Socket.IO llegan a los clientes por SOCKETIO_MESSAGE_QUEUE si está
+configurada o, si no, a través de la tabla socket_outbox que reenvían los procesos web.
+"""
+import signal
+import threading
+from .app import create_app
+from .config import Config
+from .extensions import scheduler, logger
+
+
+class WorkerConfig(Config):
+    SCHEDULER_ENABLED = True
+    OUTBOX_RELAY_ENABLED = False
+    EVENTS_TRANSPORT = "direct" if Config.SOCKETIO_MESSAGE_QUEUE else "outbox"
+
+
+def main():
+    stop = threading.Event()
+
+    def _shutdown(signum, frame):
+        logger.info(f"Worker recibió la señal {signum}, deteniendo")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    app = create_app(WorkerConfig)
+    logger.info(f"Worker iniciado (eventos vía {app.config['EVENTS_TRANSPORT']}), tareas: "
+                f"{', '.join(job.id for job in scheduler.get_jobs())}")
+
+    while not stop.wait(1):
+        pass
+
+    scheduler.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    main()